@@ -0,0 +1,304 @@
+"""Micro-benchmark of the attendance de-duplication keys: f-string keys against tuple keys.
+
+Times faculty UpdateProcessThread.combine_attendance_data and department
+UpdateProcessThread.validate_attendance_with_transfers on synthetic data, once with the
+string keys they used before and once with the current tuple keys, and checks that both
+give the same result. Wall time comes from time.perf_counter (best of --repeat runs) and
+peak memory from tracemalloc.
+
+    python benchmarks/bench_attendance_keys.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from itertools import islice
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "shared"), os.path.join(ROOT, "faculty app"), os.path.join(ROOT, "department app")]
+
+import department_attendance_app  # noqa: E402
+import faculty_attendance_app  # noqa: E402
+from attendance_core import StudentRecord  # noqa: E402
+
+
+class StringKeyCombine(faculty_attendance_app.UpdateProcessThread):
+    """combine_attendance_data as it was with f-string keys and a copy of every previous entry"""
+
+    def combine_attendance_data(self, prev_attendance, new_attendance, prev_report_date, transferred_students, transfer_data,
+                                prev_attendance_keys=None):
+        """Combine previous and new attendance data, considering student transfers"""
+        combined_attendance = {}
+
+        # Add previous attendance data
+        for key, entries in prev_attendance.items():
+            combined_attendance[key] = []
+            for entry in entries:
+                # Add entries from previous attendance data
+                # If the student transferred, we need to retain the original validation group
+                student_id = str(entry[0]) if len(entry) > 0 else None
+
+                if student_id and student_id in transferred_students:
+                    # Copy the entry and add the previous group as validation group if not present
+                    new_entry = list(entry)
+                    # Ensure we have space for the validation group
+                    while len(new_entry) < 11:
+                        new_entry.append(None)
+                    # Set validation group to previous group if not already set
+                    if new_entry[10] is None:
+                        new_entry[10] = transferred_students[student_id]["previous_group"]
+                    combined_attendance[key].append(new_entry)
+                else:
+                    # For non-transferred students, just add the entry as is
+                    combined_attendance[key].append(list(entry))
+
+        # Add new attendance data, avoiding duplicates
+        for key, entries in new_attendance.items():
+            if key not in combined_attendance:
+                combined_attendance[key] = []
+
+            existing_entries = set()
+            if prev_attendance_keys is not None:
+                # A checkpoint already holds the unique identifiers of the previous entries
+                existing_entries = prev_attendance_keys.get(key, existing_entries)
+            else:
+                # Create a set of unique identifiers for existing entries
+                for entry in combined_attendance[key]:
+                    if len(entry) >= 10:
+                        unique_id = f"{entry[0]}-{entry[5]}-{entry[6]}-{entry[7]}-{entry[8]}"
+                        existing_entries.add(unique_id)
+
+            # Add only new entries that don't already exist
+            for entry in entries:
+                if len(entry) >= 10:
+                    unique_id = f"{entry[0]}-{entry[5]}-{entry[6]}-{entry[7]}-{entry[8]}"
+                    if unique_id not in existing_entries:
+                        combined_attendance[key].append(entry)
+
+        return combined_attendance
+
+
+class StringKeyValidation(department_attendance_app.UpdateProcessThread):
+    """validate_attendance_with_transfers as it was with f-string keys"""
+
+    def validate_attendance_with_transfers(self, log_history, session_schedule,
+                                          current_student_map, previous_student_map,
+                                          transferred_students, previous_attendance,
+                                          target_year, previous_keys=None):
+        """Validate attendance with awareness of group transfers"""
+        valid_attendance = {}
+        # Using the class constants to define time windows (both in minutes)
+        before_window = timedelta(minutes=self.VALID_ATTENDANCE_BEFORE_MINUTES)
+        after_window = timedelta(minutes=self.VALID_ATTENDANCE_AFTER_MINUTES)
+        session_map = {}
+        unique_logs = set()
+
+        # Create a mapping of sessions by location and date for each group
+        for row in session_schedule:
+            year, group, session, location, date, start_time = row[:6]
+            key = f"{year}-{group}"
+            session_datetime = self.parse_datetime(date, start_time)
+            session_key = f"{location}-{date}"
+            if key not in session_map:
+                session_map[key] = {}
+            session_map[key][session_key] = (session, session_datetime)
+
+        # First, import previous attendance records; a checkpoint brings their unique keys along
+        if previous_keys is not None:
+            unique_logs.update(previous_keys)
+        for key, attendance_list in previous_attendance.items():
+            if key not in valid_attendance:
+                valid_attendance[key] = []
+
+            for attendance in attendance_list:
+                valid_attendance[key].append(attendance)
+                if previous_keys is None:
+                    # Add to unique logs to prevent duplicates
+                    student_id = attendance[0]
+                    location = attendance[6]
+                    date = attendance[7]
+                    unique_logs.add(f"{student_id}-{location}-{date}")
+
+        # Process new log data
+        for row in islice(log_history, 1, None):
+            if len(row) >= 4:
+                student_id, location, date, time = row[:4]
+                student_id = str(student_id)
+
+                # Skip if this student doesn't exist in either map
+                if student_id not in current_student_map and student_id not in previous_student_map:
+                    continue
+
+                # Get student data - prefer current map, fall back to previous
+                student = current_student_map.get(student_id, previous_student_map.get(student_id))
+
+                # Skip if student is not in the target year
+                if student['year'] != target_year:
+                    continue
+
+                # Normal case: student didn't transfer
+                if student_id not in transferred_students:
+                    key = f"{student['year']}-{student['group']}"
+                    session_key = f"{location}-{date}"
+
+                    if key in session_map and session_key in session_map[key]:
+                        session, session_start = session_map[key][session_key]
+                        log_datetime = self.log_datetime(row)
+
+                        # Check if log is within time window
+                        if session_start - before_window <= log_datetime <= session_start + after_window:
+                            unique_log_key = f"{student_id}-{location}-{date}"
+                            if unique_log_key not in unique_logs:
+                                unique_logs.add(unique_log_key)
+                                if key not in valid_attendance:
+                                    valid_attendance[key] = []
+                                valid_attendance[key].append([
+                                    student_id, student['name'], student['year'],
+                                    student['group'], student['email'], session,
+                                    location, date, time
+                                ])
+
+                # Special case: student transferred groups
+                else:
+                    transfer_info = transferred_students[student_id]
+
+                    # Check both the old and new group's sessions
+                    old_key = f"{student['year']}-{transfer_info['group_before']}"
+                    new_key = f"{student['year']}-{transfer_info['group_after']}"
+                    session_key = f"{location}-{date}"
+
+                    # Check old group sessions
+                    if old_key in session_map and session_key in session_map[old_key]:
+                        session, session_start = session_map[old_key][session_key]
+                        log_datetime = self.log_datetime(row)
+
+                        # Check if log is within time window
+                        if session_start - before_window <= log_datetime <= session_start + after_window:
+                            unique_log_key = f"{student_id}-{location}-{date}"
+                            if unique_log_key not in unique_logs:
+                                unique_logs.add(unique_log_key)
+                                if new_key not in valid_attendance:  # Use NEW group for updated attendance
+                                    valid_attendance[new_key] = []
+                                valid_attendance[new_key].append([
+                                    student_id, student['name'], student['year'],
+                                    transfer_info['group_after'], student['email'], session,
+                                    location, date, time
+                                ])
+
+                    # Check new group sessions
+                    if new_key in session_map and session_key in session_map[new_key]:
+                        session, session_start = session_map[new_key][session_key]
+                        log_datetime = self.log_datetime(row)
+
+                        # Check if log is within time window
+                        if session_start - before_window <= log_datetime <= session_start + after_window:
+                            unique_log_key = f"{student_id}-{location}-{date}"
+                            if unique_log_key not in unique_logs:
+                                unique_logs.add(unique_log_key)
+                                if new_key not in valid_attendance:
+                                    valid_attendance[new_key] = []
+                                valid_attendance[new_key].append([
+                                    student_id, student['name'], student['year'],
+                                    transfer_info['group_after'], student['email'], session,
+                                    location, date, time
+                                ])
+
+        return valid_attendance
+
+
+def measure(function, repeat):
+    """Return (best seconds, peak traced bytes, result) of calling function"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    # Traced separately, since tracing slows every allocation down
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def faculty_entries(rng, count, students, first_session=0):
+    """Attendance entries of students over consecutive sessions, one subject per group"""
+    entries = {}
+    for index in range(count):
+        student_id, group = students[rng.randrange(len(students))]
+        session = first_session + index // len(students)
+        day = datetime(2030, 1, 1) + timedelta(days=session % 200)
+        entry = [student_id, "Name", "Year 1", group, f"{student_id}@med.asu.edu.eg", "anatomy", session + 1,
+                 f"Hall {session % 7}", day.strftime("%d/%m/%Y"), "09:05:00", None]
+        entries.setdefault(f"Year 1-{group}", []).append(entry)
+    return entries
+
+
+def bench_faculty(rows, repeat, rng):
+    students = [(f"{100000 + index}", f"G{index % 20}") for index in range(2000)]
+    previous = faculty_entries(rng, rows, students)
+    # A third of the new entries repeat previous ones, as after re-reading an overlapping log
+    overlap = [list(entry) for entries in previous.values() for entry in entries][:rows // 2]
+    new = faculty_entries(rng, rows, students, first_session=rows // len(students) + 1)
+    for entry in overlap:
+        new.setdefault(f"Year 1-{entry[3]}", []).append(entry)
+    transferred = {student_id: {"previous_group": group, "current_group": "G0"}
+                   for student_id, group in students[:40]}
+
+    old, current = StringKeyCombine(*[None] * 5), faculty_attendance_app.UpdateProcessThread(*[None] * 5)
+    cases = [("faculty combine, no transfers", {}), ("faculty combine, 40 transfers", transferred)]
+    for name, transfers in cases:
+        yield (name,
+               measure(lambda: old.combine_attendance_data(previous, new, None, transfers, {}), repeat),
+               measure(lambda: current.combine_attendance_data(previous, new, None, transfers, {}), repeat))
+
+
+def bench_department(rows, repeat, rng):
+    groups = [f"G{index}" for index in range(20)]
+    students = {f"{100000 + index}": StudentRecord(f"{100000 + index}", "Name", "Year 1", groups[index % 20])
+                for index in range(2000)}
+    sessions = {group: [(session + 1, f"Hall {session % 7}", datetime(2030, 1, 1) + timedelta(days=session, hours=9))
+                        for session in range(40)] for group in groups}
+    schedule = [("Year 1", group, session, location, start.strftime("%d/%m/%Y"), start.strftime("%H:%M:%S"))
+                for group, group_sessions in sessions.items() for session, location, start in group_sessions]
+    log_history = [("Student ID", "Location", "Log Date", "Log Time")]
+    student_ids = list(students)
+    for _ in range(rows):
+        student_id = student_ids[rng.randrange(len(student_ids))]
+        _, location, start = rng.choice(sessions[students[student_id].group])
+        scanned = start + timedelta(minutes=rng.randrange(-30, 180))
+        log_history.append((student_id, location, scanned.strftime("%d/%m/%Y"), scanned.strftime("%H:%M:%S")))
+    transferred = {student_id: {"group_before": students[student_id].group, "group_after": "G0"}
+                   for student_id in student_ids[:40]}
+
+    old, current = StringKeyValidation(*[None] * 6), department_attendance_app.UpdateProcessThread(*[None] * 6)
+    arguments = (log_history, schedule, students, students, transferred, {}, "Year 1")
+    yield ("department validate with transfers",
+           measure(lambda: old.validate_attendance_with_transfers(*arguments), repeat),
+           measure(lambda: current.validate_attendance_with_transfers(*arguments), repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="attendance entries and log rows per case")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case, the best is reported")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'case':<36}{'string keys':>22}{'tuple keys':>22}")
+    for bench in (bench_faculty, bench_department):
+        for name, (old_seconds, old_peak, old_result), (new_seconds, new_peak, new_result) in bench(
+                args.rows, args.repeat, random.Random(args.seed)):
+            assert old_result == new_result, f"{name}: the key schemes disagree"
+            print(f"{name:<36}{old_seconds:>10.3f}s {old_peak / 2 ** 20:>8.1f}MB"
+                  f"{new_seconds:>10.3f}s {new_peak / 2 ** 20:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
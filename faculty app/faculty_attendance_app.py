@@ -2,15 +2,21 @@
 import sys
 import re
 import pandas as pd
+import numpy as np
 import traceback
 import os
-import requests
 import json
 import random
 import shutil
-import threading
+import sqlite3
+import time
+import multiprocessing
+import queue
+from array import array
 from collections import defaultdict
 from datetime import datetime, timedelta, date
+from itertools import chain, islice
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from typing import List, Dict
 import io
 from PIL import Image
@@ -27,6 +33,13 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal, QThread, QSize, QTimer, QObject, pyqtSignal, QEvent, QDate
 from PyQt6.QtGui import QIcon, QPixmap, QFont, QIntValidator, QColor, QMovie, QTextCursor, QPainter, QPainterPath, QPen, QPalette
 
+# The parsing, caching and report classes are shared with the other app
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "shared"))
+from attendance_core import (
+    StageMetrics, BackupDownloader, MergeStore, DATETIME_PARSER, LogSource, SHEET_CACHE,
+    StudentRecord, LogReader, LogStore, ReportWriter, ReportReader, ReportCheckpoint, SessionIndex
+)
+
 # Constants - Inverted Colors
 DARK_BLUE = "#24325f"
 DARK_RED = "#951d1e"
@@ -1370,14 +1383,20 @@ class GithubDownloadWorker(QThread):
     progress_signal = pyqtSignal(int)
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(list)
+    metrics_signal = pyqtSignal(dict)
 
-    def __init__(self, repo_url, token):
+    def __init__(self, repo_url, token, api_url="https://api.github.com", max_workers=4):
         super().__init__()
         self.repo_url = repo_url
         self.token = token
+        self.api_url = api_url
+        self.max_workers = max_workers
         self.downloaded_files = []
 
     def run(self):
+        downloader = None
+        metrics = StageMetrics("download", self.metrics_signal.emit)
+        metrics_file = None
         try:
             # Parse the repo URL to extract owner and repo name
             # Example: "https://github.com/username/repo"
@@ -1389,30 +1408,6 @@ class GithubDownloadWorker(QThread):
             owner = parts[3]
             repo = parts[4]
 
-            # Get repository contents
-            self.log_signal.emit(
-                f"Connecting to GitHub repository: {owner}/{repo}")
-            headers = {
-                'Authorization': f'token {self.token}'} if self.token else {}
-
-            # Get all files in the repository
-            # Specify the backups folder
-            api_url = f"https://api.github.com/repos/{owner}/{repo}/contents/backups"
-            response = requests.get(api_url, headers=headers)
-
-            if response.status_code != 200:
-                self.log_signal.emit(
-                    f"Error accessing repository: {response.status_code}, {response.text}")
-                return
-
-            contents = response.json()
-            excel_files = [item for item in contents if item['name'].endswith(
-                '.xlsx') or item['name'].endswith('.xls')]
-
-            if not excel_files:
-                self.log_signal.emit("No Excel files found in the repository")
-                return
-
             # Create base directory and imported logs subdirectory
             # Use a better approach for determining base directory that works with both script and exe
             if getattr(sys, 'frozen', False):
@@ -1425,49 +1420,403 @@ class GithubDownloadWorker(QThread):
             
             temp_dir = os.path.join(base_dir, 'log_history', 'Imported_logs')
             os.makedirs(temp_dir, exist_ok=True)
+            metrics_file = os.path.join(base_dir, 'log_history', StageMetrics.METRICS_FILE)
 
-            # Download each Excel file
-            total_files = len(excel_files)
-            for idx, file in enumerate(excel_files):
-                self.log_signal.emit(f"Downloading {file['name']}...")
+            # Get repository contents
+            self.log_signal.emit(
+                f"Connecting to GitHub repository: {owner}/{repo}")
+            downloader = BackupDownloader(self.token, self.api_url, self.max_workers)
+            manifest = downloader.load_manifest(temp_dir)
 
-                download_url = file['download_url']
-                file_response = requests.get(download_url, headers=headers)
+            started = time.perf_counter()
+            try:
+                excel_files = downloader.list_backups(owner, repo, manifest)
+            except RuntimeError as e:
+                self.log_signal.emit(str(e))
+                return
+            metrics.record("list", time.perf_counter() - started, files=len(excel_files))
 
-                if file_response.status_code == 200:
-                    # Save file locally
-                    file_path = os.path.join(temp_dir, file['name'])
-                    with open(file_path, 'wb') as f:
-                        f.write(file_response.content)
+            if not excel_files:
+                self.log_signal.emit("No Excel files found in the repository")
+                return
 
-                    self.downloaded_files.append(file_path)
+            # Download the Excel files concurrently, skipping the ones already up to date
+            total_files = len(excel_files)
+            local_paths = {}
+            skipped = 0
+            downloaded_bytes = 0
+            started = time.perf_counter()
+            for idx, (file, file_path, status) in enumerate(
+                    downloader.download_all(excel_files, temp_dir, manifest)):
+                if status == "downloaded":
+                    local_paths[file['name']] = file_path
+                    downloaded_bytes += os.path.getsize(file_path)
                     self.log_signal.emit(f"Downloaded {file['name']}")
+                elif status == "unchanged":
+                    local_paths[file['name']] = file_path
+                    skipped += 1
                 else:
-                    self.log_signal.emit(
-                        f"Failed to download {file['name']}: {file_response.status_code}")
+                    self.log_signal.emit(f"Failed to download {file['name']}: {status}")
 
                 # Update progress
                 progress = int(((idx + 1) / total_files) * 100)
                 self.progress_signal.emit(progress)
 
+            downloader.save_manifest(temp_dir, manifest)
+            metrics.record("download", time.perf_counter() - started, bytes_count=downloaded_bytes,
+                           files=len(local_paths) - skipped, unchanged=skipped)
+
+            # Keep the repository's listing order for the merge
+            self.downloaded_files = [local_paths[file['name']] for file in excel_files
+                                     if file['name'] in local_paths]
+            if skipped:
+                self.log_signal.emit(f"{skipped} Excel files were already up to date")
             self.log_signal.emit(
-                f"Downloaded {len(self.downloaded_files)} Excel files")
+                f"Downloaded {len(self.downloaded_files) - skipped} Excel files")
             self.finished_signal.emit(self.downloaded_files)
 
         except Exception as e:
             self.log_signal.emit(f"Error: {str(e)}")
             import traceback
             self.log_signal.emit(traceback.format_exc())
+        finally:
+            if downloader is not None:
+                downloader.close()
+            if metrics_file is not None:
+                metrics.save(metrics_file)
 
 class MergeWorker(QThread):
     progress_signal = pyqtSignal(int)
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal(str)
+    metrics_signal = pyqtSignal(dict)
+
+    # Canonical log columns lead the merged sheet; the source metadata closes it
+    CANONICAL_COLUMNS = ["Student ID", "Location", "Log Date", "Log Time"]
+    METADATA_COLUMNS = ["Source_File", "Source_Sheet"]
+    # Log Date and Log Time parsed once at merge time, so the engines can skip parsing them
+    TIMESTAMP_COLUMN = "Log Timestamp"
 
-    def __init__(self, files, output_file):
+    def __init__(self, files, output_file, workers=1, store_dir=None, remove_duplicates=True,
+                 duplicate_window_seconds=0, output_formats=("xlsx",), partition_by=None, metrics_file=None):
         super().__init__()
         self.files = files
         self.output_file = output_file
+        # Extensions to save the merge as; the first file is the one reported as the result
+        self.output_formats = list(output_formats)
+        # "day" or "week" splits the first format into a folder of partitions; the other formats stay whole
+        self.partition_by = partition_by
+        self.workers = workers
+        # Exact duplicate scans are always dropped when enabled; repeated taps only with a window
+        self.remove_duplicates = remove_duplicates
+        self.duplicate_window_seconds = duplicate_window_seconds
+        # With a store directory only new or changed files are parsed, appended to the store's table of scans
+        self.store = MergeStore(store_dir) if store_dir else None
+        # Stage timings are appended here when a metrics file is given
+        self.metrics_file = metrics_file
+        self.metrics = StageMetrics("merge", self.metrics_signal.emit)
+
+    @staticmethod
+    def read_workbook(file_path):
+        """Parse every sheet of one workbook from a single open; returns (sheets, error, seconds taken)"""
+        started = time.perf_counter()
+        try:
+            sheets = []
+            with pd.ExcelFile(file_path) as excel_file:
+                for sheet_name in excel_file.sheet_names:
+                    # Cells keep their own types, so text such as a zero-padded ID is not read as a number
+                    sheets.append((sheet_name, excel_file.parse(sheet_name, dtype=object)))
+            return sheets, None, time.perf_counter() - started
+        except Exception as e:
+            return [], str(e), time.perf_counter() - started
+
+    def record_parse(self, idx, sheets, elapsed):
+        """Record the parse event of one file"""
+        file_path = self.files[idx]
+        self.metrics.record("parse", elapsed, rows=sum(len(df) for _, df in sheets),
+                            bytes_count=os.path.getsize(file_path) if os.path.exists(file_path) else 0,
+                            file=os.path.basename(file_path))
+
+    def read_sheets(self, indices):
+        """Parse the given files and return ([(file index, sheet frame)], {file: rows}) for the non-empty sheets, in file order"""
+        sheet_dfs = []
+        parsed = {}
+        # Files finish possibly out of order, but their sheets are added in file order
+        results = {}
+        position = 0
+        for completed, (idx, sheets, error) in enumerate(self.parse_workbooks(indices)):
+            results[idx] = (sheets, error)
+
+            # Update progress
+            progress = int(((completed + 1) / len(indices)) * 100)
+            self.progress_signal.emit(progress)
+
+            while position < len(indices) and indices[position] in results:
+                sheets, error = results.pop(indices[position])
+                file_path = self.files[indices[position]]
+                self.log_signal.emit(
+                    f"Processing {os.path.basename(file_path)}")
+                if error is not None:
+                    self.log_signal.emit(
+                        f"Error processing {file_path}: {error}")
+                    position += 1
+                    continue
+
+                parsed[file_path] = 0
+                for sheet_name, df in sheets:
+                    # Only process if the dataframe is not empty
+                    if not df.empty:
+                        # Add file and sheet metadata
+                        df['Source_File'] = os.path.basename(file_path)
+                        df['Source_Sheet'] = sheet_name
+                        sheet_dfs.append((indices[position], df))
+                        parsed[file_path] += len(df)
+                        self.log_signal.emit(
+                            f"Added sheet '{sheet_name}' with {len(df)} rows")
+                position += 1
+        return sheet_dfs, parsed
+
+    def parse_workbooks(self, indices):
+        """Parse the given files, in a process pool when more than one worker and file are involved"""
+        if self.workers <= 1 or len(indices) <= 1:
+            for idx in indices:
+                sheets, error, elapsed = MergeWorker.read_workbook(self.files[idx])
+                self.record_parse(idx, sheets, elapsed)
+                yield idx, sheets, error
+            return
+
+        # Spawned workers start clean instead of inheriting this process's Qt state
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(indices)), mp_context=context) as executor:
+            futures = {executor.submit(MergeWorker.read_workbook, self.files[idx]): idx for idx in indices}
+            for future in as_completed(futures):
+                idx = futures[future]
+                sheets, error, elapsed = future.result()
+                self.record_parse(idx, sheets, elapsed)
+                yield idx, sheets, error
+
+    def canonical_names(self, columns):
+        """Rename the first Student ID, Location, Log Date and Log Time look-alike headers to their canonical names"""
+        renames = {}
+        for col in columns:
+            col_lower = str(col).lower()
+            if "student" in col_lower and "id" in col_lower:
+                canonical = "Student ID"
+            elif "location" in col_lower:
+                canonical = "Location"
+            elif "log" in col_lower and ("date" in col_lower or "day" in col_lower):
+                canonical = "Log Date"
+            elif "log" in col_lower and "time" in col_lower:
+                canonical = "Log Time"
+            else:
+                continue
+            # A second look-alike keeps its own header so no data is overwritten
+            if canonical not in renames.values() and (col == canonical or canonical not in columns):
+                renames[col] = canonical
+        return renames
+
+    def apply_column_types(self, merged_df):
+        """Give the merged columns explicit dtypes: integer IDs and categorical locations and sources"""
+        if "Student ID" in merged_df.columns:
+            ids = pd.to_numeric(merged_df["Student ID"], errors="coerce")
+            present = merged_df["Student ID"].notna()
+            # Only convert when every ID is a whole number; alphanumeric and zero-padded IDs stay as they are
+            padded = merged_df["Student ID"][present].map(
+                lambda value: isinstance(value, str) and len(value.strip()) > 1 and value.strip()[0] == "0")
+            if ids[present].notna().all() and (ids[present] % 1 == 0).all() and not padded.any():
+                merged_df["Student ID"] = ids.astype("int64" if present.all() else "Int64")
+        for col in ["Location"] + self.METADATA_COLUMNS:
+            if col in merged_df.columns:
+                merged_df[col] = merged_df[col].astype("category")
+        return merged_df
+
+    def scan_timestamp(self, log_date, log_time):
+        """Combine a log date and time into a datetime, or None when either cannot be read"""
+        try:
+            if isinstance(log_date, str):
+                log_date = DATETIME_PARSER.parse_date(log_date.strip())
+            elif isinstance(log_date, datetime):
+                log_date = log_date.date()
+            if isinstance(log_time, str):
+                log_time = DATETIME_PARSER.parse_time(log_time.strip())
+            elif isinstance(log_time, datetime):
+                log_time = log_time.time()
+            return datetime.combine(log_date, log_time)
+        except (TypeError, ValueError):
+            return None
+
+    def parse_timestamps(self, merged_df):
+        """Parse every row's Log Date and Log Time into one datetime64 Series, NaT where unreadable"""
+        return pd.to_datetime(pd.Series(
+            [self.scan_timestamp(log_date, log_time)
+             for log_date, log_time in zip(merged_df["Log Date"], merged_df["Log Time"])],
+            index=merged_df.index, dtype=object))
+
+    def add_timestamps(self, merged_df):
+        """Insert the Log Timestamp column after Log Time, NaT where the date or time cannot be read"""
+        if "Log Date" not in merged_df.columns or "Log Time" not in merged_df.columns:
+            return merged_df
+        timestamps = self.parse_timestamps(merged_df)
+        # A re-merged file brings its old timestamps along; they are recomputed like the rest
+        merged_df = merged_df.drop(columns=[self.TIMESTAMP_COLUMN], errors="ignore")
+        merged_df.insert(merged_df.columns.get_loc("Log Time") + 1, self.TIMESTAMP_COLUMN, timestamps)
+        return merged_df
+
+    def split_rejected(self, merged_df):
+        """Return (readable rows, rows with an unreadable log date or time)"""
+        if self.TIMESTAMP_COLUMN not in merged_df.columns:
+            return merged_df, merged_df.iloc[0:0]
+        unreadable = merged_df[self.TIMESTAMP_COLUMN].isna()
+        return merged_df[~unreadable], merged_df[unreadable]
+
+    def ordered_columns(self, columns):
+        """Canonical columns and Log Timestamp first, then the rest in first-seen order, metadata last"""
+        ordered = [col for col in self.CANONICAL_COLUMNS + [self.TIMESTAMP_COLUMN] if col in columns]
+        ordered.extend(col for col in columns if col not in ordered and col not in self.METADATA_COLUMNS)
+        ordered.extend(self.METADATA_COLUMNS)
+        return ordered
+
+    def combine_sheets(self, sheet_dfs):
+        """Standardize the headers of parsed sheets and concat them into one typed frame with timestamps"""
+        # Map each sheet's headers onto the canonical log columns
+        self.log_signal.emit("Standardizing column headers...")
+        started = time.perf_counter()
+        all_dfs = [df.rename(columns=self.canonical_names(df.columns)) for _, df in sheet_dfs]
+
+        # Union of the columns in first-seen order: canonical columns first, metadata last
+        seen_columns = {}
+        for df in all_dfs:
+            for col in df.columns:
+                seen_columns.setdefault(col, None)
+        ordered_columns = self.ordered_columns(list(seen_columns))
+        self.metrics.record("standardize", time.perf_counter() - started,
+                            rows=sum(len(df) for df in all_dfs), sheets=len(all_dfs))
+
+        # One schema-aligned concat instead of rebuilding every sheet column by column
+        self.log_signal.emit("Merging all sheets...")
+        started = time.perf_counter()
+        merged_df = pd.concat([df.reindex(columns=ordered_columns) for df in all_dfs], ignore_index=True)
+        merged_df = self.apply_column_types(merged_df)
+        self.metrics.record("concat", time.perf_counter() - started, rows=len(merged_df),
+                            bytes_count=merged_df.memory_usage(index=True).sum())
+
+        # Rows whose date or time cannot be read are kept with an empty timestamp
+        self.log_signal.emit("Parsing log dates and times...")
+        started = time.perf_counter()
+        merged_df = self.add_timestamps(merged_df)
+        rejected = merged_df[self.TIMESTAMP_COLUMN].isna().sum() if self.TIMESTAMP_COLUMN in merged_df.columns else 0
+        self.metrics.record("timestamps", time.perf_counter() - started, rows=len(merged_df),
+                            rejected=int(rejected))
+        return merged_df
+
+    def append_to_store(self, new_df, sheet_dfs, parsed, pending):
+        """Replace the stored scans of the parsed files and delete those of files no longer selected"""
+        started = time.perf_counter()
+        pending = set(pending)
+        removed = self.store.keep_sources([file_path for idx, file_path in enumerate(self.files) if idx not in pending])
+
+        # Each file's rows are tagged with it, and its columns kept so an export has a full merge's columns
+        sources = {file_path: {"rows": rows, "columns": []} for file_path, rows in parsed.items()}
+        row_sources = []
+        for idx, df in sheet_dfs:
+            file_path = self.files[idx]
+            row_sources.extend([file_path] * len(df))
+            renames = self.canonical_names(df.columns)
+            columns = sources[file_path]["columns"]
+            columns.extend(name for name in (str(renames.get(col, col)) for col in df.columns) if name not in columns)
+
+        rows = len(new_df) if new_df is not None else 0
+        self.store.append(new_df, row_sources, sources)
+        self.metrics.record("store", time.perf_counter() - started, rows=rows, removed=removed)
+        if removed:
+            self.log_signal.emit(f"Removed {removed} scans of changed or unselected files from the merge store")
+        if rows:
+            self.log_signal.emit(f"Added {rows} scans of {len(parsed)} files to the merge store")
+
+    def read_store(self):
+        """Load the selected files' stored scans as a typed frame in merge column order"""
+        self.log_signal.emit("Reading the merge store...")
+        started = time.perf_counter()
+        merged_df = self.store.read_frame(self.files)
+        columns = self.store.source_columns(self.files)
+        if "Log Date" in columns and "Log Time" in columns and self.TIMESTAMP_COLUMN not in columns:
+            columns.append(self.TIMESTAMP_COLUMN)
+        merged_df = merged_df.reindex(columns=self.ordered_columns(columns))
+        merged_df = self.apply_column_types(merged_df)
+        if self.TIMESTAMP_COLUMN in merged_df.columns:
+            merged_df[self.TIMESTAMP_COLUMN] = pd.to_datetime(merged_df[self.TIMESTAMP_COLUMN])
+        self.metrics.record("read_store", time.perf_counter() - started, rows=len(merged_df),
+                            bytes_count=os.path.getsize(self.store.db_path))
+        return merged_df
+
+    def write_partitions(self, merged_df, output_format):
+        """Save the merge as one file per log date or week in a folder, with a manifest of each file's dates"""
+        directory = f"{os.path.splitext(self.output_file)[0]}_by_{self.partition_by}"
+        os.makedirs(directory, exist_ok=True)
+
+        partition_dates = merged_df[self.TIMESTAMP_COLUMN].dt.normalize()
+        if self.partition_by == "week":
+            # Weeks run Monday to Sunday and are named after their Monday
+            partition_dates = partition_dates - pd.to_timedelta(partition_dates.dt.weekday, unit="D")
+
+        partitions = []
+        for partition_date, partition_df in merged_df.groupby(partition_dates, sort=True):
+            file_name = f"{partition_date.strftime('%Y-%m-%d')}.{output_format}"
+            file_path = os.path.join(directory, file_name)
+            if LogSource.table_format(file_path):
+                sheet_name = LogSource.DEFAULT_TABLE
+                LogSource.write_frame(partition_df, file_path)
+            else:
+                sheet_name = "Sheet1"
+                partition_df.to_excel(file_path, index=False, sheet_name=sheet_name)
+            log_dates = partition_df[self.TIMESTAMP_COLUMN].dt.date
+            partitions.append({
+                "file": file_name,
+                "sheet": sheet_name,
+                "first_date": log_dates.min().isoformat(),
+                "last_date": log_dates.max().isoformat(),
+                "rows": len(partition_df)
+            })
+
+        manifest = {"partition_by": self.partition_by, "format": output_format, "partitions": partitions}
+        with open(os.path.join(directory, LogSource.PARTITION_MANIFEST), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        self.log_signal.emit(f"Split the merged data into {len(partitions)} files by {self.partition_by}")
+        return directory
+
+    def remove_duplicate_scans(self, merged_df):
+        """Drop repeated scans, keeping the first; returns (frame, exact duplicates removed, near duplicates removed)"""
+        if not all(col in merged_df.columns for col in self.CANONICAL_COLUMNS):
+            return merged_df, 0, 0
+
+        # The same scan appears once per backup that contains it
+        rows_before = len(merged_df)
+        merged_df = merged_df.drop_duplicates(subset=self.CANONICAL_COLUMNS, keep="first")
+        exact_removed = rows_before - len(merged_df)
+        if not self.duplicate_window_seconds:
+            return merged_df, exact_removed, 0
+
+        # Repeated taps: a scan within the window of the last scan kept for that student at that location,
+        # so a run of taps each just inside the window still keeps one scan per window
+        scans = pd.DataFrame({
+            "student": merged_df["Student ID"].astype(str),
+            "location": merged_df["Location"].astype(str),
+            "timestamp": (merged_df[self.TIMESTAMP_COLUMN] if self.TIMESTAMP_COLUMN in merged_df.columns
+                          else self.parse_timestamps(merged_df))
+        }).sort_values(["student", "location", "timestamp"], kind="stable")
+        window = pd.Timedelta(seconds=self.duplicate_window_seconds)
+        repeated = []
+        last_scan, last_kept = None, None
+        for row_index, student, location, timestamp in zip(scans.index, scans["student"],
+                                                           scans["location"], scans["timestamp"]):
+            if pd.isna(timestamp):
+                continue
+            if (student, location) == last_scan and timestamp - last_kept <= window:
+                repeated.append(row_index)
+                continue
+            last_scan, last_kept = (student, location), timestamp
+        merged_df = merged_df.drop(index=repeated)
+        return merged_df, exact_removed, len(repeated)
 
     def run(self):
         try:
@@ -1477,149 +1826,137 @@ class MergeWorker(QThread):
 
             self.log_signal.emit(f"Starting merge of {len(self.files)} files")
 
-            # Initialize a list to hold all dataframes
-            all_dfs = []
+            # Files already appended to the store unchanged are neither parsed nor merged again
+            pending = list(range(len(self.files)))
+            if self.store is not None:
+                pending = [idx for idx in pending if not self.store.is_current(self.files[idx])]
+                if len(pending) < len(self.files):
+                    self.log_signal.emit(
+                        f"{len(self.files) - len(pending)} unchanged files are already in the merge store")
 
-            # Process each file
-            for idx, file_path in enumerate(self.files):
-                self.log_signal.emit(
-                    f"Processing {os.path.basename(file_path)}")
+            sheet_dfs, parsed = self.read_sheets(pending) if pending else ([], {})
+            new_df = self.combine_sheets(sheet_dfs) if sheet_dfs else None
 
+            if self.store is not None:
                 try:
-                    # Read all sheets from the Excel file
-                    excel_file = pd.ExcelFile(file_path)
-                    for sheet_name in excel_file.sheet_names:
-                        df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-                        # Only process if the dataframe is not empty
-                        if not df.empty:
-                            # Add file and sheet metadata
-                            df['Source_File'] = os.path.basename(file_path)
-                            df['Source_Sheet'] = sheet_name
-                            all_dfs.append(df)
-                            self.log_signal.emit(
-                                f"Added sheet '{sheet_name}' with {len(df)} rows")
-
-                except Exception as e:
-                    self.log_signal.emit(
-                        f"Error processing {file_path}: {str(e)}")
-                    continue
-
-                # Update progress
-                progress = int(((idx + 1) / len(self.files)) * 100)
-                self.progress_signal.emit(progress)
+                    self.append_to_store(new_df, sheet_dfs, parsed, pending)
+                except (sqlite3.Error, OSError) as e:
+                    # Without the store every file is merged from its workbook
+                    self.log_signal.emit(f"Merge store unavailable, merging without it: {str(e)}")
+                    self.store = None
+                    stored = sorted(set(range(len(self.files))) - set(pending))
+                    if stored:
+                        sheet_dfs = sorted(sheet_dfs + self.read_sheets(stored)[0], key=lambda item: item[0])
+                        new_df = self.combine_sheets(sheet_dfs)
+
+            if self.store is not None and not self.output_formats:
+                self.log_signal.emit(
+                    f"The merge store {self.store.db_path} holds {self.store.scan_count()} scans")
+                self.finished_signal.emit(self.store.db_path)
+                return
 
-            if not all_dfs:
+            # Exports cover the stored scans of the selected files; without a store the parsed files are the whole merge
+            merged_df = self.read_store() if self.store is not None else new_df
+            if merged_df is None or merged_df.empty:
                 self.log_signal.emit("No valid data found in the files")
                 return
-
-            # Standardize column names across all dataframes
-            self.log_signal.emit("Standardizing column headers...")
-
-            # Find common columns or use a predefined set of columns
-            # For now, we'll use a simple approach of getting all unique columns
-            all_columns = set()
-            for df in all_dfs:
-                all_columns.update(df.columns)
-
-            # Remove metadata columns we added
-            standard_columns = [col for col in all_columns if col not in [
-                'Source_File', 'Source_Sheet']]
-
-            # Reindex all dataframes with the standard columns
-            standardized_dfs = []
-            for df in all_dfs:
-                # Create a new dataframe with all standard columns (will be filled with NaN for missing columns)
-                new_df = pd.DataFrame(columns=standard_columns)
-
-                # Copy data from original dataframe for matching columns
-                for col in standard_columns:
-                    if col in df.columns:
-                        new_df[col] = df[col]
-
-                # Add back metadata columns
-                new_df['Source_File'] = df['Source_File']
-                new_df['Source_Sheet'] = df['Source_Sheet']
-
-                standardized_dfs.append(new_df)
-
-            # Concatenate all dataframes
-            self.log_signal.emit("Merging all sheets...")
-            merged_df = pd.concat(standardized_dfs, ignore_index=True)
-
-            # Identify and reorder columns as per requirements:
-            # 1. Student ID (looking for column containing "Student" and "ID")
-            # 2. Location (looking for column containing "Location")
-            # 3. Log date (looking for column containing "Log" and "date" or "Date")
-            # 4. Log time (looking for column containing "Log" and "time" or "Time")
-            # 5. All other columns
-
-            self.log_signal.emit("Reordering columns to specified format...")
-
-            # Find the best matching columns based on column names
-            student_id_col = None
-            location_col = None
-            log_date_col = None
-            log_time_col = None
-
-            # Look for exact or partial matches
-            for col in merged_df.columns:
-                col_lower = str(col).lower()
-
-                # Check for Student ID
-                if "student" in col_lower and "id" in col_lower:
-                    student_id_col = col
-                # Check for Location
-                elif "location" in col_lower:
-                    location_col = col
-                # Check for Log date
-                elif "log" in col_lower and ("date" in col_lower or "day" in col_lower):
-                    log_date_col = col
-                # Check for Log time
-                elif "log" in col_lower and "time" in col_lower:
-                    log_time_col = col
-
-            # Create the ordered columns list
-            ordered_columns = []
-
-            # Add the main required columns if they exist
-            for col in [student_id_col, location_col, log_date_col, log_time_col]:
-                if col is not None and col in merged_df.columns:
-                    ordered_columns.append(col)
-
-            # Add all remaining columns (excluding the ones we've already added and metadata)
-            remaining_columns = [col for col in merged_df.columns
-                                if col not in ordered_columns
-                                and col not in ['Source_File', 'Source_Sheet']]
-            ordered_columns.extend(remaining_columns)
-
-            # Add metadata columns at the end
-            ordered_columns.extend(['Source_File', 'Source_Sheet'])
+            ordered_columns = list(merged_df.columns)
+
+            # Rows whose date or time cannot be read are set aside for the reject report
+            merged_df, rejected_df = self.split_rejected(merged_df)
+
+            if self.remove_duplicates:
+                self.log_signal.emit("Removing duplicate scans...")
+                started = time.perf_counter()
+                rows_before = len(merged_df)
+                merged_df, exact_removed, repeated_removed = self.remove_duplicate_scans(merged_df)
+                self.metrics.record("deduplicate", time.perf_counter() - started, rows=rows_before,
+                                    removed=exact_removed + repeated_removed)
+                message = f"Removed {exact_removed} exact duplicate scans"
+                if self.duplicate_window_seconds:
+                    message += (f" and {repeated_removed} repeated scans within "
+                                f"{self.duplicate_window_seconds} seconds")
+                self.log_signal.emit(f"{message}, {len(merged_df)} rows remain")
 
             # Log the column ordering
             self.log_signal.emit(
                 f"Column order being used: {', '.join(ordered_columns[:4])} + remaining columns")
 
-            # Reorder the dataframe columns
-            merged_df = merged_df[ordered_columns]
-
             # Make sure the output directory exists
             os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
 
-            # Save the merged data with reordered columns
-            self.log_signal.emit(f"Saving merged data to {self.output_file}")
-            merged_df.to_excel(self.output_file, index=False)
+            # Save the merged data with reordered columns, once per requested format
+            output_files = []
+            partition_by = self.partition_by if self.TIMESTAMP_COLUMN in merged_df.columns else None
+            if self.partition_by and not partition_by:
+                self.log_signal.emit("No log dates to split by, saving the merged data as a single file")
+            for output_format in self.output_formats or ["db"]:
+                started = time.perf_counter()
+                # A format that cannot be written is reported without losing the other formats
+                try:
+                    if partition_by and not output_files:
+                        self.log_signal.emit(f"Saving merged data split by {partition_by}")
+                        output_file = self.write_partitions(merged_df, output_format)
+                        written_bytes = sum(entry.stat().st_size for entry in os.scandir(output_file)
+                                            if entry.is_file())
+                    else:
+                        output_file = f"{os.path.splitext(self.output_file)[0]}.{output_format}"
+                        self.log_signal.emit(f"Saving merged data to {output_file}")
+                        if LogSource.table_format(output_file):
+                            LogSource.write_frame(merged_df, output_file)
+                        else:
+                            merged_df.to_excel(output_file, index=False)
+                        written_bytes = os.path.getsize(output_file)
+                except Exception as e:
+                    self.log_signal.emit(f"Could not save the merged data as {output_format}: {str(e)}")
+                    continue
+                self.metrics.record("write", time.perf_counter() - started, rows=len(merged_df),
+                                    bytes_count=written_bytes, file=os.path.basename(output_file),
+                                    format=output_format)
+                output_files.append(output_file)
+            if not output_files:
+                self.log_signal.emit("The merged data could not be saved")
+                return
+
+            if not rejected_df.empty:
+                reject_file = f"{os.path.splitext(self.output_file)[0]}_rejected.xlsx"
+                rejected_df.drop(columns=[self.TIMESTAMP_COLUMN]).to_excel(reject_file, index=False)
+                self.log_signal.emit(
+                    f"Set aside {len(rejected_df)} rows with an unreadable log date or time in {reject_file}")
 
             self.log_signal.emit(
-                f"Successfully merged {len(all_dfs)} sheets into {self.output_file} with ordered columns")
-            self.finished_signal.emit(self.output_file)
+                f"Successfully merged {len(self.files)} files into {', '.join(output_files)} with ordered columns")
+            self.finished_signal.emit(output_files[0])
 
         except Exception as e:
             self.log_signal.emit(f"Error during merge: {str(e)}")
             import traceback
             self.log_signal.emit(traceback.format_exc())
+        finally:
+            if self.metrics_file:
+                self.metrics.save(self.metrics_file)
 
 class LogSheetPreparer(QWidget):
+    # The flat formats load much faster as a log source; Excel stays available for reading by people.
+    # The Parquet entries are only listed when pyarrow is installed
+    MERGE_OUTPUT_FORMATS = {
+        "Excel (.xlsx)": ["xlsx"],
+        "CSV (.csv)": ["csv"],
+        "Parquet (.parquet)": ["parquet"],
+        "SQLite (.db)": ["db"],
+        "CSV + Excel copy": ["csv", "xlsx"],
+        "Parquet + Excel copy": ["parquet", "xlsx"],
+        "SQLite + Excel copy": ["db", "xlsx"],
+        # The merge store's own SQLite table of scans, without exporting a copy
+        "Merge store only (SQLite)": [],
+    }
+    # Split logs let the processors open only the days or weeks a schedule covers
+    MERGE_PARTITIONS = {
+        "Single file": None,
+        "One file per day": "day",
+        "One file per week": "week",
+    }
+
     def __init__(self):
         super().__init__()
         self.files_to_merge = []
@@ -1827,6 +2164,14 @@ class LogSheetPreparer(QWidget):
 
         # Bottom Buttons
         button_layout = QHBoxLayout()
+        button_layout.addWidget(QLabel("Output:"))
+        self.output_format_combo = QComboBox()
+        self.output_format_combo.addItems([name for name, formats in self.MERGE_OUTPUT_FORMATS.items()
+                                           if LogSource.PARQUET_AVAILABLE or "parquet" not in formats])
+        button_layout.addWidget(self.output_format_combo)
+        self.partition_combo = QComboBox()
+        self.partition_combo.addItems(self.MERGE_PARTITIONS.keys())
+        button_layout.addWidget(self.partition_combo)
         merge_btn = QPushButton("Merge Logs Files")
         merge_btn.clicked.connect(self.merge_files)
         merge_btn.setStyleSheet(STANDARD_BUTTON_STYLE)
@@ -1885,6 +2230,9 @@ class LogSheetPreparer(QWidget):
         # Scroll to the bottom
         self.output_console.moveCursor(QTextCursor.MoveOperation.End)
 
+    def log_metrics(self, event):
+        self.log_message(f"[metrics] {StageMetrics.describe(event)}")
+
     def download_github_files(self):
         # Use hardcoded repo URL and token - not visible to users
         repo_url = self.github_repo
@@ -1901,6 +2249,7 @@ class LogSheetPreparer(QWidget):
         self.github_worker = GithubDownloadWorker(repo_url, token)
         self.github_worker.progress_signal.connect(self.update_progress)
         self.github_worker.log_signal.connect(self.log_message)
+        self.github_worker.metrics_signal.connect(self.log_metrics)
         self.github_worker.finished_signal.connect(
             self.handle_downloaded_files)
         self.github_worker.start()
@@ -1950,9 +2299,15 @@ class LogSheetPreparer(QWidget):
         self.progress_bar.setValue(0)
 
         # Create and start the worker thread
-        self.merge_worker = MergeWorker(self.files_to_merge, output_file)
+        self.merge_worker = MergeWorker(self.files_to_merge, output_file,
+                                        workers=os.cpu_count() or 1,  # Parse workbooks side by side
+                                        store_dir=os.path.join(output_dir, 'merge_store'),
+                                        output_formats=self.MERGE_OUTPUT_FORMATS[self.output_format_combo.currentText()],
+                                        partition_by=self.MERGE_PARTITIONS[self.partition_combo.currentText()],
+                                        metrics_file=os.path.join(base_dir, 'log_history', StageMetrics.METRICS_FILE))
         self.merge_worker.progress_signal.connect(self.update_progress)
         self.merge_worker.log_signal.connect(self.log_message)
+        self.merge_worker.metrics_signal.connect(self.log_metrics)
         self.merge_worker.finished_signal.connect(self.handle_merge_complete)
         self.merge_worker.start()
 
@@ -3441,24 +3796,24 @@ class AppealProcessor(QWidget):
 
     def browse_file(self, input_field):
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Select Excel File", "", "Excel Files (*.xlsx)")
+            self, "Select Excel File", "", f"Excel Files (*.xlsx);;{LogSource.FILE_FILTER}")
         if filename:
             input_field.setText(filename)
 
     def load_sheets_and_data(self, file_path, combo_box, file_type):
         if os.path.isfile(file_path):
             try:
-                wb = openpyxl.load_workbook(file_path, read_only=True)
+                sheet_names = LogSource.sheet_names(file_path)
                 
                 # Store current selection if exists
                 current_selection = combo_box.currentText()
                 
                 # Update combo box
                 combo_box.clear()
-                combo_box.addItems(wb.sheetnames)
+                combo_box.addItems(sheet_names)
                 
                 # Restore selection if possible
-                if current_selection in wb.sheetnames:
+                if current_selection in sheet_names:
                     combo_box.setCurrentText(current_selection)
                     
                 # Auto-load data after sheets are loaded
@@ -3485,9 +3840,7 @@ class AppealProcessor(QWidget):
             self.session_table.setRowCount(0)
         
             # Load student reference data
-            ref_wb = openpyxl.load_workbook(self.ref_file_input.text(), read_only=True)
-            ref_ws = ref_wb[self.ref_sheet_combo.currentText()]
-            student_db = list(ref_ws.values)
+            student_db = SHEET_CACHE.read_rows(self.ref_file_input.text(), self.ref_sheet_combo.currentText())
         
             # Skip header row and load students
             for row in student_db[1:]:
@@ -3517,9 +3870,7 @@ class AppealProcessor(QWidget):
                         item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
         
             # Load session schedule data
-            sched_wb = openpyxl.load_workbook(self.schedule_file_input.text(), read_only=True)
-            sched_ws = sched_wb[self.schedule_sheet_combo.currentText()]
-            session_schedule = list(sched_ws.values)
+            session_schedule = SHEET_CACHE.read_rows(self.schedule_file_input.text(), self.schedule_sheet_combo.currentText())
         
             # Skip header row and load sessions
             for row in session_schedule[1:]:
@@ -3784,6 +4135,39 @@ class AppealProcessor(QWidget):
             
         return True
         
+    def add_appeals_to_table(self, log_file, log_sheet):
+        """Append the selected appeals to a CSV, Parquet or SQLite log table"""
+        log_df = LogSource.read_frame(log_file, log_sheet)
+        for column in ("Student ID", "Location", "Log Date", "Log Time"):
+            if column not in log_df.columns:
+                raise ValueError(f"Required column not found in log file: '{column}' is not in list")
+        for column in ("Subject", "Session", "Status", "Notes"):
+            if column not in log_df.columns:
+                log_df[column] = ""
+
+        new_rows = []
+        for appeal in self.selected_appeals:
+            # Format date and time values for consistency
+            date_value = appeal['date']
+            time_value = appeal['time']
+            if isinstance(date_value, datetime):
+                date_value = date_value.strftime('%Y-%m-%d')
+            if isinstance(time_value, datetime):
+                time_value = time_value.strftime('%H:%M:%S')
+            new_rows.append({
+                "Student ID": appeal['student_id'],
+                "Location": appeal['location'],
+                "Log Date": date_value,
+                "Log Time": time_value,
+                "Subject": appeal['subject'],
+                "Session": appeal['session'],
+                "Status": "Present",  # Mark as present for approved appeals
+                "Notes": "exception"
+            })
+
+        log_df = pd.concat([log_df, pd.DataFrame(new_rows)], ignore_index=True)
+        LogSource.write_frame(log_df, log_file, log_sheet)
+
     def process_appeals(self):
         """Process the selected appeals and add them to the log file"""
         if not self.selected_appeals:
@@ -3798,88 +4182,91 @@ class AppealProcessor(QWidget):
             log_file = self.log_file_input.text()
             log_sheet = self.log_sheet_combo.currentText()
         
-            # Load existing log file
-            log_wb = openpyxl.load_workbook(log_file)
-            log_ws = log_wb[log_sheet]
+            if LogSource.table_format(log_file):
+                self.add_appeals_to_table(log_file, log_sheet)
+            else:
+                # Load existing log file
+                log_wb = openpyxl.load_workbook(log_file)
+                log_ws = log_wb[log_sheet]
         
-            # Get header row to understand column structure
-            header_row = [cell.value if cell.value is not None else "" for cell in log_ws[1]]
+                # Get header row to understand column structure
+                header_row = [cell.value if cell.value is not None else "" for cell in log_ws[1]]
         
-            # Find important column indices
-            try:
-                # Adjust for the different column names in the example
-                id_col = header_row.index("Student ID")
-                location_col = header_row.index("Location")
-                date_col = header_row.index("Log Date")
-                time_col = header_row.index("Log Time")
-            
-                # Add missing columns if needed
-                if "Subject" not in header_row:
-                    header_row.append("Subject")
-                    subject_col = len(header_row) - 1
-                    for row in range(1, log_ws.max_row + 1):
-                        log_ws.cell(row=row, column=subject_col+1).value = ""
-                else:
-                    subject_col = header_row.index("Subject")
+                # Find important column indices
+                try:
+                    # Adjust for the different column names in the example
+                    id_col = header_row.index("Student ID")
+                    location_col = header_row.index("Location")
+                    date_col = header_row.index("Log Date")
+                    time_col = header_row.index("Log Time")
+            
+                    # Add missing columns if needed
+                    if "Subject" not in header_row:
+                        header_row.append("Subject")
+                        subject_col = len(header_row) - 1
+                        for row in range(1, log_ws.max_row + 1):
+                            log_ws.cell(row=row, column=subject_col+1).value = ""
+                    else:
+                        subject_col = header_row.index("Subject")
                 
-                if "Session" not in header_row:
-                    header_row.append("Session")
-                    session_col = len(header_row) - 1
-                    for row in range(1, log_ws.max_row + 1):
-                        log_ws.cell(row=row, column=session_col+1).value = ""
-                else:
-                    session_col = header_row.index("Session")
+                    if "Session" not in header_row:
+                        header_row.append("Session")
+                        session_col = len(header_row) - 1
+                        for row in range(1, log_ws.max_row + 1):
+                            log_ws.cell(row=row, column=session_col+1).value = ""
+                    else:
+                        session_col = header_row.index("Session")
                 
-                if "Status" not in header_row:
-                    header_row.append("Status")
-                    status_col = len(header_row) - 1
-                    for row in range(1, log_ws.max_row + 1):
-                        log_ws.cell(row=row, column=status_col+1).value = ""
-                else:
-                    status_col = header_row.index("Status")
+                    if "Status" not in header_row:
+                        header_row.append("Status")
+                        status_col = len(header_row) - 1
+                        for row in range(1, log_ws.max_row + 1):
+                            log_ws.cell(row=row, column=status_col+1).value = ""
+                    else:
+                        status_col = header_row.index("Status")
                 
-                if "Notes" not in header_row:
-                    header_row.append("Notes")
-                    notes_col = len(header_row) - 1
-                    for row in range(1, log_ws.max_row + 1):
-                        log_ws.cell(row=row, column=notes_col+1).value = ""
-                else:
-                    notes_col = header_row.index("Notes")
-            
-            except ValueError as e:
-                # Proper header not found, raise error
-                raise ValueError(f"Required column not found in log file: {str(e)}")
-        
-            # Get total number of rows in the log sheet
-            max_row = log_ws.max_row
-        
-            # Process each appeal
-            for appeal in self.selected_appeals:
-                # Format date and time values for consistency
-                date_value = appeal['date']
-                time_value = appeal['time']
-            
-                if isinstance(date_value, datetime):
-                    date_value = date_value.strftime('%Y-%m-%d')
-                if isinstance(time_value, datetime):
-                    time_value = time_value.strftime('%H:%M:%S')
-            
-                # Prepare new row with appeal data
-                new_row = max_row + 1
-                log_ws.cell(row=new_row, column=id_col+1).value = appeal['student_id']
-                log_ws.cell(row=new_row, column=date_col+1).value = date_value
-                log_ws.cell(row=new_row, column=time_col+1).value = time_value
-                log_ws.cell(row=new_row, column=subject_col+1).value = appeal['subject']
-                log_ws.cell(row=new_row, column=session_col+1).value = appeal['session']
-                log_ws.cell(row=new_row, column=status_col+1).value = "Present"  # Mark as present for approved appeals
-                log_ws.cell(row=new_row, column=location_col+1).value = appeal['location']
-                log_ws.cell(row=new_row, column=notes_col+1).value = "exception"  # Add exception flag as requested
-            
-                # Increment row counter
-                max_row += 1
-        
-            # Save changes to the log file
-            log_wb.save(log_file)
+                    if "Notes" not in header_row:
+                        header_row.append("Notes")
+                        notes_col = len(header_row) - 1
+                        for row in range(1, log_ws.max_row + 1):
+                            log_ws.cell(row=row, column=notes_col+1).value = ""
+                    else:
+                        notes_col = header_row.index("Notes")
+            
+                except ValueError as e:
+                    # Proper header not found, raise error
+                    raise ValueError(f"Required column not found in log file: {str(e)}")
+        
+                # Get total number of rows in the log sheet
+                max_row = log_ws.max_row
+        
+                # Process each appeal
+                for appeal in self.selected_appeals:
+                    # Format date and time values for consistency
+                    date_value = appeal['date']
+                    time_value = appeal['time']
+            
+                    if isinstance(date_value, datetime):
+                        date_value = date_value.strftime('%Y-%m-%d')
+                    if isinstance(time_value, datetime):
+                        time_value = time_value.strftime('%H:%M:%S')
+            
+                    # Prepare new row with appeal data
+                    new_row = max_row + 1
+                    log_ws.cell(row=new_row, column=id_col+1).value = appeal['student_id']
+                    log_ws.cell(row=new_row, column=date_col+1).value = date_value
+                    log_ws.cell(row=new_row, column=time_col+1).value = time_value
+                    log_ws.cell(row=new_row, column=subject_col+1).value = appeal['subject']
+                    log_ws.cell(row=new_row, column=session_col+1).value = appeal['session']
+                    log_ws.cell(row=new_row, column=status_col+1).value = "Present"  # Mark as present for approved appeals
+                    log_ws.cell(row=new_row, column=location_col+1).value = appeal['location']
+                    log_ws.cell(row=new_row, column=notes_col+1).value = "exception"  # Add exception flag as requested
+            
+                    # Increment row counter
+                    max_row += 1
+        
+                # Save changes to the log file
+                log_wb.save(log_file)
         
             # Show success message
             success_dialog = QMessageBox(self)
@@ -4233,16 +4620,16 @@ class AttendanceProcessor(QWidget):
 
     def browse_file(self, input_field):
         filename, _ = QFileDialog.getOpenFileName(
-            self, "Select Excel File", "", "Excel Files (*.xlsx)")
+            self, "Select Excel File", "",
+            f"Excel Files (*.xlsx);;{LogSource.FILE_FILTER};;{LogSource.PARTITION_FILTER}")
         if filename:
             input_field.setText(filename)
 
     def load_sheets(self, file_path, combo_box):
         if os.path.isfile(file_path):
             try:
-                wb = openpyxl.load_workbook(file_path, read_only=True)
                 combo_box.clear()
-                combo_box.addItems(wb.sheetnames)
+                combo_box.addItems(LogSource.sheet_names(file_path))
             except Exception as e:
                 QMessageBox.critical(
                     self, "Error", f"Error loading workbook: {str(e)}")
@@ -4296,13 +4683,15 @@ class AttendanceProcessor(QWidget):
             self.log_sheet_combo.currentText(),
             self.schedules,
             attendance_threshold,  # Pass the user-specified threshold
-            self.prev_report_file_input.text()  # Pass the previous report file path
+            self.prev_report_file_input.text(),  # Pass the previous report file path
+            workers=os.cpu_count() or 1  # Schedules run side by side in a process pool; one schedule stays here
         )
     
         # Connect signals
         self.process_thread.progress_updated.connect(self.update_progress)
         self.process_thread.error_occurred.connect(self.handle_error)
         self.process_thread.processing_complete.connect(self.handle_completion)
+        self.process_thread.log_signal.connect(self.output_console.append)
     
         # Start processing
         self.process_thread.start()
@@ -4402,6 +4791,7 @@ class AttendanceProcessor(QWidget):
         self.update_thread.progress_updated.connect(self.update_progress)
         self.update_thread.error_occurred.connect(self.handle_error)
         self.update_thread.processing_complete.connect(self.handle_completion)
+        self.update_thread.log_signal.connect(self.output_console.append)
     
         # Start processing
         self.update_thread.start()
@@ -4470,8 +4860,13 @@ class ProcessThread(QThread):
     progress_updated = pyqtSignal(int)
     error_occurred = pyqtSignal(str)
     processing_complete = pyqtSignal()
+    log_signal = pyqtSignal(str)
+
+    # Inputs shared by every schedule a pool worker process handles
+    WORKER_STATE = {}
 
-    def __init__(self, ref_file, ref_sheet, log_file, log_sheet, schedules, attendance_threshold=0.75, prev_report_file=None):
+    def __init__(self, ref_file, ref_sheet, log_file, log_sheet, schedules, attendance_threshold=0.75, prev_report_file=None,
+                 engine="python", workers=1):
         super().__init__()
         self.ref_file = ref_file
         self.ref_sheet = ref_sheet
@@ -4480,6 +4875,10 @@ class ProcessThread(QThread):
         self.schedules = schedules
         self.ATTENDANCE_THRESHOLD = attendance_threshold
         self.prev_report_file = prev_report_file  # Add the new parameter
+        # Validation engine: "python" walks the log row by row, "pandas" uses the vectorized matcher
+        self.engine = engine
+        # Number of schedules processed side by side in a process pool; 1 keeps the sequential loop
+        self.workers = workers
 
         # Time window constants in minutes - STANDARD SESSIONS
         self.STANDARD_BEFORE_MINUTES = 15
@@ -4523,17 +4922,17 @@ class ProcessThread(QThread):
             current_step = 0
 
             # Load reference data
-            ref_wb = openpyxl.load_workbook(self.ref_file)
-            ref_ws = ref_wb[self.ref_sheet]
-            student_db = list(ref_ws.values)
+            student_db = SHEET_CACHE.read_rows(self.ref_file, self.ref_sheet)
             student_map = self.create_student_map(student_db)
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
 
-            # Load log data
-            log_wb = openpyxl.load_workbook(self.log_file)
-            log_ws = log_wb[self.log_sheet]
-            log_history = list(log_ws.values)
+            # Stream the log columns once, bucketing rows so every schedule only reads what it can match
+            first_date, last_date = self.schedule_date_span() if LogSource.is_partitioned(self.log_file) else (None, None)
+            log_reader = LogReader(self.log_file, self.log_sheet, first_date, last_date)
+            watermarks = {}
+            log_store = self.partition_log_history(self.watermark_records(log_reader, watermarks), student_map)
+            self.log_signal.emit(f"Log store: {log_store.describe_memory()}")
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
 
@@ -4546,73 +4945,170 @@ class ProcessThread(QThread):
             attendance_sheet_name = f"Attendance_{current_date}"
             summary_sheet_name = f"Summary_{current_date}"
 
-            # Process each schedule
-            for year, module, sched_file, sched_sheet, total_required in self.schedules:
-                # Load schedule data
-                sched_wb = openpyxl.load_workbook(sched_file)
-                sched_ws = sched_wb[sched_sheet]
-                session_schedule = list(sched_ws.values)
-                current_step += 1
-                self.progress_updated.emit(
-                    int(current_step / total_steps * 100))
-
-                # Calculate sessions
-                completed_sessions = self.calculate_completed_sessions(
-                    session_schedule[1:])
-                required_attendance = self.calculate_required_attendance(
-                    session_schedule[1:], total_required)
-                current_step += 1
-                self.progress_updated.emit(
-                    int(current_step / total_steps * 100))
-
-                # Validate attendance
-                valid_attendance = self.validate_attendance(log_history, session_schedule[1:],
-                                                            student_map, f"Year {year}")
-                current_step += 1
-                self.progress_updated.emit(
-                    int(current_step / total_steps * 100))
-
-                # Create output workbook and sheets
-                output_wb = openpyxl.Workbook()
-                output_wb.remove(output_wb.active)
-
-                # Create Summary sheet first, then Attendance sheet with date in sheet name
-                self.create_summary_sheet(output_wb, summary_sheet_name, valid_attendance, required_attendance,
-                                          student_map, f"Year {year}", completed_sessions, total_required)
-                self.create_valid_logs_sheet(output_wb, attendance_sheet_name, valid_attendance)
-
-                current_step += 1
-                self.progress_updated.emit(
-                    int(current_step / total_steps * 100))
-
-                # Save output workbook
-                current_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                year_dir = os.path.join(output_dir, f"Year_{year}")
-                os.makedirs(year_dir, exist_ok=True)
-                output_path = os.path.join(
-                    year_dir, f"Y{year}_{module}_attendance_{current_timestamp}.xlsx")
-                output_wb.save(output_path)
-                current_step += 1
-                self.progress_updated.emit(
-                    int(current_step / total_steps * 100))
-
+            # Process each schedule, side by side in a process pool when more than one worker is allowed
+            self.total_steps = total_steps
+            self.current_step = current_step
+            if self.workers > 1 and len(self.schedules) > 1:
+                self.process_schedules_parallel(student_map, log_store, watermarks, output_dir,
+                                                attendance_sheet_name, summary_sheet_name)
+            else:
+                for schedule in self.schedules:
+                    self.process_schedule(schedule, student_map, log_store, watermarks, output_dir,
+                                          attendance_sheet_name, summary_sheet_name, self.advance_progress)
+
+            self.log_signal.emit(f"Date/time parsing: {DATETIME_PARSER.describe_cache()}")
+            self.log_signal.emit(f"Sheet cache: {SHEET_CACHE.describe_cache()}")
+            for warning in SHEET_CACHE.take_warnings():
+                self.log_signal.emit(warning)
             self.processing_complete.emit()
 
         except Exception as e:
             self.error_occurred.emit(str(e))
 
+    def advance_progress(self):
+        """Count one finished schedule step and report the overall progress"""
+        self.current_step += 1
+        self.progress_updated.emit(int(self.current_step / self.total_steps * 100))
+
+    def process_schedule(self, schedule, student_map, log_store, watermarks, output_dir, attendance_sheet_name,
+                         summary_sheet_name, step_completed):
+        """Validate, summarize and save the report and checkpoint of one schedule, calling step_completed after each step"""
+        year, module, sched_file, sched_sheet, total_required = schedule
+
+        # Load schedule data
+        session_schedule = SHEET_CACHE.read_rows(sched_file, sched_sheet)
+        step_completed()
+
+        # Calculate sessions
+        completed_sessions = self.calculate_completed_sessions(
+            session_schedule[1:])
+        required_attendance = self.calculate_required_attendance(
+            session_schedule[1:], total_required)
+        step_completed()
+
+        # Validate attendance against the log buckets this schedule covers
+        schedule_logs = self.select_log_partitions([LogReader.HEADER], log_store, session_schedule[1:])
+        if self.engine == "pandas":
+            valid_attendance = self.validate_attendance_vectorized(schedule_logs, session_schedule[1:],
+                                                                   student_map, f"Year {year}")
+        else:
+            valid_attendance = self.validate_attendance(schedule_logs, session_schedule[1:],
+                                                        student_map, f"Year {year}")
+        step_completed()
+
+        # Create output workbook and sheets, streamed through a write-only report writer
+        report = ReportWriter()
+
+        # Aggregate per-student counters once so the summary reads each student directly
+        attendance_index = self.index_attendance(valid_attendance)
+
+        # Create Summary sheet first, then Attendance sheet with date in sheet name
+        self.create_summary_sheet(report, summary_sheet_name, valid_attendance, required_attendance,
+                                  student_map, f"Year {year}", completed_sessions, total_required,
+                                  attendance_index)
+        self.create_valid_logs_sheet(report, attendance_sheet_name, valid_attendance)
+
+        step_completed()
+
+        # Save output workbook
+        current_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        year_dir = os.path.join(output_dir, f"Year_{year}")
+        os.makedirs(year_dir, exist_ok=True)
+        output_path = os.path.join(
+            year_dir, f"Y{year}_{module}_attendance_{current_timestamp}.xlsx")
+        report.save(output_path)
+
+        # Checkpoint for the first update: this report's attendance and students, and the newest scan per source
+        checkpoint_attendance, checkpoint_keys = UpdateProcessThread.checkpoint_attendance(valid_attendance)
+        ReportCheckpoint.save(output_path, checkpoint_attendance, checkpoint_keys,
+                              UpdateProcessThread.summary_student_map(student_map, f"Year {year}"), watermarks)
+        step_completed()
+
+        return output_path
+
+    def process_schedules_parallel(self, student_map, log_store, watermarks, output_dir, attendance_sheet_name,
+                                   summary_sheet_name):
+        """Run the schedules in a process pool, rolling worker progress up into progress_updated"""
+        # Spawned workers start clean instead of inheriting this process's Qt state
+        context = multiprocessing.get_context("spawn")
+        progress_queue = context.Queue()
+        settings = {
+            "ref_file": self.ref_file,
+            "ref_sheet": self.ref_sheet,
+            "log_file": self.log_file,
+            "log_sheet": self.log_sheet,
+            "schedules": self.schedules,
+            "attendance_threshold": self.ATTENDANCE_THRESHOLD,
+            "prev_report_file": self.prev_report_file,
+            "engine": self.engine
+        }
+        expected_steps = len(self.schedules) * 5
+        received_steps = 0
+
+        # Cache the schedules here, since the workers only read the sheet cache
+        for schedule in self.schedules:
+            SHEET_CACHE.read_sheet(schedule[2], schedule[3])
+
+        # The student map and log partitions are sent once per worker rather than once per schedule
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(self.schedules)), mp_context=context,
+                                 initializer=ProcessThread.init_schedule_worker,
+                                 initargs=(settings, student_map, log_store, watermarks, progress_queue,
+                                           SHEET_CACHE.cache_dir)) as executor:
+            pending = {executor.submit(ProcessThread.run_schedule_job, schedule, output_dir,
+                                       attendance_sheet_name, summary_sheet_name)
+                       for schedule in self.schedules}
+            try:
+                while pending:
+                    done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                    received_steps += self.drain_worker_progress(progress_queue)
+                    for future in done:
+                        future.result()  # Re-raise worker errors on this thread
+            except Exception:
+                for future in pending:
+                    future.cancel()
+                raise
+
+        # Steps reported just before a worker returned can still be in flight
+        self.drain_worker_progress(progress_queue, expected_steps - received_steps)
+
+    def drain_worker_progress(self, progress_queue, expected=0):
+        """Report the steps workers finished since the last poll, waiting briefly for `expected` more"""
+        received = 0
+        while True:
+            try:
+                if received < expected:
+                    progress_queue.get(timeout=1)
+                else:
+                    progress_queue.get_nowait()
+            except queue.Empty:
+                return received
+            received += 1
+            self.advance_progress()
+
+    @staticmethod
+    def init_schedule_worker(settings, student_map, log_store, watermarks, progress_queue, cache_dir):
+        """Keep the shared inputs in each pool process so tasks only carry their schedule"""
+        # Spawned processes do not know the app's folder, so they read the parent's cache directory
+        SHEET_CACHE.cache_dir = cache_dir
+        SHEET_CACHE.read_only = True
+        ProcessThread.WORKER_STATE.update(settings=settings, student_map=student_map, log_store=log_store,
+                                          watermarks=watermarks, progress_queue=progress_queue)
+
+    @staticmethod
+    def run_schedule_job(schedule, output_dir, attendance_sheet_name, summary_sheet_name):
+        """Process one schedule inside a pool worker and return the saved report path"""
+        state = ProcessThread.WORKER_STATE
+        thread = ProcessThread(**state["settings"])
+        return thread.process_schedule(schedule, state["student_map"], state["log_store"], state["watermarks"],
+                                       output_dir, attendance_sheet_name, summary_sheet_name,
+                                       lambda: state["progress_queue"].put(1))
+
     def create_student_map(self, student_db):
         student_map = {}
         for row in student_db[1:]:
             if row[0]:
                 student_id = str(row[0])
-                email = f"{student_id}@med.asu.edu.eg"
-                student_map[student_id] = {
-                    "name": row[1],
-                    "year": row[2],
-                    "group": row[3],
-                    "email": email
-                }
+                student_map[student_id] = StudentRecord(student_id, row[1], row[2], row[3])
         return student_map
 
     def calculate_completed_sessions(self, session_schedule):
@@ -4657,10 +5153,88 @@ class ProcessThread(QThread):
     
         return required_attendance
 
-    def validate_attendance(self, log_history, session_schedule, student_map, target_year):
-        valid_attendance = {}
+    def watermark_records(self, log_reader, watermarks):
+        """Yield the log records, keeping the newest scan of each source in watermarks for the report checkpoint"""
+        for source, record in log_reader.sourced_records():
+            log_datetime = self.log_datetime(record)
+            if log_datetime is not None and (source not in watermarks or log_datetime > watermarks[source]):
+                watermarks[source] = log_datetime
+            yield record
+
+    def partition_log_history(self, log_records, student_map):
+        """Keep the log records of known students in a LogStore bucketed by year-group and log date"""
+        log_store = LogStore()
+        log_partitions = log_store.partitions
+        for row in log_records:
+            if len(row) >= 4:
+                student_id = str(row[0])
+                if student_id in student_map:
+                    log_date = row[4].date() if len(row) > 4 and isinstance(row[4], datetime) else self.get_log_date(row[2])
+                    if log_date is None:
+                        continue
+                    student = student_map[student_id]
+                    key = f"{student.year}-{student.group}"
+                    if key not in log_partitions:
+                        log_partitions[key] = {}
+                    if log_date not in log_partitions[key]:
+                        log_partitions[key][log_date] = array("I")
+                    log_partitions[key][log_date].append(log_store.append(row))
+        return log_store
+
+    def schedule_date_ranges(self, session_schedule):
+        """Map each of a schedule's groups to the first and last log date its sessions can match"""
+        date_ranges = {}
+        for row in session_schedule:
+            if len(row) >= 7:
+                key = f"{row[0]}-{row[1]}"
+                session_start = self.parse_datetime(row[5], row[6])
+                before_window, after_window = SessionIndex.session_window(session_start, self)
+                first_date = (session_start - before_window).date()
+                last_date = (session_start + after_window).date()
+                if key in date_ranges:
+                    first_date = min(first_date, date_ranges[key][0])
+                    last_date = max(last_date, date_ranges[key][1])
+                date_ranges[key] = (first_date, last_date)
+        return date_ranges
+
+    def schedule_date_span(self):
+        """Return the first and last log date any schedule can match, or (None, None) without sessions"""
+        date_ranges = []
+        for schedule in self.schedules:
+            session_schedule = SHEET_CACHE.read_rows(schedule[2], schedule[3])
+            date_ranges.extend(self.schedule_date_ranges(session_schedule[1:]).values())
+        if not date_ranges:
+            return None, None
+        return min(first for first, _ in date_ranges), max(last for _, last in date_ranges)
+
+    def select_log_partitions(self, log_header, log_store, session_schedule):
+        """Iterate a log history over the buckets a schedule's groups and dates cover, in log order"""
+        date_ranges = self.schedule_date_ranges(session_schedule)
+
+        selected_positions = []
+        for key, (first_date, last_date) in date_ranges.items():
+            for log_date, positions in log_store.partitions.get(key, {}).items():
+                if first_date <= log_date <= last_date:
+                    selected_positions.extend(positions)
+        selected_positions.sort()
+        # Rows are decoded one at a time as the validation walks them
+        return chain(log_header, (log_store[position] for position in selected_positions))
+
+    def get_log_date(self, value):
+        """Return the calendar date of a log entry, or None if it cannot be read"""
+        if isinstance(value, str):
+            try:
+                return DATETIME_PARSER.parse_date(value)
+            except ValueError:
+                return None
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return None
+
+    def build_session_map(self, session_schedule):
         session_map = {}
-        unique_logs = set()
 
         # Build a more detailed session map that includes all session info
         for row in session_schedule:
@@ -4683,8 +5257,25 @@ class ProcessThread(QThread):
                     "start_time": session_datetime
                 }
 
+        return session_map
+
+    def validate_attendance(self, log_history, session_schedule, student_map, target_year):
+        valid_attendance = {}
+        session_map = self.build_session_map(session_schedule)
+        unique_logs = set()
+
+        # Index the sessions so each log only bisects the sessions at its group, location and date
+        session_index = SessionIndex()
+        for key, sessions in session_map.items():
+            for session_info in sessions.values():
+                session_start = session_info["start_time"]
+                before_window, after_window = SessionIndex.session_window(session_start, self)
+                session_index.add(key, session_info["location"], session_start,
+                                  before_window, after_window, session_info)
+        session_index.build()
+
         # Process attendance logs
-        for row in log_history[1:]:
+        for row in islice(log_history, 1, None):
             if len(row) >= 4:
                 student_id, location, date, time = row[:4]
                 student_id = str(student_id)
@@ -4694,110 +5285,190 @@ class ProcessThread(QThread):
                     key = f"{student['year']}-{student['group']}"
                     
                     # Try to find matching session for this attendance log
-                    log_datetime = self.parse_datetime(date, time)
+                    log_datetime = self.log_datetime(row)
                     
-                    # Check all potential sessions for this year-group
-                    if key in session_map:
-                        for session_key, session_info in session_map[key].items():
-                            session_location = session_info["location"]
-                            session_start = session_info["start_time"]
+                    # Check only the sessions whose window contains this log, in schedule order
+                    for session_info in session_index.find(key, location, log_datetime):
+                        unique_log_key = f"{student_id}-{session_info['subject']}-{session_info['session_num']}-{location}-{date}"
+                        
+                        # Only count each unique session attendance once
+                        if unique_log_key not in unique_logs:
+                            unique_logs.add(unique_log_key)
                             
-                            # Only match logs from the same location as the session
-                            if location.lower() == session_location.lower():
-                                # Determine time window based on session start hour
-                                session_hour = session_start.hour
-                                if session_hour in self.EXCEPTION_HOURS:
-                                    before_window = timedelta(minutes=self.EXCEPTION_BEFORE_MINUTES)
-                                    after_window = timedelta(minutes=self.EXCEPTION_AFTER_MINUTES)
-                                else:
-                                    before_window = timedelta(minutes=self.STANDARD_BEFORE_MINUTES)
-                                    after_window = timedelta(minutes=self.STANDARD_AFTER_MINUTES)
+                            if key not in valid_attendance:
+                                valid_attendance[key] = []
                                 
-                                # Check if log time is within the allowed window
-                                if session_start - before_window <= log_datetime <= session_start + after_window:
-                                    unique_log_key = f"{student_id}-{session_info['subject']}-{session_info['session_num']}-{location}-{date}"
-                                    
-                                    # Only count each unique session attendance once
-                                    if unique_log_key not in unique_logs:
-                                        unique_logs.add(unique_log_key)
-                                        
-                                        if key not in valid_attendance:
-                                            valid_attendance[key] = []
-                                            
-                                        valid_attendance[key].append([
-                                            student_id, student['name'], student['year'],
-                                            student['group'], student['email'], session_info['subject'],
-                                            session_info['session_num'], location, date, time
-                                        ])
-                                        
-                                        # Found a match, no need to check other sessions
-                                        break
+                            valid_attendance[key].append([
+                                student_id, student['name'], student['year'],
+                                student['group'], student['email'], session_info['subject'],
+                                session_info['session_num'], location, date, time
+                            ])
+                            
+                            # Found a match, no need to check other sessions
+                            break
         
         return valid_attendance
 
+    def validate_attendance_vectorized(self, log_history, session_schedule, student_map, target_year):
+        """Pandas implementation of validate_attendance that returns the same valid_attendance dict"""
+        valid_attendance = {}
+        session_map = self.build_session_map(session_schedule)
+        # The merged Log Timestamp, when the log has one, is used instead of parsing the date and time
+        logs = [(*row[:4], row[4] if len(row) > 4 else None)
+                for row in islice(log_history, 1, None) if len(row) >= 4]
+        if not session_map or not student_map or not logs:
+            return valid_attendance
+
+        # Sessions table with one row for every date an attendance window touches
+        session_rows = []
+        session_order = 0
+        for key, sessions in session_map.items():
+            for session_info in sessions.values():
+                session_start = session_info["start_time"]
+                before_window, after_window = SessionIndex.session_window(session_start, self)
+                window_start = session_start - before_window
+                window_end = session_start + after_window
+                day = window_start.date()
+                while day <= window_end.date():
+                    session_rows.append((key, SessionIndex.normalize_location(session_info["location"]),
+                                         pd.Timestamp(day), window_start, window_end, session_order,
+                                         session_info["subject"], session_info["session_num"]))
+                    day += timedelta(days=1)
+                session_order += 1
+        sessions_df = pd.DataFrame(session_rows, columns=[
+            "group_key", "location_key", "log_day", "window_start", "window_end",
+            "session_order", "subject", "session_num"])
+        sessions_df[["subject", "session_num"]] = sessions_df[["subject", "session_num"]].astype(object)
+
+        # Join the logs to the students by ID, keeping the original log order
+        logs_df = pd.DataFrame(logs, columns=["raw_id", "location", "date", "time", "timestamp"], dtype=object)
+        logs_df["student_id"] = logs_df["raw_id"].map(str)
+        students_df = pd.DataFrame([student.values() for student in student_map.values()],
+                                   index=list(student_map), columns=StudentRecord.FIELDS, dtype=object)
+        students_df["group_key"] = students_df["year"].map(str) + "-" + students_df["group"].map(str)
+        logs_df = logs_df.join(students_df, on="student_id", how="inner")
+        if logs_df.empty:
+            return valid_attendance
+
+        logs_df["log_datetime"] = self.parse_datetime_series(logs_df["date"], logs_df["time"], logs_df["timestamp"])
+        logs_df["log_day"] = logs_df["log_datetime"].dt.normalize()
+        logs_df["location_key"] = logs_df["location"].map(SessionIndex.normalize_location)
+        logs_df["log_position"] = np.arange(len(logs_df))
+        logs_df = logs_df.dropna(subset=["location_key"])
+
+        # Interval join: same group, location and day, then keep logs inside the session window
+        candidates = logs_df.merge(sessions_df, on=["group_key", "location_key", "log_day"], how="inner")
+        candidates = candidates[(candidates["window_start"] <= candidates["log_datetime"]) &
+                                (candidates["log_datetime"] <= candidates["window_end"])]
+        candidates = candidates.sort_values(["log_position", "session_order"], kind="stable")
+        candidates["unique_key"] = (candidates["student_id"] + "-" + candidates["subject"].map(str) + "-" +
+                                    candidates["session_num"].map(str) + "-" + candidates["location"].map(str) +
+                                    "-" + candidates["date"].map(str))
+
+        if candidates["log_position"].duplicated().any():
+            # A log inside several windows takes the first session whose attendance is still uncounted
+            used_keys = set()
+            matched_logs = set()
+            keep = []
+            for position, unique_key in zip(candidates["log_position"], candidates["unique_key"]):
+                is_new = position not in matched_logs and unique_key not in used_keys
+                if is_new:
+                    used_keys.add(unique_key)
+                    matched_logs.add(position)
+                keep.append(is_new)
+            candidates = candidates[keep]
+        else:
+            # Only count each unique session attendance once
+            candidates = candidates.drop_duplicates(subset="unique_key", keep="first")
+
+        columns = ["student_id", "name", "year", "group", "email", "subject",
+                   "session_num", "location", "date", "time"]
+        for key, entry in zip(candidates["group_key"].tolist(),
+                              candidates[columns].to_numpy(dtype=object).tolist()):
+            if key not in valid_attendance:
+                valid_attendance[key] = []
+            valid_attendance[key].append(entry)
+
+        return valid_attendance
+
+    def parse_datetime_series(self, dates, times, timestamps=None):
+        """Vectorized log_datetime for pandas Series of log dates, times and merged Log Timestamps"""
+        log_datetimes = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+        has_timestamp = pd.Series(False, index=dates.index)
+        if timestamps is not None:
+            has_timestamp = timestamps.map(lambda value: isinstance(value, datetime))
+            log_datetimes[has_timestamp] = pd.to_datetime(timestamps[has_timestamp])
+        if has_timestamp.all():
+            return log_datetimes
+
+        # Each distinct date and time goes through the shared parser once, so every format it knows is read
+        date_codes, unique_dates = pd.factorize(dates[~has_timestamp])
+        log_days = pd.DatetimeIndex([
+            pd.Timestamp(DATETIME_PARSER.parse_date(value) if isinstance(value, str) else value).normalize()
+            for value in unique_dates])
+        time_codes, unique_times = pd.factorize(times[~has_timestamp])
+        time_offsets = pd.TimedeltaIndex([
+            pd.Timedelta(hours=value.hour, minutes=value.minute, seconds=value.second,
+                         microseconds=value.microsecond)
+            for value in (DATETIME_PARSER.parse_time(value) if isinstance(value, str) else value
+                          for value in unique_times)])
+        log_datetimes[~has_timestamp] = (log_days.take(date_codes, fill_value=pd.NaT)
+                                         + time_offsets.take(time_codes, fill_value=pd.NaT))
+        return log_datetimes
+
+    def log_datetime(self, row):
+        """Return a log row's date and time, taken from the merged Log Timestamp when the row has one"""
+        if len(row) > 4 and isinstance(row[4], datetime):
+            return row[4]
+        return self.parse_datetime(row[2], row[3])
+
     def parse_datetime(self, date, time):
         if isinstance(date, str):
-            date = datetime.strptime(date, '%d/%m/%Y').date()
+            date = DATETIME_PARSER.parse_date(date)
         if isinstance(time, str):
-            time = datetime.strptime(time, '%H:%M:%S').time()
+            time = DATETIME_PARSER.parse_time(time)
         return datetime.combine(date, time)
 
-    def create_valid_logs_sheet(self, workbook, sheet_name, data):
-        sheet = workbook.create_sheet(sheet_name)
+    def create_valid_logs_sheet(self, report, sheet_name, data):
         header = ["Student ID", "Name", "Year", "Group", "Email",
                   "Subject", "Session", "Location", "Date", "Time"]
-        sheet.append(header)
-
-        # Apply header formatting
-        for i, cell in enumerate(sheet[1]):
-            cell.font = Font(bold=True)
-            # Light gray background for all headers
-            cell.fill = PatternFill("solid", fgColor="D3D3D3")
-            cell.alignment = Alignment(
-                horizontal='center', vertical='center')  # Center align text
-
-            # Make the header row a bit taller
-            sheet.row_dimensions[1].height = 22
-
-        # Add freeze panes to keep header visible when scrolling
-        sheet.freeze_panes = 'C2'
-
-        row_num = 2  # Start from row 2 (after header)
+        rows = [header]
         for key in data:
-            for row_data in data[key]:
-                sheet.append(row_data)
-                row_num += 1
-
-        # Format date and time columns
-        for col in 'I', 'J':  # Adjusted to match the correct column letters for Date and Time
-            for cell in sheet[col]:
-                if isinstance(cell.value, (datetime, date)):
-                    cell.number_format = 'DD/MM/YYYY' if col == 'I' else 'HH:MM:SS'
-
-        # Improved auto-fit column widths
-        for col_idx, column in enumerate(sheet.columns, 1):
-            # Get maximum length in the column
-            max_length = 0
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-        
+            rows.extend(data[key])
+
+        # Improved auto-fit column widths, measured before any row is written
+        widths = {}
+        for col_idx, max_length in ReportWriter.column_lengths(rows).items():
             # Set column width with minimum and maximum limits
             if max_length > 0:
                 adjusted_width = min(max(max_length + 2, 12), 50)  # Min 12, Max 50
-            
+
                 # Special case for name column (typically column B)
                 if col_idx == 2:  # Name column
                     adjusted_width = max(adjusted_width, 25)  # Names need more space
-            
-                # Apply the calculated width
-                sheet.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = adjusted_width
-
-        # Add auto-filter to easily sort and filter data
-        sheet.auto_filter.ref = f"A1:{openpyxl.utils.get_column_letter(sheet.max_column)}{sheet.max_row}"
+                widths[col_idx] = adjusted_width
+
+        # Light gray, centered header row, a bit taller than the rest
+        header_style = report.add_style("Log Header", font=Font(bold=True),
+                                        fill=PatternFill("solid", fgColor="D3D3D3"),
+                                        alignment=Alignment(horizontal='center', vertical='center'))
+        date_style = report.add_style("Date Cell", number_format='DD/MM/YYYY')
+        time_style = report.add_style("Time Cell", number_format='HH:MM:SS')
+
+        # Freeze panes keep the header visible; the auto-filter makes the data easy to sort and filter
+        last_column = get_column_letter(max(len(row) for row in rows))
+        sheet = report.create_sheet(sheet_name, widths=widths, row_heights={1: 22}, freeze_panes='C2',
+                                    auto_filter=f"A1:{last_column}{len(rows)}")
+        report.append(sheet, header, dict.fromkeys(range(1, len(header) + 1), header_style))
+
+        for row_data in rows[1:]:
+            # Format date and time columns (I and J)
+            styles = {}
+            if len(row_data) > 8 and isinstance(row_data[8], (datetime, date)):
+                styles[9] = date_style
+            if len(row_data) > 9 and isinstance(row_data[9], (datetime, date)):
+                styles[10] = time_style
+            report.append(sheet, row_data, styles)
 
     def get_subject_color(self, subject_name):
         # Convert subject name to lowercase for case-insensitive matching
@@ -4818,9 +5489,41 @@ class ProcessThread(QThread):
             self.ATTENDANCE_THRESHOLD * total_required)
         return min_total_needed - total_attended
 
-    def create_summary_sheet(self, workbook, sheet_name, valid_attendance, required_attendance,
-                             student_map, target_year, completed_sessions, total_required_sessions):
-        sheet = workbook.create_sheet(sheet_name)
+    def index_attendance(self, valid_attendance):
+        """Aggregate valid attendance into per-student counters keyed by (year-group, student ID)"""
+        attendance_index = {}
+        for key, entries in valid_attendance.items():
+            for entry in entries:
+                student_key = (key, entry[0])
+                subject = entry[5]
+                session_num = entry[6]
+                location = entry[7]
+
+                if student_key not in attendance_index:
+                    attendance_index[student_key] = {"total": 0, "subjects": {}}
+                counters = attendance_index[student_key]
+
+                if subject not in counters["subjects"]:
+                    counters["subjects"][subject] = {
+                        "total": 0,
+                        "sessions": {}
+                    }
+                if session_num not in counters["subjects"][subject]["sessions"]:
+                    counters["subjects"][subject]["sessions"][session_num] = {
+                        "locations": {}
+                    }
+
+                counters["total"] += 1
+                counters["subjects"][subject]["total"] += 1
+                locations = counters["subjects"][subject]["sessions"][session_num]["locations"]
+                locations[location] = locations.get(location, 0) + 1
+        return attendance_index
+
+    def create_summary_sheet(self, report, sheet_name, valid_attendance, required_attendance,
+                             student_map, target_year, completed_sessions, total_required_sessions,
+                             attendance_index=None):
+        if attendance_index is None:
+            attendance_index = self.index_attendance(valid_attendance)
 
         # Collect all subjects and their sessions
         subjects = {}
@@ -4861,35 +5564,6 @@ class ProcessThread(QThread):
             # Record the column range for this subject
             subject_column_ranges[subject] = (start_col, current_col - 1)
 
-        sheet.append(header)
-
-        # Apply header formatting and colors
-        for i, cell in enumerate(sheet[1], 1):
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(
-                horizontal='center', vertical='center', wrap_text=True)
-
-            # Apply subject-specific coloring to subject headers
-            for subject, (start_idx, end_idx) in subject_column_ranges.items():
-                if start_idx <= i <= end_idx:
-                    subject_color = self.get_subject_color(subject)
-                    cell.fill = PatternFill(
-                        "solid", fgColor=subject_color["bg"])
-                    cell.font = Font(bold=True, color=subject_color["text"])
-                    break
-
-            # Apply gray background to basic columns
-            if i <= len(header) - len(subject_column_ranges):
-                if not cell.fill.fgColor.rgb:  # Only if no color was set
-                    cell.fill = PatternFill(
-                        "solid", fgColor="D3D3D3")  # Light gray
-
-        # Make the header row taller to accommodate wrapped text
-        sheet.row_dimensions[1].height = 40
-
-        # Add freeze panes to keep headers visible when scrolling
-        sheet.freeze_panes = 'C2'
-
         # Define status colors
         COLOR_PASS = "66E4A6"
         COLOR_FAIL = "FF4C4C"
@@ -4898,35 +5572,17 @@ class ProcessThread(QThread):
         COLOR_LOW_RISK = "FFF1A6"
         COLOR_NO_RISK = "3388D5"
 
+        rows = []
+        row_colors = []
         for student_id, student in student_map.items():
             if student['year'] == target_year:
                 key = f"{student['year']}-{student['group']}"
                 group_completed = completed_sessions.get(key, 0)
-                total_attended = 0
-                attendance_by_subject = {}
 
-                # Process attendance data
-                for entry in valid_attendance.get(key, []):
-                    if entry[0] == student_id:
-                        subject = entry[5]
-                        session_num = entry[6]
-                        location = entry[7]
-
-                        if subject not in attendance_by_subject:
-                            attendance_by_subject[subject] = {
-                                "total": 0,
-                                "sessions": {}
-                            }
-                        if session_num not in attendance_by_subject[subject]["sessions"]:
-                            attendance_by_subject[subject]["sessions"][session_num] = {
-                                "locations": {}
-                            }
-
-                        attendance_by_subject[subject]["total"] += 1
-                        if location not in attendance_by_subject[subject]["sessions"][session_num]["locations"]:
-                            attendance_by_subject[subject]["sessions"][session_num]["locations"][location] = 0
-                        attendance_by_subject[subject]["sessions"][session_num]["locations"][location] += 1
-                        total_attended += 1
+                # Read this student's counters from the attendance index
+                counters = attendance_index.get((key, student_id), {"total": 0, "subjects": {}})
+                total_attended = counters["total"]
+                attendance_by_subject = counters["subjects"]
 
                 # Calculate status and color
                 required_sessions = math.ceil(
@@ -4986,74 +5642,74 @@ class ProcessThread(QThread):
                                 session, {}).get("locations", {}).get(location, 0)
                             row.extend([req_count, att_count])
 
-                sheet.append(row)
-
-                # Apply cell formatting and colors for this row
-                row_idx = sheet.max_row
-
-                # Format status cell
-                status_cell = sheet.cell(row=row_idx, column=6)
-                status_cell.font = Font(bold=True)
-                status_cell.fill = PatternFill("solid", fgColor=color)
-                status_cell.alignment = Alignment(horizontal='center')
-
-                # Format percentage cell
-                percentage_cell = sheet.cell(row=row_idx, column=7)
-                percentage_cell.number_format = '0.0%'
-                percentage_cell.alignment = Alignment(horizontal='center')
-
-                # Apply subject-specific colors to the data cells
-                for subject, (start_col, end_col) in subject_column_ranges.items():
-                    subject_color = self.get_subject_color(subject)
-                    for col in range(start_col, end_col + 1):
-                        cell = sheet.cell(row=row_idx, column=col)
-                        # Apply a lighter version of the subject color for data cells
-                        bg_color = self.lighten_color(subject_color["bg"])
-                        cell.fill = PatternFill("solid", fgColor=bg_color)
-                        cell.alignment = Alignment(horizontal='center')
-
-        # Add auto-filter to easily sort and filter data
-        sheet.auto_filter.ref = f"A1:L{sheet.max_row}"
+                rows.append(row)
+                row_colors.append(color)
 
-        # Improved column width auto-fitting
+        # Improved column width auto-fitting, computed before any row is written
+        # Headers are word-wrapped, so consider both their total length and longest word
         column_widths = {}
-    
-        # First pass: Calculate max content length for each column
-        for row in sheet.iter_rows():
-            for cell in row:
-                col_letter = openpyxl.utils.get_column_letter(cell.column)
-                if cell.value:
-                    # For headers (row 1), calculate based on word-wrapped text
-                    if cell.row == 1:
-                        # Split header by spaces and find the longest word
-                        words = str(cell.value).split()
-                        if words:
-                            max_word_len = max(len(word) for word in words)
-                            # For headers, consider both total length and longest word
-                            header_width = min(max(max_word_len + 1, len(str(cell.value)) / 2), 30)
-                            column_widths[col_letter] = max(column_widths.get(col_letter, 0), header_width)
-                    else:
-                        # For data cells, use the full text length
-                        try:
-                            text_len = len(str(cell.value))
-                            column_widths[col_letter] = max(column_widths.get(col_letter, 0), text_len + 1)
-                        except:
-                            pass
-    
-        # Second pass: Apply calculated widths with constraints
-        for col_letter, width in column_widths.items():
-            col_idx = openpyxl.utils.column_index_from_string(col_letter)
-        
+        for col_idx, value in enumerate(header, 1):
+            words = str(value).split()
+            if words:
+                max_word_len = max(len(word) for word in words)
+                column_widths[col_idx] = min(max(max_word_len + 1, len(str(value)) / 2), 30)
+
+        # For data cells, use the full text length
+        for col_idx, text_len in ReportWriter.column_lengths(rows).items():
+            if text_len > 0:
+                column_widths[col_idx] = max(column_widths.get(col_idx, 0), text_len + 1)
+
+        # Apply calculated widths with constraints
+        for col_idx, width in column_widths.items():
             # Base width calculation
             adjusted_width = min(max(width, 10), 40)  # Min 10, Max 40
-        
+
             # Special case for specific columns
             if col_idx == 2:  # Name column
                 adjusted_width = max(adjusted_width, 25)  # Names need more space
             elif col_idx >= 13:  # Subject specific columns
                 adjusted_width = max(adjusted_width, 12)  # Subject columns need at least this width
-            
-            sheet.column_dimensions[col_letter].width = adjusted_width
+            column_widths[col_idx] = adjusted_width
+
+        # Header cells are bold and wrapped; subject headers take the subject colors
+        header_styles = dict.fromkeys(range(1, len(header) + 1), report.add_style(
+            "Summary Header", font=Font(bold=True),
+            alignment=Alignment(horizontal='center', vertical='center', wrap_text=True)))
+
+        # Data cells in subject columns get a lighter version of the subject color
+        subject_styles = {}
+        for subject, (start_col, end_col) in subject_column_ranges.items():
+            subject_color = self.get_subject_color(subject)
+            bg_color = self.lighten_color(subject_color["bg"])
+            subject_header_style = report.add_style(
+                f"Subject Header {subject_color['bg']} {subject_color['text']}", font=Font(bold=True, color=subject_color["text"]),
+                fill=PatternFill("solid", fgColor=subject_color["bg"]),
+                alignment=Alignment(horizontal='center', vertical='center', wrap_text=True))
+            subject_cell_style = report.add_style(
+                f"Subject Cell {bg_color}", fill=PatternFill("solid", fgColor=bg_color),
+                alignment=Alignment(horizontal='center'))
+            for col in range(start_col, end_col + 1):
+                header_styles[col] = subject_header_style
+                subject_styles[col] = subject_cell_style
+
+        # Status cells are colored by status; percentages are centered
+        percentage_style = report.add_style("Percentage Cell", number_format='0.0%',
+                                            alignment=Alignment(horizontal='center'))
+        status_row_styles = {}
+        for color in set(row_colors):
+            styles = dict(subject_styles)
+            styles[6] = report.add_style(f"Status {color}", font=Font(bold=True),
+                                         fill=PatternFill("solid", fgColor=color),
+                                         alignment=Alignment(horizontal='center'))
+            styles[7] = percentage_style
+            status_row_styles[color] = styles
+
+        # Taller header row for wrapped text, frozen panes and an auto-filter over the basic columns
+        sheet = report.create_sheet(sheet_name, widths=column_widths, row_heights={1: 40},
+                                    freeze_panes='C2', auto_filter=f"A1:L{len(rows) + 1}")
+        report.append(sheet, header, header_styles)
+        for row, color in zip(rows, row_colors):
+            report.append(sheet, row, status_row_styles[color])
 
     def lighten_color(self, hex_color, factor=0.75):
         """
@@ -5077,6 +5733,12 @@ class UpdateProcessThread(QThread):
     progress_updated = pyqtSignal(int)
     error_occurred = pyqtSignal(str)
     processing_complete = pyqtSignal()
+    log_signal = pyqtSignal(str)
+    
+    # Columns read back from the previous report; attendance entries keep the Attendance sheet's layout
+    SUMMARY_COLUMNS = ("Student ID", "Name", "Year", "Group", "Email")
+    ATTENDANCE_COLUMNS = ("Student ID", "Name", "Year", "Group", "Email",
+                          "Subject", "Session", "Location", "Date", "Time", "Validation Group")
 
     def __init__(self, ref_file, ref_sheet, log_file, log_sheet, schedules, 
                  attendance_threshold=0.75, prev_report_file=None):
@@ -5130,34 +5792,44 @@ class UpdateProcessThread(QThread):
                 self.error_occurred.emit("Could not determine the date of the previous report")
                 return
             
-            prev_report_wb = openpyxl.load_workbook(self.prev_report_file)
-            prev_summary_sheet = None
-            prev_attendance_sheet = None
-        
-            # Find the summary and attendance sheets
-            for sheet_name in prev_report_wb.sheetnames:
-                if "Summary" in sheet_name:
-                    prev_summary_sheet = prev_report_wb[sheet_name]
-                elif "Attendance" in sheet_name:
-                    prev_attendance_sheet = prev_report_wb[sheet_name]
-        
-            if not prev_summary_sheet or not prev_attendance_sheet:
-                self.error_occurred.emit("Could not find Summary or Attendance sheets in the previous report")
-                return
+            # A checkpoint written with the previous report replaces parsing the report back
+            checkpoint = ReportCheckpoint.load(self.prev_report_file)
+            if checkpoint is None:
+                # Only the values of the needed columns are read, streaming the report in read-only mode
+                prev_report = ReportReader(self.prev_report_file)
+                try:
+                    prev_summary_sheet = None
+                    prev_attendance_sheet = None
+        
+                    # Find the summary and attendance sheets
+                    for sheet_name in prev_report.sheetnames:
+                        if "Summary" in sheet_name:
+                            prev_summary_sheet = sheet_name
+                        elif "Attendance" in sheet_name:
+                            prev_attendance_sheet = sheet_name
+        
+                    if not prev_summary_sheet or not prev_attendance_sheet:
+                        self.error_occurred.emit("Could not find Summary or Attendance sheets in the previous report")
+                        return
+                    prev_summary_rows = prev_report.read_columns(prev_summary_sheet, self.SUMMARY_COLUMNS)
+                    prev_attendance_rows = prev_report.read_columns(prev_attendance_sheet, self.ATTENDANCE_COLUMNS)
+                finally:
+                    prev_report.close()
             
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
             # Step 2: Load reference data (current student information)
-            ref_wb = openpyxl.load_workbook(self.ref_file)
-            ref_ws = ref_wb[self.ref_sheet]
-            student_db = list(ref_ws.values)
+            student_db = SHEET_CACHE.read_rows(self.ref_file, self.ref_sheet)
             current_student_map = self.create_student_map(student_db)
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
             # Step 3: Create previous student map from the summary sheet
-            prev_student_map = self.extract_student_map_from_summary(prev_summary_sheet)
+            if checkpoint is not None:
+                prev_student_map = checkpoint["student_map"]
+            else:
+                prev_student_map = self.extract_student_map_from_summary(prev_summary_rows)
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
@@ -5167,14 +5839,35 @@ class UpdateProcessThread(QThread):
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
             # Step 5: Load log data
-            log_wb = openpyxl.load_workbook(self.log_file)
-            log_ws = log_wb[self.log_sheet]
-            log_history = list(log_ws.values)
+            # Only the Student ID, Location, Date and Time columns are read, in read-only mode
+            # Sessions before the previous report are kept as they were, so older partitions stay closed;
+            # the day before is still read for windows that cross midnight
+            log_reader = LogReader(self.log_file, self.log_sheet,
+                                   first_date=prev_report_date.date() - timedelta(days=1))
+            log_history = LogStore([log_reader.header])
+            # With a checkpoint a scan is new when it is after the watermark of its source, so a backup synced late
+            # still counts; a transferred student's scans are all kept, as a full run hands them to the transfer analysis
+            previous_watermarks = checkpoint["watermarks"] if checkpoint is not None else {}
+            watermarks = dict(previous_watermarks)
+            for source, record in log_reader.sourced_records():
+                log_datetime = self.log_datetime(record)
+                watermark = previous_watermarks.get(source)
+                if (watermark is not None and (log_datetime is None or log_datetime <= watermark)
+                        and record.student_id not in transferred_students):
+                    continue
+                log_history.append(record)
+                if log_datetime is not None and (source not in watermarks or log_datetime > watermarks[source]):
+                    watermarks[source] = log_datetime
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
             # Step 6: Extract previous attendance data 
-            prev_attendance_data = self.extract_attendance_data(prev_attendance_sheet)
+            if checkpoint is not None:
+                prev_attendance_data = checkpoint["attendance"]
+                prev_attendance_keys = checkpoint["dedup_keys"]
+            else:
+                prev_attendance_data = self.extract_attendance_data(prev_attendance_rows)
+                prev_attendance_keys = None
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
@@ -5185,9 +5878,7 @@ class UpdateProcessThread(QThread):
             # Step 7: Process each schedule and update attendance
             for year, module, sched_file, sched_sheet, total_required in self.schedules:
                 # Load schedule data
-                sched_wb = openpyxl.load_workbook(sched_file)
-                sched_ws = sched_wb[sched_sheet]
-                session_schedule = list(sched_ws.values)
+                session_schedule = SHEET_CACHE.read_rows(sched_file, sched_sheet)
                 current_step += 1
                 self.progress_updated.emit(int(current_step / total_steps * 100))
             
@@ -5198,8 +5889,8 @@ class UpdateProcessThread(QThread):
                         session_date = session[5]
                         if isinstance(session_date, str):
                             try:
-                                session_date = datetime.strptime(session_date, '%d/%m/%Y').date()
-                            except:
+                                session_date = DATETIME_PARSER.parse_date(session_date)
+                            except ValueError:
                                 continue
                         if hasattr(session_date, 'date'):
                             session_date = session_date.date()
@@ -5232,14 +5923,14 @@ class UpdateProcessThread(QThread):
             
                 # Combine previous and new attendance data
                 combined_attendance = self.combine_attendance_data(
-                    prev_attendance_data, new_valid_attendance, prev_report_date, transferred_students, transfer_data)
+                    prev_attendance_data, new_valid_attendance, prev_report_date, transferred_students, transfer_data,
+                    prev_attendance_keys)
             
                 current_step += 1
                 self.progress_updated.emit(int(current_step / total_steps * 100))
             
-                # Create output workbook and sheets
-                output_wb = openpyxl.Workbook()
-                output_wb.remove(output_wb.active)
+                # Create output workbook and sheets, streamed through a write-only report writer
+                report = ReportWriter()
             
                 # Add date to sheet names
                 current_date = datetime.now()
@@ -5248,14 +5939,14 @@ class UpdateProcessThread(QThread):
                 transfer_sheet_name = f"Transfers_{current_date.strftime('%d_%m_%Y')}"
             
                 # Create Summary sheet first, then Attendance sheet with combined data
-                self.create_summary_sheet(output_wb, summary_sheet_name, combined_attendance, 
+                self.create_summary_sheet(report, summary_sheet_name, combined_attendance, 
                                          required_attendance, current_student_map, transferred_students,
                                          transfer_data, f"Year {year}", completed_sessions, total_required)
             
-                self.create_valid_logs_sheet(output_wb, attendance_sheet_name, combined_attendance)
+                self.create_valid_logs_sheet(report, attendance_sheet_name, combined_attendance)
             
                 # New step: Create the transfer log sheet
-                self.create_transfer_log_sheet(output_wb, transfer_sheet_name, transferred_students, transfer_data)
+                self.create_transfer_log_sheet(report, transfer_sheet_name, transferred_students, transfer_data)
             
                 current_step += 1
                 self.progress_updated.emit(int(current_step / total_steps * 100))
@@ -5266,7 +5957,12 @@ class UpdateProcessThread(QThread):
                 os.makedirs(year_dir, exist_ok=True)
                 output_path = os.path.join(
                     year_dir, f"Y{year}_{module}_attendance_updated_{current_timestamp}.xlsx")
-                output_wb.save(output_path)
+                report.save(output_path)
+                
+                # Checkpoint for the next update: this report's attendance and students, and the newest scan per source
+                checkpoint_attendance, checkpoint_keys = self.checkpoint_attendance(combined_attendance)
+                ReportCheckpoint.save(output_path, checkpoint_attendance, checkpoint_keys,
+                                      self.summary_student_map(current_student_map, f"Year {year}"), watermarks)
                 current_step += 1
                 self.progress_updated.emit(int(current_step / total_steps * 100))
         
@@ -5274,6 +5970,10 @@ class UpdateProcessThread(QThread):
             current_step += 1
             self.progress_updated.emit(int(current_step / total_steps * 100))
         
+            self.log_signal.emit(f"Date/time parsing: {DATETIME_PARSER.describe_cache()}")
+            self.log_signal.emit(f"Sheet cache: {SHEET_CACHE.describe_cache()}")
+            for warning in SHEET_CACHE.take_warnings():
+                self.log_signal.emit(warning)
             self.processing_complete.emit()
         
         except Exception as e:
@@ -5312,52 +6012,21 @@ class UpdateProcessThread(QThread):
         for row in student_db[1:]:  # Skip header
             if row[0]:
                 student_id = str(row[0])
-                email = f"{student_id}@med.asu.edu.eg"
-                student_map[student_id] = {
-                    "name": row[1],
-                    "year": row[2],
-                    "group": row[3],
-                    "email": email
-                }
+                student_map[student_id] = StudentRecord(student_id, row[1], row[2], row[3])
         return student_map
     
-    def extract_student_map_from_summary(self, summary_sheet):
-        """Extract student information from the previous summary sheet"""
+    def extract_student_map_from_summary(self, summary_rows):
+        """Extract student information from the previous summary sheet's SUMMARY_COLUMNS rows"""
         student_map = {}
-        header_row = None
-        
-        # Find the header row
-        for row_idx, row in enumerate(summary_sheet.iter_rows(values_only=True)):
-            if row and "Student ID" in row:
-                header_row = row_idx + 1
-                break
-        
-        if not header_row:
-            return student_map
-            
-        # Find column indices
-        col_indices = {}
-        for col_idx, cell_value in enumerate(summary_sheet.iter_rows(min_row=header_row, max_row=header_row, values_only=True).__next__()):
-            if cell_value == "Student ID":
-                col_indices["id"] = col_idx
-            elif cell_value == "Name":
-                col_indices["name"] = col_idx
-            elif cell_value == "Year":
-                col_indices["year"] = col_idx
-            elif cell_value == "Group":
-                col_indices["group"] = col_idx
-            elif cell_value == "Email":
-                col_indices["email"] = col_idx
         
         # Extract student data
-        for row in summary_sheet.iter_rows(min_row=header_row+1, values_only=True):
-            if row and row[col_indices["id"]]:
-                student_id = str(row[col_indices["id"]])
-                student_map[student_id] = {
-                    "name": row[col_indices["name"]],
-                    "year": row[col_indices["year"]],
-                    "group": row[col_indices["group"]],
-                    "email": row[col_indices["email"]]
+        for student_id, name, year, group, email in summary_rows:
+            if student_id:
+                student_map[str(student_id)] = {
+                    "name": name,
+                    "year": year,
+                    "group": group,
+                    "email": email
                 }
         
         return student_map
@@ -5381,34 +6050,46 @@ class UpdateProcessThread(QThread):
         
         return transferred_students
     
-    def extract_attendance_data(self, attendance_sheet):
-        """Extract attendance data from the previous attendance sheet"""
+    @staticmethod
+    def checkpoint_attendance(combined_attendance):
+        """Entries as extract_attendance_data reads them back from the Attendance sheet, with their unique identifiers"""
         attendance_data = {}
-        header_row = None
-        
-        # Find the header row
-        for row_idx, row in enumerate(attendance_sheet.iter_rows(values_only=True)):
-            if row and "Student ID" in row:
-                header_row = row_idx + 1
-                break
-        
-        if not header_row:
-            return attendance_data
-        
-        # Extract attendance entries
-        for row in attendance_sheet.iter_rows(min_row=header_row+1, values_only=True):
-            if row and len(row) >= 10:  # Ensure all needed fields are present
-                student_id = str(row[0])
-                student_year = row[2]
-                student_group = row[3]
-                
-                key = f"{student_year}-{student_group}"
-                
+        attendance_keys = {}
+        for entries in combined_attendance.values():
+            for entry in entries:
+                # The sheet holds the 11 columns of its header
+                row = list(entry[:11]) + [None] * (11 - len(entry))
+                key = f"{row[2]}-{row[3]}"
                 if key not in attendance_data:
                     attendance_data[key] = []
-                
-                # Store the complete attendance entry
-                attendance_data[key].append(list(row))
+                    attendance_keys[key] = set()
+                attendance_data[key].append(row)
+                attendance_keys[key].add(UpdateProcessThread.attendance_key(row))
+        return attendance_data, attendance_keys
+    
+    @staticmethod
+    def summary_student_map(student_map, target_year):
+        """The students a summary sheet lists, as extract_student_map_from_summary reads them back"""
+        return {student_id: {"name": student["name"], "year": student["year"],
+                             "group": student["group"], "email": student["email"]}
+                for student_id, student in student_map.items() if target_year in str(student["year"])}
+    
+    def extract_attendance_data(self, attendance_rows):
+        """Extract attendance data from the previous attendance sheet's ATTENDANCE_COLUMNS rows"""
+        attendance_data = {}
+        
+        # Extract attendance entries
+        for row in attendance_rows:
+            student_year = row[2]
+            student_group = row[3]
+            
+            key = f"{student_year}-{student_group}"
+            
+            if key not in attendance_data:
+                attendance_data[key] = []
+            
+            # Store the complete attendance entry
+            attendance_data[key].append(list(row))
         
         return attendance_data
     
@@ -5460,39 +6141,38 @@ class UpdateProcessThread(QThread):
         """Analyze attendance patterns to determine when students were transferred"""
         transfer_data = {}
         
+        # Every group's sessions are indexed once per schedule, and each student's logs once per run
+        session_index = self.build_session_index(self.create_group_session_maps(session_schedule))
+        student_positions = log_history.student_positions()
+        
         for student_id, transfer_info in transferred_students.items():
             previous_group = transfer_info["previous_group"]
             current_group = transfer_info["current_group"]
             student_year = transfer_info["year"]
             
-            # Create session maps for both previous and current groups
+            # Keys of both previous and current groups in the session index
             prev_group_key = f"{student_year}-{previous_group}"
             current_group_key = f"{student_year}-{current_group}"
             
-            prev_group_sessions = self.create_session_map(session_schedule, prev_group_key)
-            current_group_sessions = self.create_session_map(session_schedule, current_group_key)
-            
-            # Get attendance records for this student
-            student_logs = []
-            for row in log_history[1:]:
-                if len(row) >= 4 and str(row[0]) == student_id:
-                    student_logs.append(row)
+            # Get attendance records for this student from the index; position 0 is the header row
+            student_logs = [log_history[position] for position in student_positions.get(student_id, ())
+                            if position > 0]
             
             # Sort logs by date and time
-            student_logs.sort(key=lambda x: self.parse_datetime(x[2], x[3]) if self.parse_datetime(x[2], x[3]) else datetime.min)
+            student_logs.sort(key=lambda x: self.log_datetime(x) or datetime.min)
             
             # Track which group's sessions the student attended
             attendance_pattern = []
             for log in student_logs:
-                log_datetime = self.parse_datetime(log[2], log[3])
+                log_datetime = self.log_datetime(log)
                 if not log_datetime:
                     continue
                     
                 location = log[1]
                 
                 # Check if this log matches a session in either group
-                prev_match = self.match_log_to_session(log, log_datetime, location, prev_group_sessions)
-                current_match = self.match_log_to_session(log, log_datetime, location, current_group_sessions)
+                prev_match = self.match_log_to_session(session_index, prev_group_key, location, log_datetime)
+                current_match = self.match_log_to_session(session_index, current_group_key, location, log_datetime)
                 
                 if prev_match and current_match:
                     # Both groups had a session at this time and location - ambiguous
@@ -5514,54 +6194,46 @@ class UpdateProcessThread(QThread):
         
         return transfer_data
     
-    def create_session_map(self, sessions, group_key):
-        """Create a map of sessions for a specific group"""
-        session_map = {}
+    def create_group_session_maps(self, sessions):
+        """Create the map of sessions of every group in one pass, keyed by year-group"""
+        group_maps = {}
         
         for session in sessions:
             if len(session) >= 7:  # Ensure we have all needed fields
                 year, group, subject, session_num, location, date, start_time = session[:7]
                 key = f"{year}-{group}"
                 
-                if key == group_key:
-                    session_datetime = self.parse_datetime(date, start_time)
-                    if not session_datetime:
-                        continue
-                        
-                    session_key = f"{location}-{date}-{start_time}"
+                session_datetime = self.parse_datetime(date, start_time)
+                if not session_datetime:
+                    continue
                     
-                    session_map[session_key] = {
-                        "subject": subject,
-                        "session_num": session_num,
-                        "location": location,
-                        "start_time": session_datetime,
-                        "date": date
-                    }
-        
-        return session_map
-    
-    def match_log_to_session(self, log, log_datetime, location, session_map):
-        """Check if a log matches any session in the given session map"""
-        for session_key, session_info in session_map.items():
-            session_location = session_info["location"]
-            session_start = session_info["start_time"]
-            
-            # Only match logs from the same location as the session
-            if location.lower() == session_location.lower():
-                # Determine time window based on session start hour
-                session_hour = session_start.hour
-                if session_hour in self.EXCEPTION_HOURS:
-                    before_window = timedelta(minutes=self.EXCEPTION_BEFORE_MINUTES)
-                    after_window = timedelta(minutes=self.EXCEPTION_AFTER_MINUTES)
-                else:
-                    before_window = timedelta(minutes=self.STANDARD_BEFORE_MINUTES)
-                    after_window = timedelta(minutes=self.STANDARD_AFTER_MINUTES)
+                session_key = f"{location}-{date}-{start_time}"
                 
-                # Check if log time is within the allowed window
-                if session_start - before_window <= log_datetime <= session_start + after_window:
-                    return True
+                if key not in group_maps:
+                    group_maps[key] = {}
+                group_maps[key][session_key] = {
+                    "subject": subject,
+                    "session_num": session_num,
+                    "location": location,
+                    "start_time": session_datetime,
+                    "date": date
+                }
         
-        return False
+        return group_maps
+    
+    def build_session_index(self, group_maps):
+        """Index {year-group: session map} by group, location and date, keeping each map's order"""
+        session_index = SessionIndex()
+        for group_key, session_map in group_maps.items():
+            for session_info in session_map.values():
+                before_window, after_window = SessionIndex.session_window(session_info["start_time"], self)
+                session_index.add(group_key, session_info["location"], session_info["start_time"],
+                                  before_window, after_window, session_info)
+        return session_index.build()
+    
+    def match_log_to_session(self, session_index, group_key, location, log_datetime):
+        """Check if a log falls inside the attendance window of any session of the group"""
+        return bool(session_index.find(group_key, location, log_datetime))
     
     def detect_transfer_point(self, attendance_pattern):
         """Detect the point at which a student consistently switched to the new group"""
@@ -5609,8 +6281,8 @@ class UpdateProcessThread(QThread):
                 session_date = date
                 if isinstance(session_date, str):
                     try:
-                        session_date = datetime.strptime(session_date, '%d/%m/%Y').date()
-                    except:
+                        session_date = DATETIME_PARSER.parse_date(session_date)
+                    except ValueError:
                         continue
                 if hasattr(session_date, 'date'):
                     session_date = session_date.date()
@@ -5637,8 +6309,11 @@ class UpdateProcessThread(QThread):
                     "date": date
                 }
 
+        # Window bounds are computed once per session and looked up by group, location and date
+        session_index = self.build_session_index(session_map)
+
         # Process attendance logs
-        for row in log_history[1:]:
+        for row in islice(log_history, 1, None):
             if len(row) >= 4:
                 student_id, location, date, time = row[:4]
                 student_id = str(student_id)
@@ -5647,8 +6322,8 @@ class UpdateProcessThread(QThread):
                 log_date = date
                 if isinstance(log_date, str):
                     try:
-                        log_date = datetime.strptime(log_date, '%d/%m/%Y').date()
-                    except:
+                        log_date = DATETIME_PARSER.parse_date(log_date)
+                    except ValueError:
                         continue
                 if hasattr(log_date, 'date'):
                     log_date = log_date.date()
@@ -5658,7 +6333,7 @@ class UpdateProcessThread(QThread):
             
                 if student_id in student_map:
                     student = student_map[student_id]
-                    log_datetime = self.parse_datetime(date, time)
+                    log_datetime = self.log_datetime(row)
                     if not log_datetime:
                         continue
                 
@@ -5681,95 +6356,90 @@ class UpdateProcessThread(QThread):
                     actual_key = f"{student['year']}-{student['group']}"
                     validation_key = f"{student['year']}-{group_to_use}"
                 
-                    # Check ONLY the selected group's sessions for validation
-                    if validation_key in session_map:
-                        for session_key, session_info in session_map[validation_key].items():
-                            session_location = session_info["location"]
-                            session_start = session_info["start_time"]
+                    # Check ONLY the selected group's sessions at this location whose window holds the log
+                    for session_info in session_index.find(validation_key, location, log_datetime):
+                        unique_log_key = f"{student_id}-{session_info['subject']}-{session_info['session_num']}-{location}-{date}"
+                    
+                        # Only count each unique session attendance once
+                        if unique_log_key not in unique_logs:
+                            unique_logs.add(unique_log_key)
                         
-                            # Only match logs from the same location as the session
-                            if location.lower() == session_location.lower():
-                                # Determine time window based on session start hour
-                                session_hour = session_start.hour
-                                if session_hour in self.EXCEPTION_HOURS:
-                                    before_window = timedelta(minutes=self.EXCEPTION_BEFORE_MINUTES)
-                                    after_window = timedelta(minutes=self.EXCEPTION_AFTER_MINUTES)
-                                else:
-                                    before_window = timedelta(minutes=self.STANDARD_BEFORE_MINUTES)
-                                    after_window = timedelta(minutes=self.STANDARD_AFTER_MINUTES)
+                            # Use the actual student group for storing the attendance
+                            if actual_key not in valid_attendance:
+                                valid_attendance[actual_key] = []
                             
-                                # Check if log time is within the allowed window
-                                if session_start - before_window <= log_datetime <= session_start + after_window:
-                                    unique_log_key = f"{student_id}-{session_info['subject']}-{session_info['session_num']}-{location}-{date}"
-                                
-                                    # Only count each unique session attendance once
-                                    if unique_log_key not in unique_logs:
-                                        unique_logs.add(unique_log_key)
-                                    
-                                        # Use the actual student group for storing the attendance
-                                        if actual_key not in valid_attendance:
-                                            valid_attendance[actual_key] = []
-                                        
-                                        # Store attendance record with information about which group was used for validation
-                                        valid_attendance[actual_key].append([
-                                            student_id, student['name'], student['year'],
-                                            student['group'], student['email'], session_info['subject'],
-                                            session_info['session_num'], location, date, time,
-                                            group_to_use  # Add which group's schedule was used for validation
-                                        ])
-                                    
-                                        # Found a match, no need to check other sessions
-                                        break
+                            # Store attendance record with information about which group was used for validation
+                            valid_attendance[actual_key].append([
+                                student_id, student['name'], student['year'],
+                                student['group'], student['email'], session_info['subject'],
+                                session_info['session_num'], location, date, time,
+                                group_to_use  # Add which group's schedule was used for validation
+                            ])
+                        
+                            # Found a match, no need to check other sessions
+                            break
     
         return valid_attendance
     
-    def combine_attendance_data(self, prev_attendance, new_attendance, prev_report_date, transferred_students, transfer_data):
+    def combine_attendance_data(self, prev_attendance, new_attendance, prev_report_date, transferred_students, transfer_data,
+                                prev_attendance_keys=None):
         """Combine previous and new attendance data, considering student transfers"""
         combined_attendance = {}
         
         # Add previous attendance data
         for key, entries in prev_attendance.items():
+            if not transferred_students:
+                # Nothing to change, so the previous rows are shared rather than copied
+                combined_attendance[key] = list(entries)
+                continue
             combined_attendance[key] = []
             for entry in entries:
                 # Add entries from previous attendance data
                 # If the student transferred, we need to retain the original validation group
                 student_id = str(entry[0]) if len(entry) > 0 else None
                 
-                if student_id and student_id in transferred_students:
-                    # Copy the entry and add the previous group as validation group if not present
+                if student_id and student_id in transferred_students and (len(entry) < 11 or entry[10] is None):
+                    # Copy the entry and add the previous group as validation group
                     new_entry = list(entry)
                     # Ensure we have space for the validation group
                     while len(new_entry) < 11:
                         new_entry.append(None)
-                    # Set validation group to previous group if not already set
-                    if new_entry[10] is None:
-                        new_entry[10] = transferred_students[student_id]["previous_group"]
+                    new_entry[10] = transferred_students[student_id]["previous_group"]
                     combined_attendance[key].append(new_entry)
                 else:
-                    # For non-transferred students, just add the entry as is
-                    combined_attendance[key].append(list(entry))
+                    # Every other entry is added as is
+                    combined_attendance[key].append(entry)
         
         # Add new attendance data, avoiding duplicates
         for key, entries in new_attendance.items():
             if key not in combined_attendance:
                 combined_attendance[key] = []
             
-            existing_entries = set()
-            # Create a set of unique identifiers for existing entries
-            for entry in combined_attendance[key]:
-                if len(entry) >= 10:
-                    unique_id = f"{entry[0]}-{entry[5]}-{entry[6]}-{entry[7]}-{entry[8]}"
-                    existing_entries.add(unique_id)
+            if prev_attendance_keys is not None:
+                # A checkpoint already holds the unique identifiers of the previous entries
+                existing_entries = prev_attendance_keys.get(key, set())
+            else:
+                # Create a set of unique identifiers for existing entries
+                existing_entries = {self.attendance_key(entry) for entry in combined_attendance[key] if len(entry) >= 10}
             
             # Add only new entries that don't already exist
             for entry in entries:
-                if len(entry) >= 10:
-                    unique_id = f"{entry[0]}-{entry[5]}-{entry[6]}-{entry[7]}-{entry[8]}"
-                    if unique_id not in existing_entries:
-                        combined_attendance[key].append(entry)
+                if len(entry) >= 10 and self.attendance_key(entry) not in existing_entries:
+                    combined_attendance[key].append(entry)
         
         return combined_attendance
     
+    @staticmethod
+    def attendance_key(entry):
+        """Unique identifier of an attendance entry: student, subject, session, location and date"""
+        return (str(entry[0]), entry[5], entry[6], entry[7], entry[8])
+    
+    def log_datetime(self, row):
+        """Return a log row's date and time, taken from the merged Log Timestamp when the row has one"""
+        if len(row) > 4 and isinstance(row[4], datetime):
+            return row[4]
+        return self.parse_datetime(row[2], row[3])
+
     def parse_datetime(self, date, time):
         """Parse date and time into a datetime object"""
         if not date or not time:
@@ -5777,91 +6447,70 @@ class UpdateProcessThread(QThread):
             
         if isinstance(date, str):
             try:
-                date = datetime.strptime(date, '%d/%m/%Y').date()
+                # Accepts DD/MM/YYYY and the YYYY-MM-DD alternative
+                date = DATETIME_PARSER.parse_date(date)
             except ValueError:
-                try:
-                    # Try alternative format
-                    date = datetime.strptime(date, '%Y-%m-%d').date()
-                except:
-                    return None
+                return None
         elif hasattr(date, 'date'):
             date = date.date()
             
         if isinstance(time, str):
             try:
-                time = datetime.strptime(time, '%H:%M:%S').time()
+                # Accepts HH:MM:SS and the HH:MM alternative
+                time = DATETIME_PARSER.parse_time(time)
             except ValueError:
-                try:
-                    # Try alternative format
-                    time = datetime.strptime(time, '%H:%M').time()
-                except:
-                    return None
+                return None
         elif hasattr(time, 'time'):
             time = time.time()
             
         return datetime.combine(date, time)
     
-    def create_valid_logs_sheet(self, workbook, sheet_name, data):
+    def create_valid_logs_sheet(self, report, sheet_name, data):
         """Create the attendance log sheet"""
-        sheet = workbook.create_sheet(sheet_name)
         header = ["Student ID", "Name", "Year", "Group", "Email",
                   "Subject", "Session", "Location", "Date", "Time", "Validation Group"]
-        sheet.append(header)
-
-        # Apply header formatting
-        for i, cell in enumerate(sheet[1]):
-            cell.font = Font(bold=True)
-            # Light gray background for all headers
-            cell.fill = PatternFill("solid", fgColor="D3D3D3")
-            cell.alignment = Alignment(
-                horizontal='center', vertical='center')  # Center align text
-
-            # Make the header row a bit taller
-            sheet.row_dimensions[1].height = 22
-
-        # Add freeze panes to keep header visible when scrolling
-        sheet.freeze_panes = 'C2'
-
-        row_num = 2  # Start from row 2 (after header)
+        rows = [header]
         for key in data:
             for row_data in data[key]:
                 # Ensure all entries have the same length
                 while len(row_data) < len(header):
                     row_data.append(None)
-                sheet.append(row_data[:len(header)])  # Only include up to the header length
-                row_num += 1
-
-        # Format date and time columns
-        for col in 'I', 'J':  # Columns for Date and Time
-            for cell in sheet[col]:
-                if isinstance(cell.value, (datetime, date)):
-                    cell.number_format = 'DD/MM/YYYY' if col == 'I' else 'HH:MM:SS'
-
-        # Improved auto-fit column widths
-        for col_idx, column in enumerate(sheet.columns, 1):
-            # Get maximum length in the column
-            max_length = 0
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-        
+                rows.append(row_data[:len(header)])  # Only include up to the header length
+
+        # Improved auto-fit column widths, measured before any row is written
+        widths = {}
+        for col_idx, max_length in ReportWriter.column_lengths(rows).items():
             # Set column width with minimum and maximum limits
             if max_length > 0:
                 adjusted_width = min(max(max_length + 2, 12), 50)  # Min 12, Max 50
-            
+
                 # Special case for name column (typically column B)
                 if col_idx == 2:  # Name column
                     adjusted_width = max(adjusted_width, 25)  # Names need more space
-            
-                # Apply the calculated width
-                sheet.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = adjusted_width
+                widths[col_idx] = adjusted_width
+
+        # Light gray, centered header row, a bit taller than the rest
+        header_style = report.add_style("Log Header", font=Font(bold=True),
+                                        fill=PatternFill("solid", fgColor="D3D3D3"),
+                                        alignment=Alignment(horizontal='center', vertical='center'))
+        date_style = report.add_style("Date Cell", number_format='DD/MM/YYYY')
+        time_style = report.add_style("Time Cell", number_format='HH:MM:SS')
+
+        # Freeze panes keep the header visible; the auto-filter makes the data easy to sort and filter
+        last_column = get_column_letter(max(len(row) for row in rows))
+        sheet = report.create_sheet(sheet_name, widths=widths, row_heights={1: 22}, freeze_panes='C2',
+                                    auto_filter=f"A1:{last_column}{len(rows)}")
+        report.append(sheet, header, dict.fromkeys(range(1, len(header) + 1), header_style))
+
+        for row_data in rows[1:]:
+            # Format date and time columns (I and J)
+            styles = {}
+            if isinstance(row_data[8], (datetime, date)):
+                styles[9] = date_style
+            if isinstance(row_data[9], (datetime, date)):
+                styles[10] = time_style
+            report.append(sheet, row_data, styles)
 
-        # Add auto-filter to easily sort and filter data
-        sheet.auto_filter.ref = f"A1:{openpyxl.utils.get_column_letter(sheet.max_column)}{sheet.max_row}"
-        
     def get_subject_color(self, subject_name):
         """Return background and text colors for a given subject"""
         # Convert subject name to lowercase for case-insensitive matching
@@ -5883,7 +6532,7 @@ class UpdateProcessThread(QThread):
             self.ATTENDANCE_THRESHOLD * total_required)
         return min_total_needed - total_attended
 
-    def create_summary_sheet(self, workbook, sheet_name, combined_attendance, required_attendance,
+    def create_summary_sheet(self, report, sheet_name, combined_attendance, required_attendance,
                                current_student_map, transferred_students, transfer_data, target_year, 
                                completed_sessions, total_required_sessions):
         """
@@ -5891,7 +6540,7 @@ class UpdateProcessThread(QThread):
         handling transferred students by validating their attendance against appropriate group schedules.
 
         Args:
-            workbook: The Excel workbook to add the sheet to
+            report: The ReportWriter to add the sheet to
             sheet_name: Name for the new sheet
             combined_attendance: Dictionary of attendance data from both previous and new reports
             required_attendance: Dictionary of required attendance data
@@ -5902,8 +6551,6 @@ class UpdateProcessThread(QThread):
             completed_sessions: Dictionary tracking completed sessions by year-group
             total_required_sessions: Total number of required sessions
         """
-        sheet = workbook.create_sheet(sheet_name)
-
         # Collect all subjects and their sessions
         subjects = {}
         for key, subject_data in required_attendance.items():
@@ -5943,35 +6590,6 @@ class UpdateProcessThread(QThread):
             # Record the column range for this subject
             subject_column_ranges[subject] = (start_col, current_col - 1)
 
-        sheet.append(header)
-
-        # Apply header formatting and colors
-        for i, cell in enumerate(sheet[1], 1):
-            cell.font = Font(bold=True)
-            cell.alignment = Alignment(
-                horizontal='center', vertical='center', wrap_text=True)
-
-            # Apply subject-specific coloring to subject headers
-            for subject, (start_idx, end_idx) in subject_column_ranges.items():
-                if start_idx <= i <= end_idx:
-                    subject_color = self.get_subject_color(subject)
-                    cell.fill = PatternFill(
-                        "solid", fgColor=subject_color["bg"])
-                    cell.font = Font(bold=True, color=subject_color["text"])
-                    break
-
-            # Apply gray background to basic columns
-            if i <= len(header) - len(subject_column_ranges):
-                if not cell.fill.fgColor.rgb:  # Only if no color was set
-                    cell.fill = PatternFill(
-                        "solid", fgColor="D3D3D3")  # Light gray
-
-        # Make the header row taller to accommodate wrapped text
-        sheet.row_dimensions[1].height = 40
-
-        # Add freeze panes to keep headers visible when scrolling
-        sheet.freeze_panes = 'C2'
-
         # Define status colors
         COLOR_PASS = "66E4A6"
         COLOR_FAIL = "FF4C4C"
@@ -5981,6 +6599,8 @@ class UpdateProcessThread(QThread):
         COLOR_NO_RISK = "3388D5"
 
         # Process each student in the target year
+        rows = []
+        row_colors = []
         for student_id, student in current_student_map.items():
             if target_year in str(student['year']):
                 # Get the current year-group key
@@ -6027,7 +6647,7 @@ class UpdateProcessThread(QThread):
                     if len(entry) > 8 and entry[8]:  # Date field
                         try:
                             if isinstance(entry[8], str):
-                                entry_date = datetime.strptime(entry[8], '%d/%m/%Y')
+                                entry_date = datetime.combine(DATETIME_PARSER.parse_date(entry[8]), datetime.min.time())
                             else:
                                 entry_date = entry[8]  # Assume it's already a datetime
                                 if hasattr(entry_date, 'date'):
@@ -6179,64 +6799,25 @@ class UpdateProcessThread(QThread):
                             att_count = subj_att.get("sessions", {}).get(session, {}).get("locations", {}).get(location, 0)
                             row.extend([req_count, att_count])
 
-                sheet.append(row)
-
-                # Apply cell formatting and colors for this row
-                row_idx = sheet.max_row
-
-                # Format status cell
-                status_cell = sheet.cell(row=row_idx, column=6)
-                status_cell.font = Font(bold=True)
-                status_cell.fill = PatternFill("solid", fgColor=color)
-                status_cell.alignment = Alignment(horizontal='center')
-
-                # Format percentage cell
-                percentage_cell = sheet.cell(row=row_idx, column=7)
-                percentage_cell.number_format = '0.0%'
-                percentage_cell.alignment = Alignment(horizontal='center')
-
-                # Apply subject-specific colors to the data cells
-                for subject, (start_col, end_col) in subject_column_ranges.items():
-                    subject_color = self.get_subject_color(subject)
-                    for col in range(start_col, end_col + 1):
-                        cell = sheet.cell(row=row_idx, column=col)
-                        # Apply a lighter version of the subject color for data cells
-                        bg_color = self.lighten_color(subject_color["bg"])
-                        cell.fill = PatternFill("solid", fgColor=bg_color)
-                        cell.alignment = Alignment(horizontal='center')
-
-        # Add auto-filter to easily sort and filter data
-        sheet.auto_filter.ref = f"A1:{openpyxl.utils.get_column_letter(len(header))}1"
+                rows.append(row)
+                row_colors.append(color)
 
-        # Improved column width auto-fitting
+        # Improved column width auto-fitting, computed before any row is written
+        # Headers are word-wrapped, so consider both their total length and longest word
         column_widths = {}
-
-        # First pass: Calculate max content length for each column
-        for row in sheet.iter_rows():
-            for cell in row:
-                col_letter = openpyxl.utils.get_column_letter(cell.column)
-                if cell.value:
-                    # For headers (row 1), calculate based on word-wrapped text
-                    if cell.row == 1:
-                        # Split header by spaces and find the longest word
-                        words = str(cell.value).split()
-                        if words:
-                            max_word_len = max(len(word) for word in words)
-                            # For headers, consider both total length and longest word
-                            header_width = min(max(max_word_len + 1, len(str(cell.value)) / 2), 30)
-                            column_widths[col_letter] = max(column_widths.get(col_letter, 0), header_width)
-                    else:
-                        # For data cells, use the full text length
-                        try:
-                            text_len = len(str(cell.value))
-                            column_widths[col_letter] = max(column_widths.get(col_letter, 0), text_len + 1)
-                        except:
-                            pass
-
-        # Second pass: Apply calculated widths with constraints
-        for col_letter, width in column_widths.items():
-            col_idx = openpyxl.utils.column_index_from_string(col_letter)
-
+        for col_idx, value in enumerate(header, 1):
+            words = str(value).split()
+            if words:
+                max_word_len = max(len(word) for word in words)
+                column_widths[col_idx] = min(max(max_word_len + 1, len(str(value)) / 2), 30)
+
+        # For data cells, use the full text length
+        for col_idx, text_len in ReportWriter.column_lengths(rows).items():
+            if text_len > 0:
+                column_widths[col_idx] = max(column_widths.get(col_idx, 0), text_len + 1)
+
+        # Apply calculated widths with constraints
+        for col_idx, width in column_widths.items():
             # Base width calculation
             adjusted_width = min(max(width, 10), 40)  # Min 10, Max 40
 
@@ -6245,73 +6826,96 @@ class UpdateProcessThread(QThread):
                 adjusted_width = max(adjusted_width, 25)  # Names need more space
             elif col_idx >= 13:  # Subject specific columns
                 adjusted_width = max(adjusted_width, 12)  # Subject columns need at least this width
-    
-            sheet.column_dimensions[col_letter].width = adjusted_width
-
-    def create_transfer_log_sheet(self, workbook, sheet_name, transferred_students, transfer_data):
+            column_widths[col_idx] = adjusted_width
+
+        # Header cells are bold and wrapped; subject headers take the subject colors
+        header_styles = dict.fromkeys(range(1, len(header) + 1), report.add_style(
+            "Summary Header", font=Font(bold=True),
+            alignment=Alignment(horizontal='center', vertical='center', wrap_text=True)))
+
+        # Data cells in subject columns get a lighter version of the subject color
+        subject_styles = {}
+        for subject, (start_col, end_col) in subject_column_ranges.items():
+            subject_color = self.get_subject_color(subject)
+            bg_color = self.lighten_color(subject_color["bg"])
+            subject_header_style = report.add_style(
+                f"Subject Header {subject_color['bg']} {subject_color['text']}", font=Font(bold=True, color=subject_color["text"]),
+                fill=PatternFill("solid", fgColor=subject_color["bg"]),
+                alignment=Alignment(horizontal='center', vertical='center', wrap_text=True))
+            subject_cell_style = report.add_style(
+                f"Subject Cell {bg_color}", fill=PatternFill("solid", fgColor=bg_color),
+                alignment=Alignment(horizontal='center'))
+            for col in range(start_col, end_col + 1):
+                header_styles[col] = subject_header_style
+                subject_styles[col] = subject_cell_style
+
+        # Status cells are colored by status; percentages are centered
+        percentage_style = report.add_style("Percentage Cell", number_format='0.0%',
+                                            alignment=Alignment(horizontal='center'))
+        status_row_styles = {}
+        for color in set(row_colors):
+            styles = dict(subject_styles)
+            styles[6] = report.add_style(f"Status {color}", font=Font(bold=True),
+                                         fill=PatternFill("solid", fgColor=color),
+                                         alignment=Alignment(horizontal='center'))
+            styles[7] = percentage_style
+            status_row_styles[color] = styles
+
+        # Taller header row for wrapped text, frozen panes and an auto-filter over the basic columns
+        sheet = report.create_sheet(sheet_name, widths=column_widths, row_heights={1: 40},
+                                    freeze_panes='C2', auto_filter=f"A1:{get_column_letter(len(header))}1")
+        report.append(sheet, header, header_styles)
+        for row, color in zip(rows, row_colors):
+            report.append(sheet, row, status_row_styles[color])
+
+    def create_transfer_log_sheet(self, report, sheet_name, transferred_students, transfer_data):
         """Create a sheet that logs all student transfers with their dates"""
-        sheet = workbook.create_sheet(sheet_name)
-    
         # Create header
         header = ["Student ID", "Name", "Year", "Group Before", "Group After", "Transfer Date"]
-        sheet.append(header)
-    
-        # Apply header formatting
-        for i, cell in enumerate(sheet[1]):
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill("solid", fgColor="D3D3D3")  # Light gray background
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-    
-        # Make the header row a bit taller
-        sheet.row_dimensions[1].height = 22
-    
-        # Add freeze panes to keep header visible when scrolling
-        sheet.freeze_panes = 'C2'
-    
+        rows = [header]
+
         # Add data for each transferred student
         for student_id, transfer_info in transferred_students.items():
             transfer_date = transfer_data.get(student_id, {}).get("transfer_date")
             formatted_date = ""
             if transfer_date:
                 formatted_date = transfer_date.strftime('%d/%m/%Y %H:%M')
-        
-            row = [
+
+            rows.append([
                 student_id,
                 transfer_info["name"],
                 transfer_info["year"],
                 transfer_info["previous_group"],
                 transfer_info["current_group"],
                 formatted_date
-            ]
-            sheet.append(row)
-    
-        # Format date column
-        for cell in sheet["F"][1:]:  # Format transfer date column
-            if isinstance(cell.value, datetime):
-                cell.number_format = 'DD/MM/YYYY HH:MM'
-    
-        # Auto-fit column widths
-        for col_idx, column in enumerate(sheet.columns, 1):
-            max_length = 0
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-        
+            ])
+
+        # Auto-fit column widths before any row is written
+        widths = {}
+        for col_idx, max_length in ReportWriter.column_lengths(rows).items():
             if max_length > 0:
                 adjusted_width = min(max(max_length + 2, 12), 50)  # Min 12, Max 50
-            
+
                 # Special case for name column (typically column B)
                 if col_idx == 2:  # Name column
                     adjusted_width = max(adjusted_width, 25)  # Names need more space
-            
-                # Apply the calculated width
-                sheet.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = adjusted_width
-    
-        # Add auto-filter
-        sheet.auto_filter.ref = f"A1:{openpyxl.utils.get_column_letter(sheet.max_column)}{sheet.max_row}"
+                widths[col_idx] = adjusted_width
+
+        # Light gray, centered header row, a bit taller than the rest
+        header_style = report.add_style("Log Header", font=Font(bold=True),
+                                        fill=PatternFill("solid", fgColor="D3D3D3"),
+                                        alignment=Alignment(horizontal='center', vertical='center'))
+        transfer_date_style = report.add_style("Transfer Date Cell", number_format='DD/MM/YYYY HH:MM')
+
+        # Freeze panes keep the header visible; add auto-filter
+        last_column = get_column_letter(len(header))
+        sheet = report.create_sheet(sheet_name, widths=widths, row_heights={1: 22}, freeze_panes='C2',
+                                    auto_filter=f"A1:{last_column}{len(rows)}")
+        report.append(sheet, header, dict.fromkeys(range(1, len(header) + 1), header_style))
+
+        for row in rows[1:]:
+            # Format transfer date column
+            report.append(sheet, row, {6: transfer_date_style} if isinstance(row[5], datetime) else None)
 
     def lighten_color(self, hex_color, factor=0.75):
         """
@@ -7146,6 +7750,8 @@ class MainApplication(QMainWindow):
 
 
 if __name__ == '__main__':
+    # Lets the frozen executable start schedule worker processes
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     window = MainApplication()
@@ -0,0 +1,1333 @@
+#==========================================================imports and constants==========================================================#
+# Parsing, caching, report and download classes used by both the faculty and the department app
+import sys
+import re
+import atexit
+import pandas as pd
+import numpy as np
+import os
+import requests
+import json
+import csv
+import sqlite3
+import threading
+import hashlib
+import importlib.util
+import time
+import bisect
+from array import array
+from collections import namedtuple
+from datetime import datetime, timedelta, date, time as dt_time
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import math
+import openpyxl
+from openpyxl.styles import NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+#==========================================================log download and merge==========================================================#
+
+class StageMetrics:
+    """Timing events for the stages of a download or merge, shown as they happen and saved as JSON lines"""
+
+    METRICS_FILE = "pipeline_metrics.jsonl"
+
+    def __init__(self, run_name, emit=None):
+        self.run_name = run_name
+        self.run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # Called with every event, e.g. a worker's metrics signal
+        self.emit = emit
+        self.events = []
+
+    def record(self, stage, elapsed, rows=0, bytes_count=0, **details):
+        """Store one stage's event; rows/s is left empty for stages that handle no rows"""
+        event = {
+            "run": self.run_name,
+            "run_id": self.run_id,
+            "stage": stage,
+            "elapsed": round(elapsed, 4),
+            "rows": int(rows),
+            "bytes": int(bytes_count),
+            "rows_per_second": round(rows / elapsed, 1) if rows and elapsed > 0 else None
+        }
+        event.update(details)
+        self.events.append(event)
+        if self.emit is not None:
+            self.emit(event)
+        return event
+
+    @staticmethod
+    def describe(event):
+        """One console line per event, e.g. 'concat: 3168 rows, 0.4 MB in 0.021 s (150857 rows/s)'"""
+        label = f"{event['stage']} {event['file']}" if event.get("file") else event["stage"]
+        # Listing and downloading count files rather than rows
+        count = f"{event['files']} files" if not event["rows"] and "files" in event else f"{event['rows']} rows"
+        text = f"{label}: {count}, {event['bytes'] / (1024 * 1024):.1f} MB in {event['elapsed']:.3f} s"
+        if event["rows_per_second"] is not None:
+            text += f" ({event['rows_per_second']:.0f} rows/s)"
+        return text
+
+    def save(self, metrics_file):
+        """Append this run's events to the metrics file, one JSON object per line"""
+        if not self.events:
+            return
+        os.makedirs(os.path.dirname(metrics_file), exist_ok=True)
+        with open(metrics_file, "a", encoding="utf-8") as f:
+            for event in self.events:
+                f.write(json.dumps(event, default=str) + "\n")
+
+class BackupDownloader:
+    """Downloads backup files concurrently over one pooled session, skipping files whose sha is unchanged"""
+
+    MANIFEST_NAME = "backup_manifest.json"
+
+    def __init__(self, token=None, api_url="https://api.github.com", max_workers=4, chunk_size=1024 * 1024):
+        self.api_url = api_url.rstrip('/')
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.session = requests.Session()
+        # One connection per download thread, reused across files
+        adapter = requests.adapters.HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+
+    def load_manifest(self, target_dir):
+        try:
+            with open(os.path.join(target_dir, self.MANIFEST_NAME), "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = {}
+        manifest.setdefault("files", {})
+        manifest.setdefault("listings", {})
+        return manifest
+
+    def save_manifest(self, target_dir, manifest):
+        manifest_path = os.path.join(target_dir, self.MANIFEST_NAME)
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def fetch_tree(self, owner, repo, tree_sha, recursive=False, headers=None):
+        """Request one git tree; the trees API lists a whole subtree in a single response when recursive"""
+        tree_url = f"{self.api_url}/repos/{owner}/{repo}/git/trees/{tree_sha}"
+        params = {'recursive': '1'} if recursive else None
+        response = self.session.get(tree_url, params=params, headers=headers)
+        if response.status_code not in (200, 304):
+            raise RuntimeError(f"Error accessing repository: {response.status_code}, {response.text}")
+        return response
+
+    def walk_tree(self, owner, repo, path):
+        """List every entry below path when the recursive listing of the whole repository was truncated"""
+        tree_sha = "HEAD"
+        for part in path.strip('/').split('/'):
+            entries = self.fetch_tree(owner, repo, tree_sha).json()['tree']
+            tree_sha = next((entry['sha'] for entry in entries
+                             if entry['path'] == part and entry['type'] == 'tree'), None)
+            if tree_sha is None:
+                return []
+
+        # Try each subtree recursively first and only split it level by level if that is truncated too
+        entries = []
+        pending = [(path.strip('/'), tree_sha)]
+        while pending:
+            prefix, tree_sha = pending.pop()
+            tree = self.fetch_tree(owner, repo, tree_sha, recursive=True).json()
+            truncated = tree.get('truncated')
+            if truncated:
+                tree = self.fetch_tree(owner, repo, tree_sha).json()
+            for entry in tree['tree']:
+                entry = dict(entry, path=f"{prefix}/{entry['path']}")
+                if truncated and entry['type'] == 'tree':
+                    pending.append((entry['path'], entry['sha']))
+                else:
+                    entries.append(entry)
+        return entries
+
+    def list_backups(self, owner, repo, manifest, path="backups"):
+        """List the Excel files under the backups path from one recursive tree request, revalidated by ETag"""
+        listing_key = f"{self.api_url}/repos/{owner}/{repo}/git/trees/HEAD?recursive=1#{path}"
+        cached = manifest["listings"].get(listing_key)
+        headers = {'If-None-Match': cached['etag']} if cached and cached.get('etag') else {}
+
+        response = self.fetch_tree(owner, repo, "HEAD", recursive=True, headers=headers)
+        if response.status_code == 304:
+            return cached['items']
+
+        tree = response.json()
+        entries = tree['tree']
+        if tree.get('truncated'):
+            entries = self.walk_tree(owner, repo, path)
+
+        prefix = path.strip('/') + '/'
+        items = []
+        for entry in entries:
+            if entry['type'] != 'blob' or not entry['path'].startswith(prefix):
+                continue
+            if entry['path'].endswith('.xlsx') or entry['path'].endswith('.xls'):
+                items.append({'name': entry['path'][len(prefix):], 'sha': entry['sha'],
+                              'download_url': f"{self.api_url}/repos/{owner}/{repo}/git/blobs/{entry['sha']}"})
+        items.sort(key=lambda item: item['name'])
+        manifest["listings"][listing_key] = {'etag': response.headers.get('ETag'), 'items': items}
+        return items
+
+    def download_file(self, item, target_dir, manifest):
+        """Fetch one file unless the local copy matches its sha; returns (item, file path, status)"""
+        file_path = os.path.join(target_dir, item['name'])
+        if item.get('sha') and manifest["files"].get(item['name']) == item['sha'] and os.path.exists(file_path):
+            return item, file_path, "unchanged"
+
+        # Stream to a temporary file so an interrupted download never replaces a good copy
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.part"
+        try:
+            # The blobs API returns the raw file content when asked for the raw media type
+            with self.session.get(item['download_url'], stream=True,
+                                  headers={'Accept': 'application/vnd.github.raw'}) as response:
+                if response.status_code != 200:
+                    return item, None, f"failed ({response.status_code})"
+                with open(temp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        f.write(chunk)
+            os.replace(temp_path, file_path)
+        except (requests.RequestException, OSError) as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return item, None, f"failed ({e})"
+        return item, file_path, "downloaded"
+
+    def download_all(self, items, target_dir, manifest):
+        """Download the files on a bounded thread pool, yielding (item, file path, status) as each finishes"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.download_file, item, target_dir, manifest) for item in items]
+            for future in as_completed(futures):
+                item, file_path, status = future.result()
+                if status == "downloaded" and item.get('sha'):
+                    manifest["files"][item['name']] = item['sha']
+                yield item, file_path, status
+
+    def close(self):
+        self.session.close()
+
+class MergeStore:
+    """SQLite table of the scans of the files last merged, so a merge only parses and appends new or changed files.
+
+    Every row is tagged with the file it came from, and the table is itself a log source. The rows of a file
+    that changed or is no longer selected are deleted, so the table always holds exactly the selected files.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    DATABASE_NAME = "merged_logs.db"
+    # Stores of an older version are emptied and rebuilt by the next merge
+    VERSION = 2
+    SCAN_COLUMNS = ["Student ID", "Location", "Log Date", "Log Time"]
+    # Absolute path of the file each row came from; never part of an export
+    SOURCE_COLUMN = "Store_Source"
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.db_path = os.path.join(store_dir, self.DATABASE_NAME)
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            with open(os.path.join(self.store_dir, self.MANIFEST_NAME), "r", encoding="utf-8") as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            manifest = {}
+        if manifest.get("version") != self.VERSION:
+            # Without the version no source is current, so every file is parsed again and the old rows are deleted
+            manifest = {"version": self.VERSION}
+        # "files" memoizes content hashes by size and mtime, "sources" lists the files appended to the table
+        manifest.setdefault("files", {})
+        manifest.setdefault("sources", {})
+        return manifest
+
+    def save_manifest(self):
+        os.makedirs(self.store_dir, exist_ok=True)
+        manifest_path = os.path.join(self.store_dir, self.MANIFEST_NAME)
+        temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(self.manifest, manifest_file, indent=2)
+        os.replace(temp_path, manifest_path)
+
+    def is_current(self, file_path):
+        """Return True when the file was appended before and its contents are unchanged"""
+        source = self.manifest["sources"].get(os.path.abspath(file_path))
+        if source is None or not os.path.exists(self.db_path):
+            return False
+        try:
+            return SheetCache.content_hash(file_path, self.manifest["files"]) == source["hash"]
+        except OSError:
+            return False
+
+    def connect(self):
+        """Open the store, creating the scan table and its source index on first use"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        table = LogSource.quote_name(LogSource.DEFAULT_TABLE)
+        source = LogSource.quote_name(self.SOURCE_COLUMN)
+        scan_columns = ", ".join(LogSource.quote_name(col) for col in self.SCAN_COLUMNS)
+        # Columns are declared without a type so IDs keep the type they were merged with
+        connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({scan_columns}, {source})")
+        # Stores of the first version kept one row per distinct scan and had no source column
+        connection.execute("DROP INDEX IF EXISTS scans")
+        if self.SOURCE_COLUMN not in {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {source}")
+        connection.execute(f"CREATE INDEX IF NOT EXISTS sources ON {table} ({source})")
+        return connection
+
+    @staticmethod
+    def encode_rows(df):
+        """Yield the rows of a frame as SQLite values, with dates and times spelled out as LogSource reads them"""
+        for row in df.itertuples(index=False, name=None):
+            yield tuple(LogSource.text_value(LogSource.decode_value(value)) for value in row)
+
+    def keep_sources(self, file_paths):
+        """Delete the scans of every file but the given ones, and forget those files; returns the scans deleted"""
+        kept = {os.path.abspath(file_path) for file_path in file_paths}
+        connection = self.connect()
+        try:
+            table = LogSource.quote_name(LogSource.DEFAULT_TABLE)
+            source = LogSource.quote_name(self.SOURCE_COLUMN)
+            stored = [row[0] for row in connection.execute(f"SELECT DISTINCT {source} FROM {table}")]
+            changes_before = connection.total_changes
+            for path in stored:
+                if path is None:
+                    connection.execute(f"DELETE FROM {table} WHERE {source} IS NULL")
+                elif path not in kept:
+                    connection.execute(f"DELETE FROM {table} WHERE {source} = ?", (path,))
+            removed = connection.total_changes - changes_before
+            connection.commit()
+        finally:
+            connection.close()
+
+        for path in [path for path in self.manifest["sources"] if path not in kept]:
+            del self.manifest["sources"][path]
+            self.manifest["files"].pop(path, None)
+        self.save_manifest()
+        return removed
+
+    def append(self, df, row_sources, sources):
+        """Insert the scans of freshly parsed files and record the files.
+
+        row_sources names the file of each row of df. sources maps each parsed file to its row count and
+        sheet columns, including files whose sheets were all empty.
+        """
+        connection = self.connect()
+        try:
+            if df is not None and not df.empty:
+                table = LogSource.quote_name(LogSource.DEFAULT_TABLE)
+                known = {row[1] for row in connection.execute(f"PRAGMA table_info({table})")}
+                for col in df.columns:
+                    if col not in known:
+                        connection.execute(f"ALTER TABLE {table} ADD COLUMN {LogSource.quote_name(col)}")
+                columns = ", ".join(LogSource.quote_name(col) for col in list(df.columns) + [self.SOURCE_COLUMN])
+                placeholders = ", ".join("?" for _ in range(len(df.columns) + 1))
+                connection.executemany(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                                       (row + (os.path.abspath(file_path),)
+                                        for row, file_path in zip(self.encode_rows(df), row_sources)))
+            connection.commit()
+        finally:
+            connection.close()
+
+        # Recorded only once the scans are committed
+        for file_path, source in sources.items():
+            self.manifest["sources"][os.path.abspath(file_path)] = {
+                "hash": SheetCache.content_hash(file_path, self.manifest["files"]),
+                "rows": source["rows"],
+                "columns": source["columns"]
+            }
+        self.save_manifest()
+
+    def scan_count(self):
+        connection = self.connect()
+        try:
+            return connection.execute(
+                f"SELECT COUNT(*) FROM {LogSource.quote_name(LogSource.DEFAULT_TABLE)}").fetchone()[0]
+        finally:
+            connection.close()
+
+    def source_columns(self, file_paths):
+        """Return the sheet columns of the given stored files, in first-seen order"""
+        columns = {}
+        for file_path in file_paths:
+            source = self.manifest["sources"].get(os.path.abspath(file_path), {})
+            for col in source.get("columns", []):
+                columns.setdefault(col, None)
+        return list(columns)
+
+    def read_frame(self, file_paths):
+        """Load the stored scans of the given files, in file order, with the values a merged workbook would hold"""
+        rows = LogSource.read_rows(self.db_path, LogSource.DEFAULT_TABLE)
+        frame = pd.DataFrame(rows[1:], columns=list(rows[0]))
+        positions = {os.path.abspath(file_path): position for position, file_path in enumerate(file_paths)}
+        file_order = frame[self.SOURCE_COLUMN].map(positions)
+        frame = frame[file_order.notna()]
+        # Rows of one file keep the order they were inserted in
+        frame = frame.iloc[file_order[file_order.notna()].to_numpy().argsort(kind="stable")]
+        return frame.drop(columns=[self.SOURCE_COLUMN]).reset_index(drop=True)
+
+#==========================================================log processing==========================================================#
+
+class DateTimeParser:
+    """Memoized parser for the date and time strings found in logs, schedules and reports"""
+
+    DATE_FORMATS = ('%d/%m/%Y', '%Y-%m-%d')
+    TIME_FORMATS = ('%H:%M:%S', '%H:%M')
+
+    def __init__(self, max_dates=4096, max_times=65536):
+        # Logs only hold a few hundred distinct dates and a few thousand distinct times
+        self.parse_date = lru_cache(maxsize=max_dates)(self._parse_date)
+        self.parse_time = lru_cache(maxsize=max_times)(self._parse_time)
+
+    @staticmethod
+    def _parse_date(value):
+        # Fast path for DD/MM/YYYY without going through strptime
+        if len(value) == 10 and value[2] == '/' and value[5] == '/':
+            day, month, year = value[0:2], value[3:5], value[6:10]
+            if day.isdigit() and month.isdigit() and year.isdigit():
+                try:
+                    return date(int(year), int(month), int(day))
+                except ValueError:
+                    pass
+
+        for date_format in DateTimeParser.DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ValueError(f"time data {value!r} does not match any known date format")
+
+    @staticmethod
+    def _parse_time(value):
+        # Fast path for HH:MM:SS without going through strptime
+        if len(value) == 8 and value[2] == ':' and value[5] == ':':
+            hour, minute, second = value[0:2], value[3:5], value[6:8]
+            if hour.isdigit() and minute.isdigit() and second.isdigit():
+                try:
+                    return dt_time(int(hour), int(minute), int(second))
+                except ValueError:
+                    pass
+
+        for time_format in DateTimeParser.TIME_FORMATS:
+            try:
+                return datetime.strptime(value, time_format).time()
+            except ValueError:
+                continue
+        raise ValueError(f"time data {value!r} does not match any known time format")
+
+    def cache_stats(self):
+        """Return hit/miss counters and the hit rate of the date and time caches"""
+        stats = {}
+        for name, parser in (("date", self.parse_date), ("time", self.parse_time)):
+            info = parser.cache_info()
+            lookups = info.hits + info.misses
+            stats[name] = {
+                "hits": info.hits,
+                "misses": info.misses,
+                "size": info.currsize,
+                "hit_rate": info.hits / lookups if lookups else 0.0
+            }
+        return stats
+
+    def describe_cache(self):
+        stats = self.cache_stats()
+        return (f"date cache {stats['date']['hit_rate']:.1%} hits ({stats['date']['size']} entries), "
+                f"time cache {stats['time']['hit_rate']:.1%} hits ({stats['time']['size']} entries)")
+
+# Shared by every processing thread so the caches stay warm between runs
+DATETIME_PARSER = DateTimeParser()
+
+class CachedSheet:
+    """Typed columns of one cached sheet, decoded back to the values openpyxl would return"""
+
+    # Value kinds stored per cell; every kind present in a column gets its own typed array
+    KIND_NONE, KIND_INT, KIND_FLOAT, KIND_STR, KIND_DATETIME, KIND_DATE, KIND_TIME, KIND_TIMEDELTA, KIND_BOOL = range(9)
+
+    def __init__(self, arrays=None, rows=None):
+        """Wrap a dict of cached column arrays, or plain rows for a sheet holding values that cannot be cached"""
+        self.arrays = arrays
+        self.plain_rows = rows
+        if rows is not None:
+            self.row_count = len(rows)
+            self.width = max((len(row) for row in rows), default=0)
+        else:
+            self.row_count, self.width = (int(value) for value in arrays["shape"])
+
+    def column(self, col_idx):
+        """Decode one column into a list with one value per row"""
+        if self.plain_rows is not None:
+            return [row[col_idx] if col_idx < len(row) else None for row in self.plain_rows]
+        values = [None] * self.row_count
+        if col_idx >= self.width:
+            return values
+        kinds = self.arrays[f"c{col_idx}_kinds"]
+        for kind in np.unique(kinds).tolist():
+            if kind == self.KIND_NONE:
+                continue
+            decoded = self.arrays[f"c{col_idx}_k{kind}"].tolist()
+            if kind == self.KIND_TIME:
+                decoded = [dt_time(micros // 3600000000, micros // 60000000 % 60, micros // 1000000 % 60,
+                                   micros % 1000000) for micros in decoded]
+            for position, value in zip(np.flatnonzero(kinds == kind).tolist(), decoded):
+                values[position] = value
+        return values
+
+    def header(self):
+        """Decode only the first row"""
+        if self.plain_rows is not None:
+            return tuple(self.plain_rows[0]) if self.plain_rows else ()
+        header = []
+        for col_idx in range(self.width):
+            kind = int(self.arrays[f"c{col_idx}_kinds"][0]) if self.row_count else self.KIND_NONE
+            if kind == self.KIND_NONE:
+                header.append(None)
+                continue
+            value = self.arrays[f"c{col_idx}_k{kind}"][0].item()
+            if kind == self.KIND_TIME:
+                value = dt_time(value // 3600000000, value // 60000000 % 60, value // 1000000 % 60, value % 1000000)
+            header.append(value)
+        return tuple(header)
+
+    def rows(self):
+        """Decode the whole sheet into row tuples, like list(worksheet.values)"""
+        if self.plain_rows is not None:
+            return self.plain_rows
+        if self.width == 0:
+            return [() for _ in range(self.row_count)]
+        return list(zip(*(self.column(col_idx) for col_idx in range(self.width))))
+
+class LogSource:
+    """Reads and writes log tables kept as CSV, Parquet or SQLite files instead of Excel workbooks"""
+
+    # File extension -> table format; anything else is treated as an Excel workbook
+    FORMATS = {".csv": "csv", ".parquet": "parquet", ".db": "sqlite", ".sqlite": "sqlite", ".sqlite3": "sqlite"}
+    # CSV and Parquet files hold one table, listed under this name where a workbook lists its sheets
+    DEFAULT_TABLE = "logs"
+    # Parquet needs pyarrow; a build without it only offers the CSV and SQLite tables
+    PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+    FILE_FILTER = ("Log Tables (*.csv *.parquet *.db *.sqlite *.sqlite3)" if PARQUET_AVAILABLE
+                   else "Log Tables (*.csv *.db *.sqlite *.sqlite3)")
+    # A merge split by day or week is a folder of log files described by this manifest
+    PARTITION_MANIFEST = "partitions.json"
+    PARTITION_FILTER = "Partitioned Logs (partitions.json)"
+
+    # Zero-padded numbers such as "00123" are text in a workbook too, so they are not read as integers
+    INTEGER_PATTERN = re.compile(r"-?(0|[1-9]\d*)")
+    FLOAT_PATTERN = re.compile(r"-?\d+\.\d+")
+    DATETIME_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(\.\d+)?")
+
+    @staticmethod
+    def table_format(file_path):
+        return LogSource.FORMATS.get(os.path.splitext(str(file_path))[1].lower())
+
+    @staticmethod
+    def is_partitioned(file_path):
+        return os.path.isdir(file_path) or os.path.basename(str(file_path)) == LogSource.PARTITION_MANIFEST
+
+    @staticmethod
+    def select_partitions(file_path, first_date=None, last_date=None):
+        """List the (file, sheet) pairs of a partitioned log whose dates overlap first_date to last_date"""
+        directory = file_path if os.path.isdir(file_path) else os.path.dirname(file_path)
+        with open(os.path.join(directory, LogSource.PARTITION_MANIFEST), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        selected = []
+        for partition in manifest["partitions"]:
+            if first_date and date.fromisoformat(partition["last_date"]) < first_date:
+                continue
+            if last_date and date.fromisoformat(partition["first_date"]) > last_date:
+                continue
+            selected.append((os.path.join(directory, partition["file"]), partition["sheet"]))
+        return selected
+
+    @staticmethod
+    def sheet_names(file_path):
+        """List the sheets of a workbook, the tables of a SQLite file, or the single table of a flat file"""
+        if LogSource.is_partitioned(file_path):
+            return [LogSource.DEFAULT_TABLE]
+        table_format = LogSource.table_format(file_path)
+        if table_format is None:
+            workbook = openpyxl.load_workbook(file_path, read_only=True)
+            try:
+                return workbook.sheetnames
+            finally:
+                workbook.close()
+        if table_format == "sqlite":
+            connection = sqlite3.connect(file_path)
+            try:
+                return [name for (name,) in connection.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+            finally:
+                connection.close()
+        return [LogSource.DEFAULT_TABLE]
+
+    @staticmethod
+    def quote_name(name):
+        return '"' + str(name).replace('"', '""') + '"'
+
+    @staticmethod
+    def decode_text(value, numbers=True):
+        """Turn text back into the cell values openpyxl would give: numbers and timestamps"""
+        if value == "":
+            return None
+        if numbers and LogSource.INTEGER_PATTERN.fullmatch(value):
+            return int(value)
+        if numbers and LogSource.FLOAT_PATTERN.fullmatch(value):
+            return float(value)
+        if LogSource.DATETIME_PATTERN.fullmatch(value):
+            return datetime.fromisoformat(value)
+        return value
+
+    @staticmethod
+    def decode_value(value):
+        """Convert a pandas/NumPy scalar from a Parquet table to a plain Python value"""
+        if value is None or value is pd.NaT or value is pd.NA:
+            return None
+        if isinstance(value, float) and math.isnan(value):
+            return None
+        if isinstance(value, pd.Timestamp):
+            return value.to_pydatetime()
+        if isinstance(value, np.generic):
+            value = value.item()
+            return None if isinstance(value, float) and math.isnan(value) else value
+        if isinstance(value, str):
+            # Mixed-type columns are stored as text, with timestamps written out by text_value
+            return LogSource.decode_text(value, numbers=False)
+        return value
+
+    @staticmethod
+    def read_rows(file_path, table_name):
+        """Return a table as row tuples, header first, with the value types an Excel sheet would give"""
+        table_format = LogSource.table_format(file_path)
+        if table_format == "csv":
+            with open(file_path, "r", newline="", encoding="utf-8-sig") as csv_file:
+                reader = csv.reader(csv_file)
+                header = next(reader, None)
+                if header is None:
+                    return []
+                # Student IDs stay text, like the IDs of a workbook's text column
+                id_columns = {idx for idx, name in enumerate(header)
+                              if "student" in name.lower() and "id" in name.lower()}
+                rows = [tuple(LogSource.decode_text(value) for value in header)]
+                rows.extend(tuple(LogSource.decode_text(value, numbers=idx not in id_columns)
+                                  for idx, value in enumerate(row)) for row in reader)
+                return rows
+        if table_format == "parquet":
+            table = pd.read_parquet(file_path)
+            rows = [tuple(str(col) for col in table.columns)]
+            rows.extend(tuple(LogSource.decode_value(value) for value in row)
+                        for row in table.itertuples(index=False, name=None))
+            return rows
+        connection = sqlite3.connect(file_path)
+        try:
+            cursor = connection.execute(f"SELECT * FROM {LogSource.quote_name(table_name)}")
+            rows = [tuple(column[0] for column in cursor.description)]
+            # SQLite keeps numbers typed, so only timestamps stored as text need decoding
+            rows.extend(tuple(LogSource.decode_text(value, numbers=False) if isinstance(value, str) else value
+                              for value in row) for row in cursor)
+            return rows
+        finally:
+            connection.close()
+
+    @staticmethod
+    def read_frame(file_path, table_name):
+        """Load a whole table as a DataFrame, keeping CSV cells as the text they were written as"""
+        table_format = LogSource.table_format(file_path)
+        if table_format == "csv":
+            return pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        if table_format == "parquet":
+            return pd.read_parquet(file_path)
+        connection = sqlite3.connect(file_path)
+        try:
+            return pd.read_sql_query(f"SELECT * FROM {LogSource.quote_name(table_name)}", connection)
+        finally:
+            connection.close()
+
+    @staticmethod
+    def text_value(value):
+        """Write dates and times in the forms the log readers parse back"""
+        if isinstance(value, datetime):
+            return value.strftime('%Y-%m-%d %H:%M:%S')
+        if isinstance(value, date):
+            return value.strftime('%Y-%m-%d')
+        if isinstance(value, dt_time):
+            return value.strftime('%H:%M:%S')
+        return value
+
+    @staticmethod
+    def write_frame(df, file_path, table_name=DEFAULT_TABLE):
+        """Save a DataFrame as a CSV file, a Parquet file or a table in a SQLite file, replacing what was there"""
+        table_format = LogSource.table_format(file_path)
+        df = df.copy()
+        for col in df.columns:
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and table_format != "parquet":
+                df[col] = df[col].astype(object)
+            if df[col].dtype != object:
+                continue
+            # Parquet needs one type per column; the text formats need dates and times spelled out
+            value_types = {type(value) for value in df[col] if pd.notna(value)}
+            if table_format != "parquet" or len(value_types) > 1:
+                df[col] = df[col].map(LogSource.text_value)
+                if table_format == "parquet":
+                    df[col] = df[col].map(lambda value: value if pd.isna(value) else str(value))
+
+        if table_format == "csv":
+            df.to_csv(file_path, index=False, encoding="utf-8", date_format='%Y-%m-%d %H:%M:%S')
+        elif table_format == "parquet":
+            df.to_parquet(file_path, index=False)
+        else:
+            for col in df.columns:
+                if pd.api.types.is_datetime64_any_dtype(df[col]):
+                    df[col] = df[col].dt.strftime('%Y-%m-%d %H:%M:%S')
+            connection = sqlite3.connect(file_path)
+            try:
+                df.to_sql(str(table_name), connection, if_exists="replace", index=False)
+                connection.commit()
+            finally:
+                connection.close()
+
+class SheetCache:
+    """On-disk cache of parsed sheets as typed NumPy columns, keyed by file size, mtime and content hash"""
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Sheets that could not be cached, reported by the processing threads
+        self.warnings = []
+        # Pool workers only read entries; writing entries and the index is left to the parent process
+        self.read_only = False
+        # The index is kept in memory; access times of cache hits are only written with the next entry or at exit
+        self.index = None
+        self.index_dir = None
+        self.index_dirty = False
+        atexit.register(self.flush)
+
+    def read_rows(self, file_path, sheet_name):
+        """Return the sheet's rows as value tuples, parsing the workbook only when it changed"""
+        return self.read_sheet(file_path, sheet_name).rows()
+
+    def read_sheet(self, file_path, sheet_name):
+        """Return the sheet as a CachedSheet, parsing and storing it on a cache miss"""
+        with self.lock:
+            index = self.load_index()
+            content_hash = self.content_hash(file_path, index["files"])
+            sheet_hash = hashlib.sha1(str(sheet_name).encode("utf-8")).hexdigest()[:16]
+            entry_name = f"{content_hash[:40]}_{sheet_hash}.npz"
+            entry_path = os.path.join(self.cache_dir, entry_name)
+
+            if os.path.exists(entry_path):
+                try:
+                    # Read every array up front so the file is closed and a damaged column fails here
+                    with np.load(entry_path, allow_pickle=False) as entry:
+                        sheet = CachedSheet({name: entry[name] for name in entry.files})
+                    self.hits += 1
+                    if not self.read_only:
+                        index["entries"][entry_name] = time.time()
+                        self.index_dirty = True
+                    return sheet
+                except Exception:
+                    pass  # Unreadable entry, parse the workbook again
+
+            self.misses += 1
+            rows = self.parse_sheet(file_path, sheet_name)
+            try:
+                arrays = self.encode_rows(rows)
+            except ValueError as e:
+                self.warnings.append(f"Sheet cache skipped {os.path.basename(file_path)} [{sheet_name}]: {e}")
+                return CachedSheet(rows=rows)
+            if self.read_only:
+                return CachedSheet(arrays)
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                temp_path = f"{entry_path}.{os.getpid()}.tmp"
+                with open(temp_path, "wb") as entry_file:
+                    np.savez(entry_file, **arrays)
+                os.replace(temp_path, entry_path)
+                index["entries"][entry_name] = time.time()
+                self.evict(index)
+                self.save_index(index)
+            except OSError as e:
+                # A read-only install still works, just without caching
+                self.warnings.append(f"Sheet cache unavailable: {e}")
+            return CachedSheet(arrays)
+
+    def parse_sheet(self, file_path, sheet_name):
+        if LogSource.table_format(file_path):
+            return LogSource.read_rows(file_path, sheet_name)
+        workbook = openpyxl.load_workbook(file_path, read_only=True)
+        try:
+            return list(workbook[sheet_name].iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    def encode_rows(self, rows):
+        """Split rows into per-column kind codes plus one typed array per value kind"""
+        width = max((len(row) for row in rows), default=0)
+        arrays = {"shape": np.array([len(rows), width], dtype=np.int64)}
+        for col_idx in range(width):
+            kinds = np.zeros(len(rows), dtype=np.int8)
+            values_by_kind = {}
+            for row_idx, row in enumerate(rows):
+                value = row[col_idx] if col_idx < len(row) else None
+                kind, value = self.encode_value(value)
+                kinds[row_idx] = kind
+                if kind != CachedSheet.KIND_NONE:
+                    if kind not in values_by_kind:
+                        values_by_kind[kind] = []
+                    values_by_kind[kind].append(value)
+
+            arrays[f"c{col_idx}_kinds"] = kinds
+            for kind, values in values_by_kind.items():
+                if kind == CachedSheet.KIND_STR:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype=str)
+                elif kind == CachedSheet.KIND_FLOAT:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype=np.float64)
+                elif kind == CachedSheet.KIND_DATETIME:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype="datetime64[us]")
+                elif kind == CachedSheet.KIND_DATE:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype="datetime64[D]")
+                elif kind == CachedSheet.KIND_TIMEDELTA:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype="timedelta64[us]")
+                elif kind == CachedSheet.KIND_BOOL:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype=np.bool_)
+                else:
+                    arrays[f"c{col_idx}_k{kind}"] = np.array(values, dtype=np.int64)
+        return arrays
+
+    def encode_value(self, value):
+        """Return the kind code and storable form of a cell value"""
+        value_type = type(value)
+        if value is None:
+            return CachedSheet.KIND_NONE, None
+        if value_type is bool:
+            return CachedSheet.KIND_BOOL, value
+        if value_type is int and -2 ** 63 <= value < 2 ** 63:
+            return CachedSheet.KIND_INT, value
+        if value_type is float:
+            return CachedSheet.KIND_FLOAT, value
+        # NumPy strings drop trailing NUL characters, so such a value cannot round-trip
+        if value_type is str and not value.endswith("\x00"):
+            return CachedSheet.KIND_STR, value
+        if value_type is datetime and value.tzinfo is None:
+            return CachedSheet.KIND_DATETIME, value
+        if value_type is date:
+            return CachedSheet.KIND_DATE, value
+        if value_type is timedelta:
+            return CachedSheet.KIND_TIMEDELTA, value
+        if value_type is dt_time and value.tzinfo is None:
+            return CachedSheet.KIND_TIME, ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+        raise ValueError(f"Cannot cache cell value of type {value_type.__name__}")
+
+    @staticmethod
+    def content_hash(file_path, files):
+        """Hash the file contents, reusing the hash memoized in files while its size and mtime are unchanged"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        known = files.get(path)
+        if known and known["size"] == stat.st_size and known["mtime"] == stat.st_mtime_ns:
+            return known["hash"]
+
+        digest = hashlib.sha256()
+        with open(path, "rb") as source:
+            for chunk in iter(lambda: source.read(1024 * 1024), b""):
+                digest.update(chunk)
+        files[path] = {"size": stat.st_size, "mtime": stat.st_mtime_ns, "hash": digest.hexdigest()}
+        return files[path]["hash"]
+
+    def evict(self, index):
+        """Drop the least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                path = os.path.join(self.cache_dir, name)
+                entries.append((index["entries"].get(name, 0), os.path.getsize(path), name, path))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, name, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            index["entries"].pop(name, None)
+            total -= size
+
+    def load_index(self):
+        """Return the in-memory index, reading it from disk on first use or after the cache moved"""
+        if self.index is not None and self.index_dir == self.cache_dir:
+            return self.index
+        self.flush()
+        self.index, self.index_dir, self.index_dirty = {"files": {}, "entries": {}}, self.cache_dir, False
+        try:
+            with open(os.path.join(self.cache_dir, self.INDEX_FILE), "r", encoding="utf-8") as index_file:
+                index = json.load(index_file)
+            if isinstance(index.get("files"), dict) and isinstance(index.get("entries"), dict):
+                self.index = index
+        except (OSError, ValueError):
+            pass
+        return self.index
+
+    def flush(self):
+        """Write the access times gathered from cache hits since the index was last saved"""
+        if self.index_dirty and self.index is not None and os.path.isdir(self.index_dir):
+            self.save_index(self.index, self.index_dir)
+
+    def save_index(self, index, cache_dir=None):
+        self.index_dirty = False
+        try:
+            index_path = os.path.join(cache_dir or self.cache_dir, self.INDEX_FILE)
+            temp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as index_file:
+                json.dump(index, index_file)
+            os.replace(temp_path, index_path)
+        except OSError:
+            pass
+
+    def describe_cache(self):
+        return f"{self.hits} hits, {self.misses} parsed"
+
+    def take_warnings(self):
+        """Return and clear the warnings gathered since the last call"""
+        with self.lock:
+            warnings, self.warnings = self.warnings, []
+        return warnings
+
+# Parsed sheets live next to the running app (or the frozen executable) so warm runs skip XLSX parsing
+SHEET_CACHE = SheetCache(os.path.join(
+    os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(sys.argv[0])),
+    "sheet_cache"))
+
+class StudentRecord:
+    """Slotted student entry that still answers the dict-style lookups used across the app"""
+
+    FIELDS = ("name", "year", "group", "email")
+    __slots__ = ("student_id", "name", "year", "group")
+
+    def __init__(self, student_id, name, year, group):
+        self.student_id = student_id
+        self.name = name
+        # Year and group repeat across the whole roster, so share one string object per value
+        self.year = sys.intern(year) if isinstance(year, str) else year
+        self.group = sys.intern(group) if isinstance(group, str) else group
+
+    @property
+    def email(self):
+        return f"{self.student_id}@med.asu.edu.eg"
+
+    def __getitem__(self, field):
+        if field not in self.FIELDS:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __contains__(self, field):
+        return field in self.FIELDS
+
+    def get(self, field, default=None):
+        return getattr(self, field) if field in self.FIELDS else default
+
+    def keys(self):
+        return self.FIELDS
+
+    def values(self):
+        return [getattr(self, field) for field in self.FIELDS]
+
+    def __getstate__(self):
+        return (self.student_id, self.name, self.year, self.group)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+# One projected log row, as produced by LogReader; timestamp is set when the log was merged with one
+LogRecord = namedtuple("LogRecord", ["student_id", "location", "date", "time", "timestamp"], defaults=(None,))
+
+class LogReader:
+    """Streams the Student ID, Location, Date and Time columns of a log sheet through the sheet cache"""
+
+    HEADER = LogRecord("Student ID", "Location", "Log Date", "Log Time")
+
+    def __init__(self, log_file, log_sheet, first_date=None, last_date=None):
+        self.log_file = log_file
+        self.log_sheet = log_sheet
+        self.header = self.HEADER
+        # A partitioned log only opens the partitions overlapping these dates; None leaves that side open
+        self.first_date = first_date
+        self.last_date = last_date
+
+    def find_columns(self, header_row):
+        """Locate the needed columns by header name, falling back to the first four columns"""
+        names = [str(value).strip().lower() if value is not None else "" for value in header_row]
+
+        def find(exact_names, matches, default):
+            for idx, name in enumerate(names):
+                if name in exact_names:
+                    return idx
+            for idx, name in enumerate(names):
+                if matches(name):
+                    return idx
+            return default
+
+        return (
+            find(("student id",), lambda name: "student" in name and "id" in name, 0),
+            find(("location",), lambda name: "location" in name, 1),
+            find(("log date", "date"), lambda name: "date" in name or "day" in name, 2),
+            find(("log time", "time"), lambda name: "time" in name, 3),
+            find(("log timestamp",), lambda name: False, None),
+            find(("source_file",), lambda name: False, None),
+        )
+
+    def sources(self):
+        """List the (file, sheet) pairs to read: the log itself, or its selected partitions in date order"""
+        if LogSource.is_partitioned(self.log_file):
+            return LogSource.select_partitions(self.log_file, self.first_date, self.last_date)
+        return [(self.log_file, self.log_sheet)]
+
+    def __iter__(self):
+        for log_file, log_sheet in self.sources():
+            yield from self.read_records(log_file, log_sheet)
+
+    def sourced_records(self):
+        """Yield (source, record) pairs; the source is the backup a merged row came from, else the log file"""
+        for log_file, log_sheet in self.sources():
+            yield from self.read_records(log_file, log_sheet, with_source=True)
+
+    def read_records(self, log_file, log_sheet, with_source=False):
+        # Only the four needed columns are decoded from the cached sheet
+        sheet = SHEET_CACHE.read_sheet(log_file, log_sheet)
+        if sheet.row_count == 0:
+            return
+
+        id_col, location_col, date_col, time_col, timestamp_col, source_col = self.find_columns(sheet.header())
+        # Merged logs carry a parsed Log Timestamp; other logs get None and are parsed downstream
+        timestamps = sheet.column(timestamp_col) if timestamp_col is not None else [None] * sheet.row_count
+        if not with_source:
+            sources = repeat(None)
+        elif source_col is not None:
+            sources = sheet.column(source_col)
+        else:
+            sources = repeat(log_file)
+        columns = zip(sheet.column(id_col), sheet.column(location_col),
+                      sheet.column(date_col), sheet.column(time_col), timestamps, sources)
+        next(columns)  # Skip the header row
+        for student_id, location, log_date, log_time, timestamp, source in columns:
+            if student_id is None and log_date is None:
+                continue
+            if not isinstance(timestamp, datetime):
+                timestamp = None
+            record = LogRecord(str(student_id), location, log_date, log_time, timestamp)
+            yield (str(source), record) if with_source else record
+
+class LogStore:
+    """Holds log rows as integer codes into per-column value tables instead of one tuple per row"""
+
+    # Timestamps are nearly unique per scan, so the last column is kept as epoch seconds instead of codes
+    TIMESTAMP = LogRecord._fields.index("timestamp")
+    NO_TIMESTAMP = -2 ** 63
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, records=()):
+        self.codes = [array("I") for _ in range(self.TIMESTAMP)]
+        self.values = [[] for _ in range(self.TIMESTAMP)]
+        self.lookups = [{} for _ in range(self.TIMESTAMP)]
+        self.timestamps = array("q")
+        # Filled by ProcessThread.partition_log_history: {year-group: {date: store indices}}
+        self.partitions = {}
+        # {student ID text: ascending store indices}, built by student_positions on first use
+        self.student_index = None
+        for record in records:
+            self.append(record)
+
+    def encode(self, column, value):
+        """Return the code of a value in a column, adding it to the column's table on first sight"""
+        lookup = self.lookups[column]
+        # Keep equal values of different types (1 and "1", dates and datetimes) apart
+        key = (type(value), value)
+        code = lookup.get(key)
+        if code is None:
+            code = len(self.values[column])
+            self.values[column].append(value)
+            lookup[key] = code
+        return code
+
+    def append(self, record):
+        for column in range(len(self.codes)):
+            value = record[column] if column < len(record) else None
+            self.codes[column].append(self.encode(column, value))
+        timestamp = record[self.TIMESTAMP] if len(record) > self.TIMESTAMP else None
+        self.timestamps.append((timestamp - self.EPOCH) // timedelta(seconds=1)
+                               if isinstance(timestamp, datetime) else self.NO_TIMESTAMP)
+        self.student_index = None
+        return len(self) - 1
+
+    def student_positions(self):
+        """Map each student ID, as text, to the ascending indices of its rows; built once per store"""
+        if self.student_index is None:
+            # One pass over the integer codes, then one entry per distinct ID value
+            code_positions = {}
+            for position, code in enumerate(self.codes[0]):
+                if code not in code_positions:
+                    code_positions[code] = array("I")
+                code_positions[code].append(position)
+            self.student_index = {}
+            for code, positions in code_positions.items():
+                student_id = str(self.values[0][code])
+                if student_id in self.student_index:
+                    # Values such as 1 and "1" share one text ID
+                    positions = array("I", sorted(self.student_index[student_id] + positions))
+                self.student_index[student_id] = positions
+        return self.student_index
+
+    def __len__(self):
+        return len(self.codes[0])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        seconds = self.timestamps[index]
+        timestamp = None if seconds == self.NO_TIMESTAMP else self.EPOCH + timedelta(seconds=seconds)
+        return LogRecord(*(values[codes[index]] for values, codes in zip(self.values, self.codes)), timestamp)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def __getstate__(self):
+        # The lookups are rebuilt from the value tables on the receiving side
+        return (self.codes, self.values, self.timestamps, self.partitions)
+
+    def __setstate__(self, state):
+        self.codes, self.values, self.timestamps, self.partitions = state
+        self.student_index = None
+        self.lookups = [{(type(value), value): code for code, value in enumerate(values)}
+                        for values in self.values]
+
+    def describe_memory(self):
+        """Approximate bytes held per row by the code and timestamp columns"""
+        if not len(self):
+            return "0 rows"
+        code_bytes = sum(codes.itemsize * len(codes) for codes in self.codes)
+        code_bytes += self.timestamps.itemsize * len(self.timestamps)
+        index_bytes = sum(len(positions) * positions.itemsize
+                          for dates in self.partitions.values() for positions in dates.values())
+        return f"{len(self)} rows, {(code_bytes + index_bytes) / len(self):.0f} bytes per row"
+
+class ReportWriter:
+    """Streams report sheets into a write-only workbook whose cells share named styles"""
+
+    def __init__(self):
+        self.workbook = openpyxl.Workbook(write_only=True)
+
+    def add_style(self, name, font=None, fill=None, alignment=None, border=None, number_format=None):
+        """Register a named style the first time it is requested and return its name"""
+        if name not in self.workbook.named_styles:
+            self.workbook.add_named_style(NamedStyle(
+                name=name, font=font or DEFAULT_FONT, fill=fill, alignment=alignment,
+                border=border, number_format=number_format))
+        return name
+
+    def create_sheet(self, title, widths=None, row_heights=None, freeze_panes=None, auto_filter=None):
+        """Create a sheet with its layout set up front, as write-only sheets require"""
+        sheet = self.workbook.create_sheet(title)
+        for col_idx, width in (widths or {}).items():
+            sheet.column_dimensions[get_column_letter(col_idx)].width = width
+        for row_idx, height in (row_heights or {}).items():
+            sheet.row_dimensions[row_idx].height = height
+        if freeze_panes:
+            sheet.freeze_panes = freeze_panes
+        if auto_filter:
+            sheet.auto_filter.ref = auto_filter
+        return sheet
+
+    def append(self, sheet, values, styles=None):
+        """Write one row; styles maps 1-based column numbers to registered style names"""
+        if styles:
+            values = list(values)
+            for col_idx, style in styles.items():
+                if col_idx <= len(values):
+                    cell = WriteOnlyCell(sheet, value=values[col_idx - 1])
+                    cell.style = style
+                    values[col_idx - 1] = cell
+        sheet.append(values)
+
+    def save(self, path):
+        self.workbook.save(path)
+
+    @staticmethod
+    def column_lengths(rows, include_empty=False):
+        """Longest str() length per 1-based column, measured before any row is written"""
+        lengths = {}
+        for row in rows:
+            for col_idx, value in enumerate(row, 1):
+                if value or include_empty:
+                    length = len(str(value))
+                    if length > lengths.get(col_idx, 0):
+                        lengths[col_idx] = length
+                elif col_idx not in lengths:
+                    lengths[col_idx] = 0
+        return lengths
+
+class ReportReader:
+    """Streams the values of a report's sheets in read-only mode, keeping only the columns named in their header"""
+
+    def __init__(self, report_path):
+        self.workbook = openpyxl.load_workbook(report_path, read_only=True)
+        self.sheetnames = self.workbook.sheetnames
+
+    def read_columns(self, sheet_name, columns):
+        """Return the rows under a sheet's header as tuples of the named columns, with None for a missing column"""
+        rows = self.workbook[sheet_name].iter_rows(values_only=True)
+        # The header is the first row holding the first named column
+        for header in rows:
+            if header and columns[0] in header:
+                break
+        else:
+            return []
+        indices = [header.index(name) if name in header else None for name in columns]
+        return [tuple(row[idx] if idx is not None and idx < len(row) else None for idx in indices)
+                for row in rows if row]
+
+    def close(self):
+        self.workbook.close()
+
+class ReportCheckpoint:
+    """Sidecar of an updated report with what the next update needs, so neither the report nor old scans are read again"""
+
+    VERSION = 3
+    SUFFIX = ".checkpoint.json"
+    # JSON has no date types, so dates and times are written as tagged ISO strings; datetime comes before date
+    TAGS = {"__datetime__": datetime, "__date__": date, "__time__": dt_time}
+
+    @staticmethod
+    def path_for(report_path):
+        return os.path.splitext(report_path)[0] + ReportCheckpoint.SUFFIX
+
+    @staticmethod
+    def encode_value(value):
+        """json default hook: tag dates and times, and unwrap numpy scalars"""
+        for tag, value_type in ReportCheckpoint.TAGS.items():
+            if isinstance(value, value_type):
+                return {tag: value.isoformat()}
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"{type(value).__name__} values cannot be written to a checkpoint")
+
+    @staticmethod
+    def decode_object(obj):
+        """json object hook: turn tagged ISO strings back into dates and times"""
+        if len(obj) == 1:
+            tag, text = next(iter(obj.items()))
+            if tag in ReportCheckpoint.TAGS:
+                return ReportCheckpoint.TAGS[tag].fromisoformat(text)
+        return obj
+
+    @staticmethod
+    def save(report_path, attendance, dedup_keys, student_map, watermarks):
+        """Write the checkpoint of a saved report; watermarks map each log source to the newest scan seen from it"""
+        report_stat = os.stat(report_path)
+        checkpoint_path = ReportCheckpoint.path_for(report_path)
+        temp_path = f"{checkpoint_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as checkpoint_file:
+            json.dump({
+                "version": ReportCheckpoint.VERSION,
+                # The report's size and mtime tie the checkpoint to this exact file
+                "report_size": report_stat.st_size,
+                "report_mtime": report_stat.st_mtime_ns,
+                "attendance": attendance,
+                "dedup_keys": {key: [list(item) for item in keys] for key, keys in dedup_keys.items()},
+                "student_map": student_map,
+                "watermarks": watermarks
+            }, checkpoint_file, default=ReportCheckpoint.encode_value)
+        os.replace(temp_path, checkpoint_path)
+
+    @staticmethod
+    def load(report_path):
+        """Return a report's checkpoint, or None when it is missing, unreadable or the report changed since"""
+        if not report_path or not os.path.exists(ReportCheckpoint.path_for(report_path)):
+            return None
+        try:
+            with open(ReportCheckpoint.path_for(report_path), encoding="utf-8") as checkpoint_file:
+                checkpoint = json.load(checkpoint_file, object_hook=ReportCheckpoint.decode_object)
+            report_stat = os.stat(report_path)
+            if (checkpoint.get("version") != ReportCheckpoint.VERSION
+                    or checkpoint.get("report_size") != report_stat.st_size
+                    or checkpoint.get("report_mtime") != report_stat.st_mtime_ns):
+                return None
+            # The unique keys are compared as tuples
+            checkpoint["dedup_keys"] = {key: {tuple(item) for item in keys}
+                                        for key, keys in checkpoint["dedup_keys"].items()}
+        except Exception:
+            return None
+        return checkpoint
+
+class SessionIndex:
+    """Index of scheduled sessions keyed by (year-group, location, date) for fast log matching"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.entry_count = 0
+
+    @staticmethod
+    def normalize_location(location):
+        return location.lower() if isinstance(location, str) else location
+
+    @staticmethod
+    def session_window(session_start, settings):
+        """Return the (before, after) attendance window for a session based on its start hour.
+
+        settings holds the window constants, e.g. the ProcessThread or UpdateProcessThread building the index.
+        """
+        if session_start.hour in settings.EXCEPTION_HOURS:
+            return (timedelta(minutes=settings.EXCEPTION_BEFORE_MINUTES),
+                    timedelta(minutes=settings.EXCEPTION_AFTER_MINUTES))
+        return (timedelta(minutes=settings.STANDARD_BEFORE_MINUTES),
+                timedelta(minutes=settings.STANDARD_AFTER_MINUTES))
+
+    def add(self, group_key, location, session_start, before_window, after_window, session_info):
+        """Register a session under every date its attendance window touches"""
+        window_start = session_start - before_window
+        window_end = session_start + after_window
+        # The insertion order is kept so lookups can honour first-match semantics
+        entry = (window_start, window_end, self.entry_count, session_info)
+        self.entry_count += 1
+
+        location_key = self.normalize_location(location)
+        day = window_start.date()
+        while day <= window_end.date():
+            bucket_key = (group_key, location_key, day)
+            if bucket_key not in self.buckets:
+                self.buckets[bucket_key] = {"entries": [], "starts": [], "max_width": timedelta(0)}
+            bucket = self.buckets[bucket_key]
+            bucket["entries"].append(entry)
+            bucket["max_width"] = max(bucket["max_width"], window_end - window_start)
+            day += timedelta(days=1)
+
+    def build(self):
+        """Sort every bucket by window start so lookups can bisect"""
+        for bucket in self.buckets.values():
+            bucket["entries"].sort(key=lambda entry: entry[0])
+            bucket["starts"] = [entry[0] for entry in bucket["entries"]]
+        return self
+
+    def find(self, group_key, location, log_datetime):
+        """Return the sessions whose window contains the log, in schedule order"""
+        bucket = self.buckets.get((group_key, self.normalize_location(location), log_datetime.date()))
+        if not bucket:
+            return []
+
+        # Only windows starting within max_width before the log can still be open
+        low = bisect.bisect_left(bucket["starts"], log_datetime - bucket["max_width"])
+        high = bisect.bisect_right(bucket["starts"], log_datetime)
+        matches = [entry for entry in bucket["entries"][low:high] if log_datetime <= entry[1]]
+        if len(matches) > 1:
+            matches.sort(key=lambda entry: entry[2])
+        return [entry[3] for entry in matches]
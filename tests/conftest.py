@@ -0,0 +1,54 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "shared"))
+
+import attendance_core  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+APPS = {
+    "faculty_attendance_app": "faculty app",
+    "department_attendance_app": "department app",
+}
+
+
+def load_app(name):
+    """Import an app module from its folder; the folder names contain spaces, so they are not packages"""
+    # On the path rather than loaded from a file, so spawned pool workers can import the module too
+    app_dir = os.path.join(ROOT, APPS[name])
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    return importlib.import_module(name)
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture(scope="session")
+def faculty_app(qapp):
+    return load_app("faculty_attendance_app")
+
+
+@pytest.fixture(scope="session")
+def department_app(qapp):
+    return load_app("department_attendance_app")
+
+
+@pytest.fixture(params=sorted(APPS))
+def app(request, qapp):
+    return load_app(request.param)
+
+
+@pytest.fixture(autouse=True)
+def sheet_cache(tmp_path, monkeypatch):
+    """Keep parsed sheets of every test in its own temporary directory"""
+    monkeypatch.setattr(attendance_core.SHEET_CACHE, "cache_dir", str(tmp_path / "sheet_cache"))
+    return attendance_core.SHEET_CACHE
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+from datetime import date, datetime, time
+from types import SimpleNamespace
+
+import pandas as pd
+
+from attendance_core import ReportCheckpoint, SessionIndex, SheetCache
+
+SETTINGS = SimpleNamespace(STANDARD_BEFORE_MINUTES=15, STANDARD_AFTER_MINUTES=150,
+                           EXCEPTION_BEFORE_MINUTES=15, EXCEPTION_AFTER_MINUTES=150, EXCEPTION_HOURS=[12, 1, 13, 3, 15])
+
+
+def add_session(index, location, session_start, name):
+    before_window, after_window = SessionIndex.session_window(session_start, SETTINGS)
+    index.add("Year 1-G1", location, session_start, before_window, after_window, name)
+
+
+def test_session_index_returns_matches_in_schedule_order():
+    index = SessionIndex()
+    # The later session is scheduled first, so it must also be matched first
+    add_session(index, "Hall", datetime(2030, 1, 10, 10, 0), "second slot")
+    add_session(index, "Hall", datetime(2030, 1, 10, 9, 0), "first slot")
+    add_session(index, "Lab", datetime(2030, 1, 10, 9, 0), "other location")
+    index.build()
+
+    assert index.find("Year 1-G1", "hall", datetime(2030, 1, 10, 10, 30)) == ["second slot", "first slot"]
+    assert index.find("Year 1-G1", "Hall", datetime(2030, 1, 10, 8, 50)) == ["first slot"]
+    assert index.find("Year 1-G1", "Hall", datetime(2030, 1, 10, 8, 40)) == []
+    assert index.find("Year 1-G2", "Hall", datetime(2030, 1, 10, 10, 30)) == []
+
+
+def test_session_index_windows_cross_midnight():
+    index = SessionIndex()
+    add_session(index, "Hall", datetime(2030, 1, 10, 23, 0), "late session")
+    index.build()
+
+    assert index.find("Year 1-G1", "Hall", datetime(2030, 1, 11, 0, 30)) == ["late session"]
+    assert index.find("Year 1-G1", "Hall", datetime(2030, 1, 11, 1, 31)) == []
+
+
+def write_report(path, content):
+    with open(path, "w", encoding="utf-8") as report_file:
+        report_file.write(content)
+
+
+def test_checkpoint_round_trips_watermarks(tmp_path):
+    report_path = str(tmp_path / "report.xlsx")
+    write_report(report_path, "report")
+    watermarks = {"backup_1.xlsx": datetime(2030, 1, 10, 9, 5), "backup_2.xlsx": datetime(2030, 1, 12, 17, 45)}
+    attendance = {"00101": [["00101", "Hall", date(2030, 1, 10), time(9, 0)]]}
+    ReportCheckpoint.save(report_path, attendance, {"00101": [("Hall", "10/01/2030")]}, {}, watermarks)
+
+    checkpoint = ReportCheckpoint.load(report_path)
+
+    assert checkpoint["watermarks"] == watermarks
+    assert checkpoint["dedup_keys"] == {"00101": {("Hall", "10/01/2030")}}
+    assert checkpoint["attendance"] == attendance
+
+
+def test_checkpoint_is_dropped_when_the_report_changes(tmp_path):
+    report_path = str(tmp_path / "report.xlsx")
+    write_report(report_path, "report")
+    ReportCheckpoint.save(report_path, {}, {}, {}, {"backup.xlsx": datetime(2030, 1, 10, 9, 5)})
+
+    write_report(report_path, "edited report")
+
+    assert os.path.exists(ReportCheckpoint.path_for(report_path))
+    assert ReportCheckpoint.load(report_path) is None
+
+
+def read_index(cache):
+    with open(os.path.join(cache.cache_dir, SheetCache.INDEX_FILE), encoding="utf-8") as index_file:
+        return json.load(index_file)
+
+
+def test_sheet_cache_writes_hit_times_only_on_flush(sheet_cache, tmp_path):
+    workbook = str(tmp_path / "schedule.xlsx")
+    pd.DataFrame({"Year": ["Year 1"], "Group": ["G1"]}).to_excel(workbook, sheet_name="S", index=False)
+
+    assert sheet_cache.read_rows(workbook, "S") == [("Year", "Group"), ("Year 1", "G1")]
+    written = read_index(sheet_cache)
+    sheet_cache.index["entries"] = {name: 0 for name in sheet_cache.index["entries"]}
+
+    assert sheet_cache.read_rows(workbook, "S") == [("Year", "Group"), ("Year 1", "G1")]
+    assert read_index(sheet_cache) == written
+
+    sheet_cache.flush()
+    assert all(accessed > 0 for accessed in read_index(sheet_cache)["entries"].values())
+    assert sheet_cache.describe_cache().startswith("1 hits")
+
+
+def test_content_hash_is_memoized_by_size_and_mtime(tmp_path):
+    path = tmp_path / "backup.xlsx"
+    path.write_bytes(b"scans")
+    files = {}
+
+    assert SheetCache.content_hash(str(path), files) == hashlib.sha256(b"scans").hexdigest()
+    files[str(path)]["hash"] = "memoized"
+    assert SheetCache.content_hash(str(path), files) == "memoized"
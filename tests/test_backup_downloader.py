@@ -0,0 +1,154 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from attendance_core import BackupDownloader
+
+
+class FakeGithub:
+    """Just enough of the git trees and blobs API to serve a repository of backups"""
+
+    def __init__(self, files):
+        self.etag_version = 1
+        # Trees whose recursive listing is reported as truncated
+        self.truncated = set()
+        self.requests = []
+        self.set_files(files)
+
+    def set_files(self, files):
+        self.blobs = {}
+        self.trees = {"HEAD": {}}
+        for path, content in files.items():
+            sha = hashlib.sha1(content).hexdigest()
+            self.blobs[sha] = content
+            tree = self.trees["HEAD"]
+            parts = path.split("/")
+            for part in parts[:-1]:
+                if part not in tree:
+                    tree[part] = ("tree", f"tree-{len(self.trees)}")
+                    self.trees[tree[part][1]] = {}
+                tree = self.trees[tree[part][1]]
+            tree[parts[-1]] = ("blob", sha)
+        self.etag_version += 1
+
+    def listing(self, tree_sha, recursive, prefix=""):
+        entries = []
+        for name, (entry_type, sha) in sorted(self.trees[tree_sha].items()):
+            entries.append({"path": prefix + name, "type": entry_type, "sha": sha})
+            if recursive and entry_type == "tree":
+                entries.extend(self.listing(sha, True, f"{prefix}{name}/"))
+        return entries
+
+    def handle(self, request):
+        url = urlparse(request.path)
+        self.requests.append(url.path)
+        parts = url.path.strip("/").split("/")
+        if parts[4] == "blobs":
+            return 200, {}, self.blobs[parts[5]]
+
+        tree_sha = parts[5]
+        recursive = parse_qs(url.query).get("recursive") == ["1"]
+        etag = f'"{tree_sha}-{self.etag_version}"'
+        if recursive and request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        truncated = recursive and tree_sha in self.truncated
+        # A truncated listing only holds part of the tree
+        entries = self.listing(tree_sha, recursive)[:1] if truncated else self.listing(tree_sha, recursive)
+        body = json.dumps({"sha": tree_sha, "tree": entries, "truncated": truncated}).encode("utf-8")
+        return 200, {"ETag": etag, "Content-Type": "application/json"}, body
+
+
+@pytest.fixture
+def github():
+    fake = FakeGithub({
+        "backups/monday.xlsx": b"monday scans",
+        "backups/2024/tuesday.xlsx": b"tuesday scans",
+        "backups/notes.txt": b"not a backup",
+        "README.md": b"readme",
+    })
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers, body = fake.handle(self)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    fake.api_url = f"http://127.0.0.1:{server.server_port}"
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+def download(github, target_dir):
+    """One GithubDownloadWorker pass: list, download and save the manifest; returns {name: status}"""
+    downloader = BackupDownloader(api_url=github.api_url, max_workers=2)
+    try:
+        manifest = downloader.load_manifest(target_dir)
+        items = downloader.list_backups("owner", "repo", manifest)
+        statuses = {item["name"]: status for item, _, status in downloader.download_all(items, target_dir, manifest)}
+        downloader.save_manifest(target_dir, manifest)
+    finally:
+        downloader.close()
+    return statuses
+
+
+def test_first_download_fetches_every_backup(github, tmp_path):
+    assert download(github, str(tmp_path)) == {"2024/tuesday.xlsx": "downloaded", "monday.xlsx": "downloaded"}
+    assert (tmp_path / "monday.xlsx").read_bytes() == b"monday scans"
+    assert (tmp_path / "2024" / "tuesday.xlsx").read_bytes() == b"tuesday scans"
+    assert not list(tmp_path.rglob("*.part"))
+
+
+def test_unchanged_backups_are_not_downloaded_again(github, tmp_path):
+    download(github, str(tmp_path))
+    github.requests.clear()
+    # A new listing, so the files themselves are compared by sha
+    github.set_files({
+        "backups/monday.xlsx": b"monday scans",
+        "backups/2024/tuesday.xlsx": b"tuesday scans, updated",
+    })
+
+    assert download(github, str(tmp_path)) == {"2024/tuesday.xlsx": "downloaded", "monday.xlsx": "unchanged"}
+    assert [path for path in github.requests if "/blobs/" in path] == [
+        f"/repos/owner/repo/git/blobs/{hashlib.sha1(b'tuesday scans, updated').hexdigest()}"]
+    assert (tmp_path / "2024" / "tuesday.xlsx").read_bytes() == b"tuesday scans, updated"
+
+
+def test_unchanged_listing_is_revalidated_by_etag(github, tmp_path):
+    download(github, str(tmp_path))
+    github.requests.clear()
+    downloader = BackupDownloader(api_url=github.api_url)
+    manifest = downloader.load_manifest(str(tmp_path))
+
+    response = downloader.fetch_tree("owner", "repo", "HEAD", recursive=True,
+                                     headers={"If-None-Match": next(iter(manifest["listings"].values()))["etag"]})
+    items = downloader.list_backups("owner", "repo", manifest)
+    downloader.close()
+
+    assert response.status_code == 304
+    assert [item["name"] for item in items] == ["2024/tuesday.xlsx", "monday.xlsx"]
+    assert github.requests == ["/repos/owner/repo/git/trees/HEAD"] * 2
+
+
+def test_truncated_listing_walks_the_backups_tree(github, tmp_path):
+    backups_sha = github.trees["HEAD"]["backups"][1]
+    # Both the whole repository and the backups subtree are too large for one recursive listing
+    github.truncated = {"HEAD", backups_sha}
+
+    assert download(github, str(tmp_path)) == {"2024/tuesday.xlsx": "downloaded", "monday.xlsx": "downloaded"}
+    assert f"/repos/owner/repo/git/trees/{backups_sha}" in github.requests
+    assert (tmp_path / "2024" / "tuesday.xlsx").read_bytes() == b"tuesday scans"
@@ -0,0 +1,82 @@
+import pandas as pd
+
+
+def scans(rows):
+    frame = pd.DataFrame(rows, columns=["Student ID", "Location", "Log Date", "Log Time"])
+    frame["Log Timestamp"] = pd.to_datetime(frame["Log Date"] + " " + frame["Log Time"], format="%d/%m/%Y %H:%M:%S")
+    return frame
+
+
+def test_remove_duplicate_scans_drops_exact_repeats_only_without_a_window(app, tmp_path):
+    worker = app.MergeWorker([], str(tmp_path / "merged.xlsx"))
+    frame = scans([
+        ("1", "Hall", "10/01/2030", "09:00:00"),
+        ("1", "Hall", "10/01/2030", "09:00:00"),
+        ("1", "Hall", "10/01/2030", "09:00:30"),
+    ])
+
+    kept, exact_removed, near_removed = worker.remove_duplicate_scans(frame)
+
+    assert list(kept["Log Time"]) == ["09:00:00", "09:00:30"]
+    assert (exact_removed, near_removed) == (1, 0)
+
+
+def test_remove_duplicate_scans_window_runs_from_the_last_kept_scan(app, tmp_path):
+    worker = app.MergeWorker([], str(tmp_path / "merged.xlsx"), duplicate_window_seconds=60)
+    frame = scans([
+        ("1", "Hall", "10/01/2030", "09:00:00"),
+        ("1", "Hall", "10/01/2030", "09:00:50"),
+        # Inside the window of the previous tap but not of the last kept scan
+        ("1", "Hall", "10/01/2030", "09:01:40"),
+        ("1", "Hall", "10/01/2030", "09:02:30"),
+        ("1", "Lab", "10/01/2030", "09:00:10"),
+        ("2", "Hall", "10/01/2030", "09:00:20"),
+    ])
+
+    kept, exact_removed, near_removed = worker.remove_duplicate_scans(frame)
+
+    assert list(zip(kept["Student ID"], kept["Location"], kept["Log Time"])) == [
+        ("1", "Hall", "09:00:00"),
+        ("1", "Hall", "09:01:40"),
+        ("1", "Lab", "09:00:10"),
+        ("2", "Hall", "09:00:20"),
+    ]
+    assert (exact_removed, near_removed) == (0, 2)
+
+
+def write_backup(path, rows, extra=None):
+    frame = pd.DataFrame(rows, columns=["student id", "location", "log date", "log time"])
+    if extra:
+        frame[extra] = "x"
+    frame.to_excel(path, index=False)
+    return str(path)
+
+
+def merge(app_module, files, output_file, store_dir=None):
+    worker = app_module.MergeWorker(files, str(output_file), store_dir=store_dir and str(store_dir),
+                                    output_formats=["csv"])
+    outputs = []
+    worker.finished_signal.connect(outputs.append)
+    worker.run()
+    return pd.read_csv(outputs[0], dtype=str)
+
+
+def test_merge_store_exports_only_the_selected_files(app, tmp_path):
+    first = write_backup(tmp_path / "first.xlsx", [("1", "Hall", "10/01/2030", "09:00:00"),
+                                                   ("2", "Hall", "10/01/2030", "09:01:00")])
+    second = write_backup(tmp_path / "second.xlsx", [("1", "Hall", "10/01/2030", "09:00:00"),
+                                                     ("3", "Lab", "11/01/2030", "10:00:00")], extra="Device")
+    store_dir = tmp_path / "store"
+
+    both = merge(app, [first, second], tmp_path / "both.xlsx", store_dir)
+    pd.testing.assert_frame_equal(both, merge(app, [first, second], tmp_path / "plain_both.xlsx"))
+
+    # Deselecting a file removes its scans and its columns from the store's export
+    only_first = merge(app, [first], tmp_path / "first_only.xlsx", store_dir)
+    pd.testing.assert_frame_equal(only_first, merge(app, [first], tmp_path / "plain_first.xlsx"))
+
+    # A changed file replaces its old scans instead of adding to them
+    write_backup(tmp_path / "first.xlsx", [("4", "Hall", "12/01/2030", "08:00:00")])
+    changed = merge(app, [second, first], tmp_path / "changed.xlsx", store_dir)
+    pd.testing.assert_frame_equal(changed, merge(app, [second, first], tmp_path / "plain_changed.xlsx"))
+    assert list(changed["Student ID"]) == ["1", "3", "4"]
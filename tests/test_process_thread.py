@@ -0,0 +1,91 @@
+from datetime import date, datetime, time
+
+
+def make_thread(app_module):
+    return app_module.ProcessThread("ref.xlsx", "Ref", "log.xlsx", "Logs", [])
+
+
+def schedule_rows(app_module, rows):
+    """Faculty schedules carry a subject after the group; department schedules do not"""
+    if app_module.__name__ == "department_attendance_app":
+        return [row[:2] + row[3:] for row in rows]
+    return rows
+
+
+def test_select_log_partitions_keeps_the_schedule_dates_of_its_groups(app):
+    thread = make_thread(app)
+    student_map = {
+        "00101": app.StudentRecord("00101", "A", "Year 1", "G1"),
+        "00102": app.StudentRecord("00102", "B", "Year 1", "G2"),
+    }
+    header = ("Student ID", "Location", "Log Date", "Log Time")
+    log_rows = [
+        ("00101", "Hall", "09/01/2030", "09:00:00"),
+        ("00101", "Hall", "10/01/2030", "09:05:00"),
+        ("00102", "Hall", "10/01/2030", "09:06:00"),
+        ("00103", "Hall", "10/01/2030", "09:07:00"),
+        ("00101", "Hall", "11/01/2030", "09:00:00"),
+        ("00101", "Lab", "12/01/2030", "23:50:00"),
+        ("00101", "Lab", "13/01/2030", "00:30:00"),
+    ]
+    log_store = thread.partition_log_history(log_rows, student_map)
+    session_schedule = schedule_rows(app, [
+        ("Year 1", "G1", "anatomy", 1, "Hall", "10/01/2030", "09:00:00"),
+        # This window crosses midnight, so the next day's logs are selected too
+        ("Year 1", "G1", "anatomy", 2, "Lab", "12/01/2030", "23:30:00"),
+    ])
+
+    selected = list(thread.select_log_partitions([header], log_store, session_schedule))
+
+    assert selected[0] == header
+    assert [tuple(row[:4]) for row in selected[1:]] == [
+        ("00101", "Hall", "10/01/2030", "09:05:00"),
+        ("00101", "Hall", "11/01/2030", "09:00:00"),
+        ("00101", "Lab", "12/01/2030", "23:50:00"),
+        ("00101", "Lab", "13/01/2030", "00:30:00"),
+    ]
+
+
+def test_schedule_date_ranges_span_every_session_window(app):
+    thread = make_thread(app)
+    session_schedule = schedule_rows(app, [
+        ("Year 1", "G1", "anatomy", 1, "Hall", "10/01/2030", "09:00:00"),
+        ("Year 1", "G1", "anatomy", 2, "Hall", "14/01/2030", "23:00:00"),
+        ("Year 2", "G3", "anatomy", 1, "Hall", "11/01/2030", "00:10:00"),
+    ])
+
+    assert thread.schedule_date_ranges(session_schedule) == {
+        "Year 1-G1": (date(2030, 1, 10), date(2030, 1, 15)),
+        "Year 2-G3": (date(2030, 1, 10), date(2030, 1, 11)),
+    }
+    assert thread.parse_datetime("10/01/2030", "09:00:00") == datetime(2030, 1, 10, 9, 0)
+
+
+def test_vectorized_validation_matches_the_row_by_row_validation(app):
+    thread = make_thread(app)
+    student_map = {
+        "00101": app.StudentRecord("00101", "A", "Year 1", "G1"),
+        "00102": app.StudentRecord("00102", "B", "Year 1", "G2"),
+    }
+    session_schedule = schedule_rows(app, [
+        ("Year 1", "G1", "anatomy", 1, "Hall", "06/05/2024", "14:00:00"),
+        ("Year 1", "G1", "anatomy", 2, "Lab", "2024-05-07", "09:00"),
+        ("Year 1", "G2", "anatomy", 1, "Lab", "2024-05-07", "09:00"),
+    ])
+    log_history = [
+        ("Student ID", "Location", "Log Date", "Log Time", "Log Timestamp"),
+        ("00101", "Hall", "2024-05-06", "14:05", None),
+        ("00101", "Hall", "06/05/2024", "14:10:00", None),
+        ("00101", "Hall", datetime(2024, 5, 6), "14:20", None),
+        ("00101", "Lab", "2024-05-07", time(9, 5), None),
+        # The merged timestamp is used without reading the log's date and time
+        ("00102", "Lab", "2024-05-07", "unreadable", datetime(2024, 5, 7, 9, 10)),
+        ("00102", "Hall", date(2024, 5, 6), "14:05:00", None),
+        ("00103", "Lab", "2024-05-07", "09:01:00", None),
+        ("00101", "Lab", "2024-05-07", "12:00", None),
+    ]
+
+    expected = thread.validate_attendance(log_history, session_schedule, student_map, "Year 1")
+
+    assert expected
+    assert thread.validate_attendance_vectorized(log_history, session_schedule, student_map, "Year 1") == expected
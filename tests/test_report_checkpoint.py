@@ -0,0 +1,70 @@
+import os
+
+import pandas as pd
+
+from test_schedule_pool import schedule_entry, schedule_frame, write_sheet
+
+
+def run_in(directory, thread):
+    """Run a processing thread with its reports written under directory, returning the one report it saved"""
+    os.makedirs(directory)
+    previous_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        errors = []
+        thread.error_occurred.connect(errors.append)
+        thread.run()
+        assert not errors, errors
+    finally:
+        os.chdir(previous_dir)
+    reports = [os.path.join(folder, file_name)
+               for folder, _, files in os.walk(os.path.join(directory, "attendance_reports"))
+               for file_name in files if file_name.endswith(".xlsx")]
+    assert len(reports) == 1, reports
+    return reports[0]
+
+
+def read_report(path):
+    with pd.ExcelFile(path) as workbook:
+        return {name: pd.read_excel(workbook, sheet_name=name, header=None, dtype=object)
+                .astype(str).values.tolist() for name in workbook.sheet_names}
+
+
+def update_thread(app_module, prev_report_file, inputs):
+    if app_module.__name__ == "department_attendance_app":
+        return app_module.UpdateProcessThread(prev_report_file, *inputs)
+    return app_module.UpdateProcessThread(*inputs, prev_report_file=prev_report_file)
+
+
+def test_checkpoint_update_matches_report_reparse(app, tmp_path):
+    ref = pd.DataFrame({"Student ID": ["00101", "00102", "00103"], "Name": ["A", "B", "C"],
+                        "Year": ["Year 1"] * 3, "Group": ["G1", "G1", "G2"]})
+    ref_file = write_sheet(tmp_path / "ref.xlsx", "Ref", ref)
+    schedule = write_sheet(tmp_path / "schedule.xlsx", "Schedule", schedule_frame(app, {
+        "G1": [("Hall", "10/01/2030", "09:00:00"), ("Lab", "12/01/2030", "11:00:00")],
+        "G2": [("Lab", "11/01/2030", "10:00:00"), ("Hall", "13/01/2030", "09:00:00")]}))
+    columns = ["Student ID", "Location", "Log Date", "Log Time", "Source_File"]
+    first_scans = [
+        ("00101", "Hall", "10/01/2030", "09:05:00", "a.json"),
+        ("00103", "Lab", "11/01/2030", "10:02:00", "a.json"),
+    ]
+    log_file = write_sheet(tmp_path / "log.xlsx", "Logs", pd.DataFrame(first_scans, columns=columns))
+    inputs = (ref_file, "Ref", log_file, "Logs", [schedule_entry(app, "anatomy", schedule, 2)])
+
+    full_report = run_in(tmp_path / "full", app.ProcessThread(*inputs))
+    assert app.ReportCheckpoint.load(full_report)["watermarks"] == {"a.json": pd.Timestamp("2030-01-11 10:02:00")}
+
+    # New scans arrive on the old source and from a backup synced late, and one student changes group
+    write_sheet(tmp_path / "log.xlsx", "Logs", pd.DataFrame(first_scans + [
+        ("00101", "Lab", "12/01/2030", "11:04:00", "a.json"),
+        ("00102", "Hall", "10/01/2030", "09:01:00", "b.json"),
+        ("00103", "Hall", "13/01/2030", "09:03:00", "b.json"),
+    ], columns=columns))
+    ref.loc[1, "Group"] = "G2"
+    write_sheet(tmp_path / "ref.xlsx", "Ref", ref)
+
+    with_checkpoint = read_report(run_in(tmp_path / "checkpoint", update_thread(app, full_report, inputs)))
+    os.remove(app.ReportCheckpoint.path_for(full_report))
+    reparsed = read_report(run_in(tmp_path / "reparse", update_thread(app, full_report, inputs)))
+
+    assert with_checkpoint == reparsed
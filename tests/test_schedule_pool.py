@@ -0,0 +1,80 @@
+import os
+import re
+
+import openpyxl
+import pandas as pd
+
+
+def write_sheet(path, sheet_name, frame):
+    frame.to_excel(path, sheet_name=sheet_name, index=False)
+    return str(path)
+
+
+def schedule_frame(app_module, group_sessions):
+    rows = []
+    for group, sessions in group_sessions.items():
+        for session_num, (location, day, start) in enumerate(sessions, start=1):
+            rows.append(("Year 1", group, "anatomy", session_num, location, day, start))
+    columns = ["Year", "Group", "Subject", "Session", "Location", "Date", "Start"]
+    if app_module.__name__ == "department_attendance_app":
+        rows = [row[:2] + row[3:] for row in rows]
+        columns.remove("Subject")
+    return pd.DataFrame(rows, columns=columns)
+
+
+def schedule_entry(app_module, module_name, path, total_required):
+    if app_module.__name__ == "department_attendance_app":
+        return (1, module_name, path, "Schedule", total_required, "Anatomy")
+    return (1, module_name, path, "Schedule", total_required)
+
+
+def run_reports(app_module, directory, inputs, workers):
+    os.makedirs(directory)
+    previous_dir = os.getcwd()
+    os.chdir(directory)
+    try:
+        errors = []
+        thread = app_module.ProcessThread(*inputs, workers=workers)
+        thread.error_occurred.connect(errors.append)
+        thread.run()
+        assert not errors, errors
+    finally:
+        os.chdir(previous_dir)
+
+    # Report names end in their creation time, which differs between runs
+    reports = {}
+    for folder, _, files in os.walk(os.path.join(directory, "attendance_reports")):
+        for file_name in files:
+            # Each report has a checkpoint beside it
+            if not file_name.endswith(".xlsx"):
+                continue
+            workbook = openpyxl.load_workbook(os.path.join(folder, file_name))
+            reports[re.sub(r"_\d{8}_\d{6}", "", file_name)] = {
+                sheet.title: [tuple(row) for row in sheet.iter_rows(values_only=True)] for sheet in workbook}
+    return reports
+
+
+def test_pool_and_sequential_runs_write_the_same_reports(app, tmp_path):
+    ref_file = write_sheet(tmp_path / "ref.xlsx", "Ref", pd.DataFrame({
+        "Student ID": ["00101", "00102", "00103"], "Name": ["A", "B", "C"],
+        "Year": ["Year 1"] * 3, "Group": ["G1", "G1", "G2"]}))
+    log_file = write_sheet(tmp_path / "log.xlsx", "Logs", pd.DataFrame([
+        ("00101", "Hall", "10/01/2030", "09:05:00"),
+        ("00102", "Hall", "10/01/2030", "09:10:00"),
+        ("00103", "Lab", "11/01/2030", "10:00:00"),
+        ("00101", "Lab", "12/01/2030", "11:05:00"),
+        ("00103", "Hall", "13/01/2030", "09:00:00"),
+    ], columns=["Student ID", "Location", "Log Date", "Log Time"]))
+    first = write_sheet(tmp_path / "first.xlsx", "Schedule", schedule_frame(app, {
+        "G1": [("Hall", "10/01/2030", "09:00:00"), ("Lab", "12/01/2030", "11:00:00")],
+        "G2": [("Lab", "11/01/2030", "10:00:00")]}))
+    second = write_sheet(tmp_path / "second.xlsx", "Schedule", schedule_frame(app, {
+        "G2": [("Hall", "13/01/2030", "09:00:00")]}))
+    schedules = [schedule_entry(app, "first", first, 2), schedule_entry(app, "second", second, 1)]
+    inputs = (ref_file, "Ref", log_file, "Logs", schedules)
+
+    sequential = run_reports(app, tmp_path / "sequential", inputs, workers=1)
+    pooled = run_reports(app, tmp_path / "pooled", inputs, workers=2)
+
+    assert len(sequential) == 2
+    assert pooled == sequential